@@ -1,3 +1,8 @@
 """FlexiBoard backend package."""
 
+from .asyncmode import monkey_patch
+
+# before Flask, sockets or threads are set up (FLEXIBOARD_ASYNC_MODE=eventlet|gevent)
+monkey_patch()
+
 
@@ -0,0 +1,204 @@
+"""Attack and mobility maps of a position: ``GET /api/games/<id>/analysis``.
+
+The position is laid out as NumPy arrays of shape (height, width), built from
+``Game.pieces`` and ``Board.cells``: the owner of every square (-1 empty),
+the blocked squares and, per step offset or ray direction, which squares
+hold a piece of each player moving that way. Every step offset is one
+shifted array; the rays of all pieces sharing a direction are extended
+together by shifts of 1, 2, 4, ... squares (``_ray_attacks``), so the Python
+loops run over offsets, directions and log(ray length), never over pieces or
+squares. On quadsphere boards the shift is ``np.roll``; on rectangular boards
+it is zero-filled at the edges.
+
+Moves follow ``movegen.pseudo_moves``: obstacles and ``block`` squares stop
+a ray, a wrapped ray stops before coming back to its piece. A square holding
+a piece of the same owner is attacked (defended) but is not a move.
+
+- ``attacks``: per player, how many of its pieces attack each square
+- ``mobility``: per player, the number of pseudo-legal moves
+- ``contested``: squares attacked by more than one player
+- ``threatened``: per player, its pieces standing on a square another player attacks
+
+NumPy is optional (``flexiboard[analysis]``) and imported on first use.
+The arrays scale with the area, so boards of more than ``ANALYSIS_MAX_SQUARES``
+squares are not analysed. Smaller sparse boards (quadsphere boards with coprime
+sides) are: the analysis reads ``Game.pieces``, never the position.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import json
+import math
+import os
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
+
+from .models import ValidationError
+from .movegen import _split_pattern, pattern_key, turn_order
+
+if TYPE_CHECKING:
+    from .models import Game
+
+Offset = Tuple[int, int]
+
+EMPTY = -1
+
+# largest board analysed (256 x 256: tens of milliseconds, a few MB of arrays per player)
+ANALYSIS_MAX_SQUARES = int(os.environ.get("FLEXIBOARD_ANALYSIS_MAX_SQUARES", "65536"))
+
+
+def numpy_available() -> bool:
+    return importlib.util.find_spec("numpy") is not None
+
+
+def default_cache_size() -> int:
+    return int(os.environ.get("FLEXIBOARD_ANALYSIS_CACHE_SIZE", "256"))
+
+
+def _shift(np: Any, a: Any, dx: int, dy: int, wrap: bool, fill: int = 0) -> Any:
+    """``a`` moved by (dx, dy) over its last two axes: ``out[..., y + dy, x + dx] = a[..., y, x]``."""
+    if wrap:
+        return np.roll(a, (dy, dx), axis=(-2, -1))
+    h, w = a.shape[-2:]
+    out = np.full_like(a, fill)
+    if abs(dx) < w and abs(dy) < h:
+        out[..., max(dy, 0) : h + min(dy, 0), max(dx, 0) : w + min(dx, 0)] = a[
+            ..., max(-dy, 0) : h + min(-dy, 0), max(-dx, 0) : w + min(-dx, 0)
+        ]
+    return out
+
+
+def _ray_length(dx: int, dy: int, width: int, height: int, wrap: bool) -> int:
+    # most squares a ray can visit before the edge or, wrapped, before its own square
+    if not wrap:
+        return max(width, height) - 1
+    if dy == 0:
+        return width - 1
+    if dx == 0:
+        return height - 1
+    return width * height // math.gcd(width, height) - 1
+
+
+def _ray_attacks(np: Any, origins: Any, empty: Any, dx: int, dy: int, length: int, wrap: bool) -> Any:
+    """Per square, how many of ``origins`` reach it along (dx, dy) within ``length`` squares.
+
+    Over a span of n squares, ``a`` counts the rays arriving at each square and
+    ``m`` says whether the n squares behind it are all empty. Spans compose as
+    ``a(n + k) = a(n) + m(n) * shift(a(k), n)``, so a ray of length L costs
+    O(log L) shifted-array operations instead of L.
+    """
+    span_a = _shift(np, origins, dx, dy, wrap)
+    span_m = _shift(np, empty, dx, dy, wrap)
+    n = 1
+    total_a = total_m = None
+    total_n = 0
+    while True:
+        if length & n:
+            if total_a is None:
+                total_a, total_m = span_a, span_m
+            else:
+                total_a = total_a + total_m * _shift(np, span_a, total_n * dx, total_n * dy, wrap)
+                total_m = total_m & _shift(np, span_m, total_n * dx, total_n * dy, wrap)
+            total_n += n
+        if n * 2 > length:
+            return total_a
+        span_a = span_a + span_m * _shift(np, span_a, n * dx, n * dy, wrap)
+        span_m = span_m & _shift(np, span_m, n * dx, n * dy, wrap)
+        n *= 2
+
+
+def analyze(game: "Game") -> Dict[str, Any]:
+    import numpy as np
+
+    board = game.board
+    width, height = board.size
+    if width * height > ANALYSIS_MAX_SQUARES:
+        raise ValidationError(f"analysis is not available on boards of more than {ANALYSIS_MAX_SQUARES} squares")
+    wrap = board.type == "quadsphere"
+
+    players = turn_order(game)
+    for piece in game.pieces:
+        if piece.owner not in players:
+            players.append(piece.owner)
+    index = {player: i for i, player in enumerate(players)}
+    count = len(players)
+
+    blocked = np.zeros((height, width), dtype=bool)
+    for sq, cell in board.cells.items():
+        if cell.obstacle is not None or cell.effect == "block":
+            blocked[sq // width, sq % width] = True
+
+    # (type, owner) -> squares of those pieces
+    groups: Dict[Tuple[str, str], List[Tuple[int, int]]] = {}
+    for piece in game.pieces:
+        groups.setdefault((piece.type, piece.owner), []).append(piece.position)
+
+    owner = np.full((height, width), EMPTY, dtype=np.int8)
+    # offset/direction -> (players, height, width) pieces moving that way from each square
+    steps: Dict[Offset, Any] = {}
+    rays: Dict[Offset, Any] = {}
+
+    def pieces_moving(table: Dict[Offset, Any], offset: Offset) -> Any:
+        array = table.get(offset)
+        if array is None:
+            array = table[offset] = np.zeros((count, height, width), dtype=np.int32)
+        return array
+
+    for (piece_type, piece_owner), squares in groups.items():
+        p = index[piece_owner]
+        xs, ys = np.array(squares, dtype=np.intp).T
+        owner[ys, xs] = p
+        movement = game.piece_types.get(piece_type, {}).get("movement")
+        step_offsets, ray_dirs = _split_pattern(pattern_key(movement, piece_owner))
+        seen = set()
+        for dx, dy in step_offsets:
+            if wrap:
+                dx, dy = dx % width, dy % height
+            elif abs(dx) >= width or abs(dy) >= height:
+                continue
+            # the same destination counts once, and never the piece's own square
+            if (dx, dy) == (0, 0) or (dx, dy) in seen:
+                continue
+            seen.add((dx, dy))
+            pieces_moving(steps, (dx, dy))[p, ys, xs] = 1
+        for direction in ray_dirs:
+            pieces_moving(rays, direction)[p, ys, xs] = 1
+
+    empty = (owner == EMPTY) & ~blocked
+    # (players, height, width): squares that are not the player's own
+    movable = owner != np.arange(count, dtype=np.int8)[:, None, None]
+    attacks = np.zeros((count, height, width), dtype=np.int32)
+    for (dx, dy), origins in steps.items():
+        attacks += _shift(np, origins, dx, dy, wrap)
+    for (dx, dy), origins in rays.items():
+        length = _ray_length(dx, dy, width, height, wrap)
+        if length > 0:
+            attacks += _ray_attacks(np, origins, empty, dx, dy, length, wrap)
+    # nothing moves onto a blocked square; every other attack on a square that is
+    # empty or another player's is a move
+    attacks *= ~blocked
+    mobility = (attacks * movable).sum(axis=(1, 2))
+
+    attacked = attacks > 0
+    contested = attacked.sum(axis=0) > 1
+    total = attacks.sum(axis=0)
+    threatened = {}
+    for player, p in index.items():
+        ys, xs = np.nonzero((owner == p) & (total > attacks[p]))
+        threatened[player] = [[int(x), int(y)] for x, y in zip(xs, ys)]
+
+    return {
+        "game_id": game.id,
+        "version": game.version,
+        "size": [width, height],
+        "players": players,
+        # rows are y = 0 .. height - 1
+        "attacks": {player: attacks[p].tolist() for player, p in index.items()},
+        "mobility": {player: int(mobility[p]) for player, p in index.items()},
+        "contested": contested.astype(np.int8).tolist(),
+        "threatened": threatened,
+    }
+
+
+def analysis_json(game: "Game") -> bytes:
+    return json.dumps(analyze(game), separators=(",", ":")).encode("utf-8")
@@ -1,299 +1,263 @@
 from __future__ import annotations
 
+import hmac
+import json
+import logging
 import os
-from dataclasses import dataclass, asdict
-from typing import Any, Dict, List, Tuple
+import signal
+import sys
+import time
+from typing import Any, Dict, List, Optional
 
-from flask import Flask, jsonify, request
+from flask import Flask, g, jsonify, request
 from flask_cors import CORS
 from flask_socketio import SocketIO, join_room, emit
-import yaml
 
+from .analysis import analysis_json, numpy_available
+from .analysis import default_cache_size as default_analysis_cache_size
+from .asyncmode import async_mode
+from .delta import delta_payload, game_seq, resync_payload, snapshot_payload
+from .export import export_header, iter_export
+from .httpcache import ResponseCache, game_etag
+from .httpcache import default_cache_size as default_response_cache_size
+from .locks import VersionConflict, parse_expected_version
+from .metrics import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    EMIT_BYTES,
+    EMIT_BYTES_TOTAL,
+    LENGTH_BUCKETS,
+    METRICS,
+    REQUEST_SECONDS,
+    gauge,
+    histogram_samples,
+)
+# models and validation live in models.py (no Flask); re-exported here for existing imports
+from .models import (  # noqa: F401
+    Board,
+    CompiledRuleset,
+    Game,
+    Obstacle,
+    Piece,
+    Rules,
+    SpecialSquare,
+    ValidationError,
+    compile_ruleset,
+    new_game,
+    static_json,
+    validate_board,
+    validate_pieces,
+    validate_rules,
+    validate_settings,
+)
+from .movegen import (
+    BatchMoveError,
+    IllegalMoveError,
+    generate_moves,
+    play_move,
+    play_moves,
+    replay_move,
+    rollback_on_error,
+)
+from .presets import PresetRegistry
+from .profiling import admin_token, profiler_from_env
+from .registry import GameRegistry, registry_limits_from_env
+from .pubsub import PubSub, UnixSocketPubSub, pubsub_from_env
+from .rulesets import RulesetCache, default_cache_size, ruleset_key
+from .sharding import FORWARDED_HEADER, ShardConfig, fetch_game, forward_request, run_workers, serve_shard
+from .storage import GameStore, store_from_env
+
+logger = logging.getLogger(__name__)
 
 # -----------------------------
-# Models (minimal viable set)
+# In-memory storage (MVP)
 # -----------------------------
 
 
-@dataclass
-class SpecialSquare:
-    position: Tuple[int, int]
-    effect: str
-    value: Any | None = None
-
-
-@dataclass
-class Obstacle:
-    position: Tuple[int, int]
-    type: str
-
-
-@dataclass
-class Board:
-    type: str
-    size: Tuple[int, int]
-    special_squares: List[SpecialSquare]
-    obstacles: List[Obstacle]
-
-    def is_valid_position(self, x: int, y: int) -> bool:
-        width, height = self.size
-        if self.type == "rectangular":
-            return 0 <= x < width and 0 <= y < height
-        # quadsphere: allow any integer, valid by modulo wrap
-        return isinstance(x, int) and isinstance(y, int)
-
-    def normalize_pos(self, x: int, y: int) -> Tuple[int, int]:
-        width, height = self.size
-        if self.type == "rectangular":
-            return x, y
-        # wrap on both axes
-        return (x % width, y % height)
-
-
-@dataclass
-class Piece:
-    type: str
-    position: Tuple[int, int]
-    owner: str
-    promoted: bool = False
-
-    def to_dict(self) -> Dict[str, Any]:
-        return {
-            "type": self.type,
-            "position": list(self.position),
-            "owner": self.owner,
-            "promoted": self.promoted,
-        }
-
-
-@dataclass
-class Rules:
-    turn_system: str
-    victory_conditions: List[Dict[str, Any]]
-    draw_conditions: Dict[str, Any] | None
-    piece_reuse: str | None
-    reuse_rules: Dict[str, Any] | None
-    time_limit: Dict[str, Any] | None
-    players: Dict[str, Any]
-
-
-@dataclass
-class Game:
-    id: str
-    board: Board
-    pieces: List[Piece]
-    rules: Rules
-    players: List[Dict[str, Any]]
-    state: Dict[str, Any]
-
-    def to_dict(self) -> Dict[str, Any]:
-        return {
-            "game_id": self.id,
-            "board": {
-                "type": self.board.type,
-                "size": list(self.board.size),
-                "special_squares": [asdict(s) for s in self.board.special_squares],
-                "obstacles": [asdict(o) for o in self.board.obstacles],
-            },
-            "pieces": [p.to_dict() for p in self.pieces],
-            "rules": asdict(self.rules),
-            "players": self.players,
-            "state": self.state,
-        }
+# resident games; idle ones are spilled to disk and reloaded on access
+GAMES = GameRegistry(Game.from_dict, replay_move, **registry_limits_from_env())
 
+# moves accepted by one POST /api/games/<id>/moves
+MAX_BATCH_MOVES = 4096
 
-# -----------------------------
-# Validation utilities
-# -----------------------------
+# GET /api/games/<id>/history page size (default and upper bound)
+HISTORY_PAGE_SIZE = 256
+MAX_HISTORY_PAGE_SIZE = 4096
 
+# opt-in cProfile sampling (FLEXIBOARD_PROFILE_SAMPLE_RATE / admin window)
+PROFILER = profiler_from_env()
 
-class ValidationError(Exception):
-    pass
-
-
-def validate_board(board_data: Dict[str, Any]) -> None:
-    board_type = board_data.get("board_type", "rectangular")
-    if board_type not in ["rectangular", "quadsphere"]:
-        raise ValidationError(f"Invalid board_type: {board_type}")
-
-    board_size = board_data.get("board_size")
-    if (
-        not isinstance(board_size, list)
-        or len(board_size) != 2
-        or not all(isinstance(x, int) and x > 0 for x in board_size)
-    ):
-        raise ValidationError("Invalid board_size: Expected [width, height] with positive integers")
-
-    width, height = board_size
-    for square in board_data.get("special_squares", []) or []:
-        position = square.get("position")
-        if not (isinstance(position, list) and len(position) == 2 and all(isinstance(x, int) for x in position)):
-            raise ValidationError(f"Invalid position in special_squares: {position}")
-        if board_type == "rectangular" and not (0 <= position[0] < width and 0 <= position[1] < height):
-            raise ValidationError(f"Position {position} out of bounds for board size {board_size}")
-        if square.get("effect") not in ["teleport", "damage", "bonus", "block"]:
-            raise ValidationError(f"Invalid effect in special_squares: {square.get('effect')}")
-        if square.get("effect") == "teleport":
-            value = square.get("value")
-            if board_type == "rectangular" and not (
-                isinstance(value, list)
-                and len(value) == 2
-                and 0 <= value[0] < width
-                and 0 <= value[1] < height
-            ):
-                raise ValidationError(f"Invalid teleport target: {value}")
-
-    for obstacle in board_data.get("obstacles", []) or []:
-        position = obstacle.get("position")
-        if not (isinstance(position, list) and len(position) == 2 and all(isinstance(x, int) for x in position)):
-            raise ValidationError(f"Invalid position in obstacles: {position}")
-        if board_type == "rectangular" and not (0 <= position[0] < width and 0 <= position[1] < height):
-            raise ValidationError(f"Obstacle position {position} out of bounds for board size {board_size}")
-
-
-def validate_pieces(pieces_data: Dict[str, Any], board_size: List[int], board_type: str) -> None:
-    width, height = board_size
-    piece_types = pieces_data.get("piece_types", []) or []
-    seen_names = set()
-
-    for pt in piece_types:
-        name = pt.get("name")
-        if not name or name in seen_names:
-            raise ValidationError(f"Duplicate or missing piece type name: {name}")
-        seen_names.add(name)
-
-        movement = pt.get("movement")
-        valid_patterns = [
-            "adjacent",
-            "horizontal_vertical_unlimited",
-            "diagonal_unlimited",
-            "knight",
-            "forward_1",
-            "custom",
-        ]
-        if isinstance(movement, list):
-            ok = all(
-                isinstance(m, list) and len(m) == 2 and all(isinstance(x, int) for x in m)
-                for m in movement
-            )
-            if not ok:
-                raise ValidationError(f"Invalid movement coordinates for {name}: {movement}")
-        elif movement not in valid_patterns:
-            raise ValidationError(f"Invalid movement pattern for {name}: {movement}")
-
-        if pt.get("promotion"):
-            new_type = pt["promotion"].get("new_type")
-            if new_type and not any(pt2["name"] == new_type for pt2 in piece_types):
-                raise ValidationError(f"Unknown promotion new_type: {new_type}")
-            zone = pt["promotion"].get("zone")
-            if zone not in ["enemy_back_row", "enemy_territory", "specific_square"]:
-                raise ValidationError(f"Invalid promotion zone: {zone}")
-
-    seen_positions = set()
-    initial_positions = pieces_data.get("initial_positions", {}) or {}
-    for _player_id, pieces in initial_positions.items():
-        for piece in pieces:
-            if piece.get("type") not in seen_names:
-                raise ValidationError(f"Unknown piece type in initial_positions: {piece.get('type')}")
-            position = piece.get("position")
-            if not (isinstance(position, list) and len(position) == 2):
-                raise ValidationError(f"Invalid initial position: {position}")
-            x, y = position
-            if not (isinstance(x, int) and isinstance(y, int)):
-                raise ValidationError(f"Non-integer position for piece {piece.get('type')}: {position}")
-            if board_type == "rectangular" and not (0 <= x < width and 0 <= y < height):
-                raise ValidationError(f"Position {position} out of bounds for board size {board_size}")
-            pos_tuple = (x, y)
-            if pos_tuple in seen_positions:
-                raise ValidationError(f"Duplicate position {position} found")
-            seen_positions.add(pos_tuple)
-
-
-def validate_rules(rules_data: Dict[str, Any], piece_types: List[Dict[str, Any]]) -> None:
-    if rules_data.get("turn_system") != "alternate":
-        raise ValidationError(f"Invalid turn_system: {rules_data.get('turn_system')}")
-
-    valid_conditions = ["capture_king", "eliminate_all", "control_center", "reach_square", "score"]
-    for condition in rules_data.get("victory_conditions", []) or []:
-        if condition.get("type") not in valid_conditions:
-            raise ValidationError(f"Invalid victory condition: {condition.get('type')}")
-        if condition.get("type") == "capture_king" and condition.get("value") not in [pt["name"] for pt in piece_types]:
-            raise ValidationError(f"Unknown piece type in victory condition: {condition.get('value')}")
-
-    if rules_data.get("piece_reuse") == "on" and not rules_data.get("reuse_rules"):
-        raise ValidationError("reuse_rules is required when piece_reuse is 'on'")
-
-
-def validate_settings(board: Dict[str, Any], pieces: Dict[str, Any], rules: Dict[str, Any]) -> None:
-    validate_board(board)
-    validate_pieces(pieces, board["board_size"], board.get("board_type", "rectangular"))
-    validate_rules(rules, pieces.get("piece_types", []) or [])
+# serialized GET /api/games/<id> bodies by game version
+RESPONSES = ResponseCache(default_response_cache_size())
 
+# GET /api/games/<id>/analysis bodies by game version
+ANALYSES = ResponseCache(default_analysis_cache_size())
 
-# -----------------------------
-# In-memory storage (MVP)
-# -----------------------------
+# durable move log; enabled by FLEXIBOARD_DATA_DIR (see create_app)
+STORE: Optional[GameStore] = None
 
+# which games this process owns (multi-worker mode, see sharding.py)
+SHARDS = ShardConfig()
 
-GAMES: Dict[str, Game] = {}
+# broadcast payload sizes are measured on every Nth emit per event: a JSON
+# encoding just for the metric would double the serialization of every move
+EMIT_SIZE_SAMPLE = max(1, int(os.environ.get("FLEXIBOARD_EMIT_SIZE_SAMPLE", "16")))
+# event -> [emits so far, last measured size]
+_emit_sizes: Dict[str, List[int]] = {}
 
+# room broadcasts; crosses worker processes in multi-worker mode
+PUBSUB: PubSub = pubsub_from_env()
 
-def create_game_from_yamls(board_yaml: str, pieces_yaml: str, rules_yaml: str) -> Game:
-    board_data = yaml.safe_load(board_yaml) or {}
-    pieces_data = yaml.safe_load(pieces_yaml) or {}
-    rules_data = yaml.safe_load(rules_yaml) or {}
-
-    validate_settings(board_data, pieces_data, rules_data)
-
-    width, height = board_data["board_size"]
-    board = Board(
-        type=board_data.get("board_type", "rectangular"),
-        size=(width, height),
-        special_squares=[
-            SpecialSquare(tuple(s["position"]), s["effect"], s.get("value"))
-            for s in (board_data.get("special_squares") or [])
-        ],
-        obstacles=[Obstacle(tuple(o["position"]), o["type"]) for o in (board_data.get("obstacles") or [])],
-    )
 
-    pieces: List[Piece] = []
-    initial_positions = pieces_data.get("initial_positions", {}) or {}
-    for player_id, plist in initial_positions.items():
-        for p in plist:
-            pieces.append(
-                Piece(
-                    type=p["type"],
-                    position=tuple(p["position"]),
-                    owner=player_id,
-                    promoted=bool(p.get("promoted", False)),
-                )
-            )
-
-    rules = Rules(
-        turn_system=rules_data.get("turn_system", "alternate"),
-        victory_conditions=rules_data.get("victory_conditions", []) or [],
-        draw_conditions=rules_data.get("draw_conditions"),
-        piece_reuse=rules_data.get("piece_reuse"),
-        reuse_rules=rules_data.get("reuse_rules"),
-        time_limit=rules_data.get("time_limit"),
-        players=rules_data.get("players", {"number": 2}),
-    )
+RULESETS: RulesetCache[CompiledRuleset] = RulesetCache(default_cache_size())
 
-    import secrets
+# named rule sets from FLEXIBOARD_PRESET_DIR: validated by create_app, compiled once per process (see load_presets)
+PRESETS = PresetRegistry()
 
-    game_id = secrets.token_hex(4)
-    game = Game(
-        id=game_id,
-        board=board,
-        pieces=pieces,
-        rules=rules,
-        players=[],
-        state={"turn": "player_1", "history": []},
+
+def create_game_from_yamls(board_yaml: str, pieces_yaml: str, rules_yaml: str) -> Game:
+    ruleset = RULESETS.get_or_compile(
+        ruleset_key(board_yaml, pieces_yaml, rules_yaml),
+        lambda: compile_ruleset(board_yaml, pieces_yaml, rules_yaml),
     )
+    return create_game_from_ruleset(ruleset)
+
+
+def create_game_from_ruleset(ruleset: CompiledRuleset) -> Game:
+    game_id = SHARDS.new_game_id()
+    game = new_game(ruleset, game_id)
     GAMES[game_id] = game
+    if STORE is not None:
+        STORE.save_snapshot(game)
     return game
 
 
+def load_presets() -> None:
+    # before forking in multi-worker mode, so every worker shares the compiled presets;
+    # a single process loads them on first use
+    PRESETS.ensure_loaded()
+
+
+def init_storage() -> None:
+    """Open the configured store and rebuild GAMES from snapshots plus log tails."""
+    global STORE
+    if STORE is not None:
+        return
+    store = store_from_env()
+    if store is None:
+        return
+    games, stats = store.recover(Game.from_dict, replay_move, owns=SHARDS.owns)
+    GAMES.use_store(store)
+    GAMES.update(games)
+    store.recovery_stats = stats
+    store.start()
+    STORE = store
+    logger.info("recovered %d games in %.2fs (%d failed)", stats["games"], stats["seconds"], len(stats["failed"]))
+
+
+def shutdown_storage() -> None:
+    """Flush the move log and remove scratch spill files; runs when the server stops."""
+    GAMES.close()
+    if STORE is not None:
+        STORE.close()
+
+
+def serve_until_stopped(serve: Any, *args: Any) -> None:
+    # SIGTERM unwinds like Ctrl+C so shutdown_storage runs
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        serve(*args)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        shutdown_storage()
+
+
+def persist_move(game: Game) -> None:
+    if STORE is not None:
+        STORE.append_move(game)
+
+
+def persist_moves(game: Game, count: int) -> None:
+    if STORE is not None:
+        STORE.append_moves(game, count)
+
+
+def broadcast_delta(game: Game, base: int) -> None:
+    PUBSUB.publish(game.id, "delta", delta_payload(game, base))
+
+
+def room_members(socketio: SocketIO, room: str) -> int:
+    return len(socketio.server.manager.rooms.get("/", {}).get(room) or ())
+
+
+def emit_to_room(socketio: SocketIO, room: str, event: str, data: Any) -> None:
+    sizes = _emit_sizes.get(event)
+    if sizes is None:
+        sizes = _emit_sizes[event] = [0, 0]
+    if sizes[0] % EMIT_SIZE_SAMPLE == 0:
+        # size of the JSON body; Socket.IO framing adds a few bytes
+        sizes[1] = len(json.dumps(data, separators=(",", ":")))
+        EMIT_BYTES.observe(sizes[1], event)
+    sizes[0] += 1
+    # the emits in between are counted at the last measured size
+    EMIT_BYTES_TOTAL.inc(sizes[1] * room_members(socketio, room), event)
+    socketio.emit(event, data, room=room)
+
+
+def collect_app_metrics(socketio: SocketIO) -> List[Any]:
+    """Scrape-time gauges: registry, caches, Socket.IO rooms, history lengths."""
+    registry = GAMES.stats()
+    rooms = socketio.server.manager.rooms.get("/", {})
+    connected = rooms.get(None) or {}
+    # every client also sits in a room named after its sid; the rest are games
+    game_rooms = [members for name, members in rooms.items() if name is not None and name not in connected]
+    lengths = [0] * (len(LENGTH_BUCKETS) + 1)
+    total_length = 0
+    for game in GAMES.values():
+        n = len(game.state["history"])
+        total_length += n
+        for i, bound in enumerate(LENGTH_BUCKETS):
+            if n <= bound:
+                lengths[i] += 1
+                break
+        else:
+            lengths[-1] += 1
+    rulesets = RULESETS.stats()
+    responses = RESPONSES.stats()
+    return [
+        gauge("flexiboard_games_resident", "Games held in memory", registry["resident"]),
+        gauge("flexiboard_games_spilled", "Games evicted to disk", registry["spilled"]),
+        gauge("flexiboard_games_estimated_bytes", "Estimated memory of resident games", registry["estimated_bytes"]),
+        ("flexiboard_game_evictions_total", "counter", "Games evicted from memory", [("", (), registry["evictions"])]),
+        ("flexiboard_game_rehydrations_total", "counter", "Evicted games loaded back", [("", (), registry["rehydrations"])]),
+        gauge("flexiboard_ws_connections", "Connected Socket.IO clients", len(connected)),
+        gauge("flexiboard_ws_rooms", "Game rooms with at least one member", len(game_rooms)),
+        gauge("flexiboard_ws_room_members", "Members across all game rooms", sum(len(m) for m in game_rooms)),
+        gauge("flexiboard_ws_room_members_max", "Members of the largest game room", max((len(m) for m in game_rooms), default=0)),
+        (
+            "flexiboard_game_history_length",
+            "histogram",
+            "Moves played per resident game",
+            histogram_samples(LENGTH_BUCKETS, lengths, total_length, ()),
+        ),
+        gauge("flexiboard_ruleset_cache_size", "Compiled rule sets cached", rulesets["size"]),
+        ("flexiboard_ruleset_cache_hits_total", "counter", "Rule set cache hits", [("", (), rulesets["hits"])]),
+        ("flexiboard_ruleset_cache_misses_total", "counter", "Rule set cache misses", [("", (), rulesets["misses"])]),
+        ("flexiboard_response_cache_hits_total", "counter", "Game JSON cache hits", [("", (), responses["hits"])]),
+        ("flexiboard_response_cache_misses_total", "counter", "Game JSON cache misses", [("", (), responses["misses"])]),
+    ]
+
+
+def check_version(game: Game, expected: Optional[int]) -> None:
+    # caller holds game.lock
+    if expected is not None and expected != game.version:
+        raise VersionConflict(expected, game.version)
+
+
+def conflict_response(game: Game, error: VersionConflict) -> Any:
+    return jsonify({"state": game.state_dict(), "version": error.current, "errors": str(error)}), 409
+
+
 # -----------------------------
 # Flask application factory
 # -----------------------------
@@ -305,12 +269,110 @@ def create_app() -> tuple[Flask, SocketIO]:
                 static_url_path='/static')
     CORS(app, resources={r"/api/*": {"origins": ["http://localhost:8002", "http://127.0.0.1:8002", "http://localhost:8014", "http://127.0.0.1:8014"]}})
     # Allow Socket.IO from UI origins (broad for dev convenience)
-    socketio = SocketIO(app, cors_allowed_origins="*")
+    socketio = SocketIO(app, cors_allowed_origins="*", async_mode=async_mode())
+    # a broken preset fails here, not on the first request that uses it
+    PRESETS.validate()
+    init_storage()
+    # every worker re-emits published updates to its own room members
+    PUBSUB.subscribe(PROFILER.profiled(lambda room, event, data: emit_to_room(socketio, room, event, data)))
+    METRICS.const_labels = (("worker", str(SHARDS.worker_index)),)
+    METRICS.add_collector("app", lambda: collect_app_metrics(socketio))
+
+    @app.before_request
+    def start_timer():
+        g.request_start = time.perf_counter()
+        if PROFILER.active:
+            g.profile = PROFILER.start()
+
+    @app.teardown_request
+    def stop_profile(_exc):
+        if PROFILER.active or g.get("profile") is not None:
+            PROFILER.stop(g.pop("profile", None))
+
+    @app.after_request
+    def record_latency(response):
+        endpoint = request.endpoint
+        start = g.get("request_start")
+        if endpoint is not None and endpoint.startswith("api_") and start is not None:
+            REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint)
+        return response
+
+    @app.before_request
+    def route_to_owner():
+        game_id = (request.view_args or {}).get("game_id")
+        # the marker is only honoured with the workers' shared secret; anything else from a client is ignored
+        if game_id is None or SHARDS.owns(game_id) or SHARDS.is_forwarded(request.headers.get(FORWARDED_HEADER)):
+            return None
+        status, body, headers = forward_request(
+            SHARDS, game_id, request.method, request.full_path, request.get_data(), request.headers
+        )
+        return app.response_class(body, status=status, headers=headers)
 
     @app.get("/api/health")
     def health() -> Any:
         return {"status": "ok"}
 
+    def require_admin() -> Optional[Any]:
+        token = admin_token()
+        if token is None:
+            return jsonify({"error": "not_found"}), 404
+        if not hmac.compare_digest(request.headers.get("X-Admin-Token", ""), token):
+            return jsonify({"error": "forbidden"}), 403
+        return None
+
+    # per process like /api/metrics: in multi-worker mode each call reaches one worker
+    @app.get("/api/admin/profile")
+    def api_profile_status():
+        return require_admin() or jsonify(PROFILER.status())
+
+    @app.post("/api/admin/profile")
+    def api_profile_window():
+        denied = require_admin()
+        if denied:
+            return denied
+        data = request.get_json(force=True, silent=True) or {}
+        try:
+            seconds = float(data.get("seconds", 10))
+        except (TypeError, ValueError):
+            return jsonify({"error": "seconds must be a number"}), 400
+        if data.get("reset", True):
+            PROFILER.reset()
+        window = PROFILER.open_window(seconds)
+        return jsonify({**PROFILER.status(), "window_seconds": window})
+
+    @app.delete("/api/admin/profile")
+    def api_profile_reset():
+        denied = require_admin()
+        if denied:
+            return denied
+        PROFILER.reset()
+        return jsonify(PROFILER.status())
+
+    @app.get("/api/admin/profile.pstats")
+    def api_profile_download():
+        denied = require_admin()
+        if denied:
+            return denied
+        response = app.response_class(PROFILER.dump(), mimetype="application/octet-stream")
+        response.headers["Content-Disposition"] = f'attachment; filename="flexiboard-{SHARDS.worker_index}.pstats"'
+        return response
+
+    @app.get("/api/admin/profile.txt")
+    def api_profile_summary():
+        denied = require_admin()
+        if denied:
+            return denied
+        try:
+            text = PROFILER.summary(int(request.args.get("limit", 40)), request.args.get("sort", "cumulative"))
+        except (KeyError, ValueError) as e:
+            return jsonify({"error": str(e)}), 400
+        return app.response_class(text, mimetype="text/plain")
+
+    @app.get("/api/metrics")
+    def metrics():
+        # per process: in multi-worker mode each worker answers with its own numbers
+        return app.response_class(METRICS.render(), mimetype=None, content_type=METRICS_CONTENT_TYPE)
+
     @app.get("/")
     def index():
         return app.send_static_file('index.html')
@@ -322,23 +384,160 @@ def create_app() -> tuple[Flask, SocketIO]:
     @app.post("/api/games")
     def api_create_game():
         data = request.get_json(force=True, silent=True) or {}
+        preset = data.get("preset")
         board_yaml = data.get("board_yaml", "")
         pieces_yaml = data.get("pieces_yaml", "")
         rules_yaml = data.get("rules_yaml", "")
         try:
-            game = create_game_from_yamls(board_yaml, pieces_yaml, rules_yaml)
+            if preset is not None:
+                ruleset = PRESETS.get(preset) if isinstance(preset, str) else None
+                if ruleset is None:
+                    raise ValidationError(f"Unknown preset: {preset} (available: {', '.join(PRESETS.names())})")
+                game = create_game_from_ruleset(ruleset)
+            else:
+                game = create_game_from_yamls(board_yaml, pieces_yaml, rules_yaml)
             return jsonify({"game_id": game.id, "status": "created", "errors": None}), 201
         except ValidationError as e:
             return jsonify({"game_id": None, "status": "error", "errors": str(e)}), 400
         except Exception as e:  # surface unexpected errors for investigation in MVP
             return jsonify({"game_id": None, "status": "error", "errors": f"unexpected: {e}"}), 400
 
+    @app.get("/api/presets")
+    def api_presets():
+        return jsonify({"presets": PRESETS.describe()})
+
+    @app.get("/api/rulesets/stats")
+    def api_ruleset_stats():
+        return jsonify(RULESETS.stats())
+
+    @app.get("/api/registry/stats")
+    def api_registry_stats():
+        return jsonify({**GAMES.stats(), "response_cache": RESPONSES.stats(), "analysis_cache": ANALYSES.stats()})
+
     @app.get("/api/games/<game_id>")
     def api_get_game(game_id: str):
+        game = GAMES.get(game_id)
+        if game is None:
+            return jsonify({"error": "not_found"}), 404
+        # ?history=0 leaves the move list to /history (state.seq tells its length)
+        include_history = request.args.get("history", "1").lower() not in ("0", "false", "no")
+        # unchanged since the client's copy: answer before touching the lock or JSON
+        etag = game_etag(game)
+        if request.if_none_match.contains(etag):
+            response = app.response_class(status=304)
+        else:
+            with GAMES.locked(game_id) as game:
+                if game is None:
+                    return jsonify({"error": "not_found"}), 404
+                etag = game_etag(game)
+                body = RESPONSES.get_or_render(
+                    game.id if include_history else game.id + "?history=0",
+                    game.version,
+                    lambda: game.to_json(include_history),
+                )
+            response = app.response_class(body, mimetype="application/json")
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"
+        return response
+
+    @app.get("/api/games/<game_id>/history")
+    def api_game_history(game_id: str):
+        try:
+            since = int(request.args.get("since", 0))
+            limit = int(request.args.get("limit", HISTORY_PAGE_SIZE))
+        except ValueError:
+            return jsonify({"error": "since and limit must be integers"}), 400
+        if since < 0 or limit < 1:
+            return jsonify({"error": "since must be >= 0 and limit >= 1"}), 400
+        limit = min(limit, MAX_HISTORY_PAGE_SIZE)
+        with GAMES.locked(game_id) as game:
+            if game is None:
+                return jsonify({"error": "not_found"}), 404
+            history = game.state["history"]
+            seq = len(history)
+            moves = history[since : since + limit]
+            version = game.version
+        end = min(since, seq) + len(moves)
+        return jsonify({
+            "game_id": game_id,
+            "since": since,
+            "seq": seq,
+            "version": version,
+            "moves": moves,
+            "next": end if end < seq else None,
+        })
+
+    @app.get("/api/games/<game_id>/region")
+    def api_game_region(game_id: str):
+        try:
+            x0, y0, x1, y1 = (int(request.args[key]) for key in ("x0", "y0", "x1", "y1"))
+        except (KeyError, ValueError):
+            return jsonify({"error": "x0, y0, x1 and y1 must be integers"}), 400
+        if x1 <= x0 or y1 <= y0:
+            return jsonify({"error": "the region must satisfy x0 < x1 and y0 < y1"}), 400
+        game = GAMES.get(game_id)
+        if game is None:
+            return jsonify({"error": "not_found"}), 404
+        etag = game_etag(game)
+        if request.if_none_match.contains(etag):
+            response = app.response_class(status=304)
+        else:
+            with GAMES.locked(game_id) as game:
+                if game is None:
+                    return jsonify({"error": "not_found"}), 404
+                etag = game_etag(game)
+                response = jsonify(game.region(x0, y0, x1, y1))
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"
+        return response
+
+    @app.get("/api/games/<game_id>/analysis")
+    def api_game_analysis(game_id: str):
+        if not numpy_available():
+            return jsonify({"error": "analysis requires numpy: pip install 'flexiboard[analysis]'"}), 501
+        game = GAMES.get(game_id)
+        if game is None:
+            return jsonify({"error": "not_found"}), 404
+        etag = game_etag(game)
+        if request.if_none_match.contains(etag):
+            response = app.response_class(status=304)
+        else:
+            with GAMES.locked(game_id) as game:
+                if game is None:
+                    return jsonify({"error": "not_found"}), 404
+                etag = game_etag(game)
+                try:
+                    body = ANALYSES.get_or_render(game.id, game.version, lambda: analysis_json(game))
+                except ValidationError as e:
+                    return jsonify({"error": str(e)}), 400
+            response = app.response_class(body, mimetype="application/json")
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"
+        return response
+
+    @app.get("/api/games/<game_id>/export")
+    def api_export_game(game_id: str):
+        compress = request.args.get("compress", "zlib") != "none"
+        with GAMES.locked(game_id) as game:
+            if game is None:
+                return jsonify({"error": "not_found"}), 404
+            # copy under the lock; encoding runs while the response streams
+            header = export_header(game)
+            history = game.state["history"].copy()
+            size = game.board.size
+        response = app.response_class(
+            iter_export(header, history, size, compress=compress),
+            mimetype="application/octet-stream",
+        )
+        response.headers["Content-Disposition"] = f'attachment; filename="{game_id}.fbx"'
+        return response
+
+    @app.get("/api/games/<game_id>/metrics")
+    def api_game_metrics(game_id: str):
         game = GAMES.get(game_id)
         if not game:
             return jsonify({"error": "not_found"}), 404
-        return jsonify(game.to_dict())
+        return jsonify({"game_id": game.id, "version": game.version, "lock": game.lock.stats()})
 
     @app.post("/api/games/<game_id>/move")
     def api_move(game_id: str):
@@ -346,45 +545,205 @@ def create_app() -> tuple[Flask, SocketIO]:
         if not game:
             return jsonify({"error": "not_found"}), 404
         data = request.get_json(force=True, silent=True) or {}
-        from_pos = tuple(data.get("from", []))
-        to_pos = tuple(data.get("to", []))
         player = data.get("player")
-        # MVP: accept any move inside board for rectangular or modulo-wrapped for quadsphere
         try:
-            x2, y2 = to_pos
-            if game.board.type == "rectangular" and not game.board.is_valid_position(x2, y2):
-                raise ValidationError("Move out of bounds")
-            if game.board.type == "quadsphere":
-                to_pos = game.board.normalize_pos(x2, y2)
-            # Append to history only
-            game.state.setdefault("history", []).append({
-                "from": list(from_pos),
-                "to": list(to_pos),
-                "player": player,
-            })
-            # notify via WS (must use socketio.emit in HTTP context)
-            socketio.emit("update", {"state": game.state}, room=game.id)
-            return jsonify({"state": game.state, "errors": None})
+            expected = parse_expected_version(request.headers.get("If-Match"), data.get("expected_version"))
+            from_pos = game.board.parse_square(data.get("from"))
+            to_pos = game.board.parse_square(data.get("to"))
+            with GAMES.locked(game_id) as game:
+                if game is None:
+                    return jsonify({"error": "not_found"}), 404
+                check_version(game, expected)
+                base = game_seq(game)
+                with rollback_on_error(game):
+                    play_move(game, from_pos, to_pos, player)
+                persist_move(game)
+                # notify via WS (inside the lock so deltas go out in version order)
+                broadcast_delta(game, base)
+                return jsonify({"state": game.state_dict(), "errors": None})
+        except VersionConflict as e:
+            return conflict_response(game, e)
+        except (ValidationError, IllegalMoveError, ValueError) as e:
+            return jsonify({"state": game.state_dict(), "errors": str(e)}), 400
         except Exception as e:  # keep simple for MVP
-            return jsonify({"state": game.state, "errors": str(e)})
+            return jsonify({"state": game.state_dict(), "errors": str(e)})
+
+    @app.post("/api/games/<game_id>/moves")
+    def api_moves(game_id: str):
+        game = GAMES.get(game_id)
+        if not game:
+            return jsonify({"error": "not_found"}), 404
+        data = request.get_json(force=True, silent=True) or {}
+        moves = data.get("moves")
+        index = None
+        try:
+            expected = parse_expected_version(request.headers.get("If-Match"), data.get("expected_version"))
+            if not isinstance(moves, list) or not moves:
+                raise ValidationError("Expected moves as a non-empty list")
+            if len(moves) > MAX_BATCH_MOVES:
+                raise ValidationError(f"At most {MAX_BATCH_MOVES} moves per batch")
+            batch = []
+            for index, move in enumerate(moves):
+                if not isinstance(move, dict):
+                    raise ValidationError("Expected moves as {from, to, player?} objects")
+                from_pos = game.board.parse_square(move.get("from"))
+                to_pos = game.board.parse_square(move.get("to"))
+                batch.append((from_pos, to_pos, move.get("player")))
+            index = None
+            with GAMES.locked(game_id) as game:
+                if game is None:
+                    return jsonify({"error": "not_found"}), 404
+                check_version(game, expected)
+                base = game_seq(game)
+                play_moves(game, batch)
+                persist_moves(game, len(batch))
+                # one delta for the whole batch
+                broadcast_delta(game, base)
+                return jsonify({"state": game.state_dict(), "applied": len(batch), "errors": None})
+        except VersionConflict as e:
+            return conflict_response(game, e)
+        except BatchMoveError as e:
+            return jsonify({"state": game.state_dict(), "applied": 0, "index": e.index, "errors": str(e.error)}), 400
+        except (ValidationError, IllegalMoveError, ValueError, TypeError) as e:
+            return jsonify({"state": game.state_dict(), "applied": 0, "index": index, "errors": str(e)}), 400
+
+    @app.get("/api/games/<game_id>/legal_moves")
+    def api_legal_moves(game_id: str):
+        with GAMES.locked(game_id) as game:
+            if game is None:
+                return jsonify({"error": "not_found"}), 404
+            player = request.args.get("player") or game.state.get("turn")
+            moves = generate_moves(game, player)
+        return jsonify({
+            "player": player,
+            "moves": [{"from": list(f), "to": list(t)} for f, t in moves],
+        })
+
+    @app.post("/api/games/<game_id>/ai_move")
+    def api_ai_move(game_id: str):
+        # the search stack (process pool, multiprocessing) is imported on the first AI move
+        from .search import DIFFICULTY_BUDGETS, SearchUnavailable, build_request, run_search
+
+        game = GAMES.get(game_id)
+        if not game:
+            return jsonify({"error": "not_found"}), 404
+        data = request.get_json(force=True, silent=True) or {}
+        player = data.get("player")
+        difficulty = data.get("difficulty") or (game.rules.players or {}).get("ai_difficulty") or "medium"
+        try:
+            expected = parse_expected_version(request.headers.get("If-Match"), data.get("expected_version"))
+            if difficulty not in DIFFICULTY_BUDGETS:
+                raise ValidationError(f"Invalid difficulty: {difficulty}")
+            with GAMES.locked(game_id) as game:
+                if game is None:
+                    return jsonify({"error": "not_found"}), 404
+                check_version(game, expected)
+                if game.state.get("status", "active") != "active":
+                    raise IllegalMoveError("Game is already finished")
+                if player is not None and player != game.state.get("turn"):
+                    raise IllegalMoveError(f"Not {player}'s turn")
+                searched_version = game.version
+                search_request = build_request(game)
+            # the search runs in a worker process without holding the game lock
+            result = run_search(search_request, difficulty)
+            if result.move is None:
+                raise IllegalMoveError("No legal moves available")
+            from_pos, to_pos = result.move
+            with GAMES.locked(game_id) as game:
+                if game is None:
+                    return jsonify({"error": "not_found"}), 404
+                # a move that landed during the search makes the result stale
+                check_version(game, searched_version)
+                base = game_seq(game)
+                with rollback_on_error(game):
+                    play_move(game, from_pos, to_pos, player)
+                persist_move(game)
+                broadcast_delta(game, base)
+                return jsonify({
+                    "state": game.state_dict(),
+                    "move": {
+                        "from": list(from_pos),
+                        "to": list(to_pos),
+                        "score": result.score,
+                        "depth": result.depth,
+                        "nodes": result.nodes,
+                    },
+                    "errors": None,
+                })
+        except VersionConflict as e:
+            return conflict_response(game, e)
+        except SearchUnavailable as e:
+            response = jsonify({"state": game.state_dict(), "errors": str(e)})
+            response.headers["Retry-After"] = "1"
+            return response, 503
+        except (ValidationError, IllegalMoveError, ValueError) as e:
+            return jsonify({"state": game.state_dict(), "errors": str(e)}), 400
 
     # -------- WebSocket --------
     @socketio.on("join")
+    @PROFILER.profiled
     def on_join(data):  # type: ignore[no-redef]
         game_id = data.get("game_id")
-        if game_id in GAMES:
+        with GAMES.locked(game_id) as game:
+            payload = snapshot_payload(game) if game is not None else None
+        if payload is not None:
             join_room(game_id)
-            emit("update", {"state": GAMES[game_id].state})
-        else:
+            emit("snapshot", payload)
+            return
+        remote = remote_snapshot(game_id)
+        if remote is None:
             emit("error", {"message": "game_not_found"})
+            return
+        # owned by another worker: deltas arrive here via pub/sub
+        join_room(game_id)
+        emit("snapshot", remote)
+
+    @socketio.on("resync")
+    @PROFILER.profiled
+    def on_resync(data):  # type: ignore[no-redef]
+        game_id = data.get("game_id")
+        with GAMES.locked(game_id) as game:
+            resync = resync_payload(game, data.get("since")) if game is not None else None
+        if resync is None:
+            remote = remote_snapshot(game_id)
+            if remote is None:
+                emit("error", {"message": "game_not_found"})
+            else:
+                emit("snapshot", remote)
+            return
+        event, payload = resync
+        emit(event, payload)
 
     return app, socketio
 
 
+def remote_snapshot(game_id: Any) -> Optional[Dict[str, Any]]:
+    if not isinstance(game_id, str) or SHARDS.owns(game_id):
+        return None
+    data = fetch_game(SHARDS, game_id)
+    if data is None:
+        return None
+    return {"game_id": game_id, "seq": len(data["state"].get("history", [])), "game": data}
+
+
+def serve_worker(shards: ShardConfig, listen_fd: int) -> None:
+    """Entry point of one forked worker in multi-worker mode."""
+    global SHARDS, PUBSUB
+    SHARDS = shards
+    PUBSUB = UnixSocketPubSub(shards.hub_socket)
+    app, _socketio = create_app()
+    serve_until_stopped(serve_shard, app, shards, listen_fd)
+
+
 def main() -> None:
-    app, socketio = create_app()
     port = int(os.environ.get("PORT", "8000"))
-    socketio.run(app, host="0.0.0.0", port=port, allow_unsafe_werkzeug=True)
+    workers = int(os.environ.get("FLEXIBOARD_WORKERS", "1"))
+    if workers > 1:
+        load_presets()
+        run_workers(workers, "0.0.0.0", port, serve_worker)
+        return
+    app, socketio = create_app()
+    serve_until_stopped(lambda: socketio.run(app, host="0.0.0.0", port=port, allow_unsafe_werkzeug=True))
 
 
 if __name__ == "__main__":
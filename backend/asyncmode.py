@@ -0,0 +1,86 @@
+"""Server concurrency mode, selected by ``FLEXIBOARD_ASYNC_MODE``.
+
+``threading`` (default) serves with Werkzeug threads: fine for development
+and a few hundred sockets. ``eventlet`` and ``gevent`` serve every connection
+from a green thread, so idle room members cost a few KB each and broadcasts
+never park an OS thread. Green modes need their package installed
+(``pip install eventlet`` / ``pip install gevent``) and monkey patch the
+standard library as soon as the ``backend`` package is imported, before Flask
+or any socket is created.
+"""
+
+from __future__ import annotations
+
+import os
+import socket
+from typing import Any, Callable, TypeVar
+
+ASYNC_MODES = ("threading", "eventlet", "gevent")
+
+T = TypeVar("T")
+
+
+def async_mode() -> str:
+    mode = os.environ.get("FLEXIBOARD_ASYNC_MODE", "threading")
+    if mode not in ASYNC_MODES:
+        raise ValueError(f"Invalid FLEXIBOARD_ASYNC_MODE: {mode} (expected one of {', '.join(ASYNC_MODES)})")
+    return mode
+
+
+def monkey_patch() -> None:
+    mode = async_mode()
+    if mode == "threading":
+        return
+    import multiprocessing
+
+    # AI search workers are separate processes that never serve sockets
+    if multiprocessing.parent_process() is not None:
+        return
+    if mode == "eventlet":
+        import eventlet
+
+        eventlet.monkey_patch()
+    elif mode == "gevent":
+        from gevent import monkey
+
+        monkey.patch_all()
+
+
+def run_blocking(fn: Callable[..., T], *args: Any) -> T:
+    """Run a blocking call (fsync, ...) without stalling the green-thread hub."""
+    mode = async_mode()
+    if mode == "eventlet":
+        from eventlet import tpool
+
+        return tpool.execute(fn, *args)
+    if mode == "gevent":
+        import gevent
+
+        return gevent.get_hub().threadpool.apply(fn, args)
+    return fn(*args)
+
+
+def serve_listener(app: Any, sock: socket.socket) -> None:
+    """Serve ``app`` forever on an already bound and listening socket."""
+    mode = async_mode()
+    if mode == "eventlet":
+        import eventlet.wsgi
+
+        eventlet.wsgi.server(sock, app, log_output=False)
+    elif mode == "gevent":
+        from gevent import pywsgi
+
+        try:
+            from geventwebsocket.handler import WebSocketHandler
+        except ImportError:  # simple-websocket handles the upgrade instead
+            pywsgi.WSGIServer(sock, app, log=None).serve_forever()
+        else:
+            pywsgi.WSGIServer(sock, app, handler_class=WebSocketHandler, log=None).serve_forever()
+    else:
+        from werkzeug.serving import make_server
+
+        if sock.family == socket.AF_UNIX:
+            host, port = "unix://" + sock.getsockname(), 0
+        else:
+            host, port = sock.getsockname()[:2]
+        make_server(host, port, app, threaded=True, fd=sock.fileno()).serve_forever()
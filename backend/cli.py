@@ -0,0 +1,19 @@
+"""Console entry point ``flexiboard``.
+
+Kept free of Flask, Socket.IO and PyYAML imports: AI search workers are
+spawned processes that re-import the launching script, so they import this
+module and ``backend.search`` only. The server itself is imported by
+``main``.
+"""
+
+from __future__ import annotations
+
+
+def main() -> None:
+    from .app import main as serve
+
+    serve()
+
+
+if __name__ == "__main__":
+    main()
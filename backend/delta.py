@@ -0,0 +1,66 @@
+"""Versioned room updates for the WebSocket protocol.
+
+A game's sequence number is the length of its (append-only) move history.
+``join`` sends one full ``snapshot``; every accepted move is broadcast as a
+``delta`` carrying only the new move records and the current contents of the
+squares they touched. A client whose local ``seq`` does not match a delta's
+``base`` asks for a ``resync`` from the ``seq`` it has.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
+
+if TYPE_CHECKING:
+    from .models import Game
+
+# beyond this many missed moves a fresh snapshot is cheaper than a delta
+RESYNC_SNAPSHOT_THRESHOLD = 256
+
+
+def game_seq(game: "Game") -> int:
+    return len(game.state.get("history", []))
+
+
+def state_meta(game: "Game") -> Dict[str, Any]:
+    return {k: v for k, v in game.state.items() if k != "history"}
+
+
+def snapshot_payload(game: "Game") -> Dict[str, Any]:
+    return {"game_id": game.id, "seq": game_seq(game), "game": game.to_dict()}
+
+
+def delta_payload(game: "Game", since: int) -> Dict[str, Any]:
+    moves = game.state.get("history", [])[since:]
+    touched: List[Tuple[int, int]] = []
+    teleports = game.board.teleports
+    width = game.board.size[0]
+    for move in moves:
+        squares = [tuple(move["from"]), tuple(move["to"])]
+        destination = teleports.get(move["to"][1] * width + move["to"][0])
+        if destination is not None:
+            # the piece may have continued to the end of the teleport chain
+            squares.append((destination % width, destination // width))
+        for sq in squares:
+            if sq not in touched:
+                touched.append(sq)  # type: ignore[arg-type]
+    squares = []
+    for x, y in touched:
+        piece = game.position.piece_at(x, y)
+        squares.append({"position": [x, y], "piece": piece.to_dict() if piece else None})
+    return {
+        "game_id": game.id,
+        "base": since,
+        "seq": since + len(moves),
+        "moves": moves,
+        "squares": squares,
+        "state": state_meta(game),
+    }
+
+
+def resync_payload(game: "Game", since: Any) -> Tuple[str, Dict[str, Any]]:
+    """Event name and payload bringing a client at ``since`` up to date."""
+    seq = game_seq(game)
+    if not isinstance(since, int) or not 0 <= since <= seq or seq - since > RESYNC_SNAPSHOT_THRESHOLD:
+        return "snapshot", snapshot_payload(game)
+    return "delta", delta_payload(game, since)
@@ -0,0 +1,125 @@
+"""Compact binary game export.
+
+Layout::
+
+    b"FBX1"  flags:u8                      (flags bit 0: rest is zlib-compressed)
+    header_len:u32  header:JSON            game without its history, plus
+                                           piece_types and initial_pieces
+    width:u8  count:u32                    bytes per square index, number of moves
+    count x (from:uint<width>, to:uint<width>)
+
+Integers are little-endian; a square index is ``y * board_width + x``. Player,
+piece, capture and promotion of every move follow from replaying the moves
+on the initial position, so only the two squares are stored: a 1000-move
+game on a board of up to 256 squares needs 2 KB before compression. The
+header carries the starting layout and the piece types, so ``replay_export``
+rebuilds the game from the file alone (its ``pieces`` and ``position_hash``
+are those after the last move, for checking). ``iter_export`` yields the
+file in chunks so a long game can be streamed without building it in memory.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+import zlib
+from typing import Any, Dict, Iterator, List, Tuple
+
+from .history import MoveHistory
+from .models import Game, initial_state
+from .movegen import replay_move
+
+MAGIC = b"FBX1"
+FLAG_ZLIB = 1
+
+# moves encoded per yielded chunk
+CHUNK_MOVES = 1024
+
+_INDEX_FORMATS = {1: "B", 2: "H", 4: "I"}
+
+Square = Tuple[int, int]
+
+
+def index_width(num_squares: int) -> int:
+    if num_squares <= 1 << 8:
+        return 1
+    if num_squares <= 1 << 16:
+        return 2
+    return 4
+
+
+def export_header(game: Game) -> Dict[str, Any]:
+    """Header of ``game``'s export; call it while holding the game's lock."""
+    return {
+        **game.to_dict(include_history=False),
+        "piece_types": game.piece_types,
+        "initial_pieces": game.initial_layout(),
+    }
+
+
+def iter_export(
+    header: Dict[str, Any],
+    history: MoveHistory,
+    board_size: Tuple[int, int],
+    compress: bool = False,
+) -> Iterator[bytes]:
+    """Encode ``header`` plus the moves of ``history``; ``history`` must not change meanwhile."""
+    width, height = board_size
+    num_squares = width * height
+    iw = index_width(num_squares)
+    fmt = "<" + _INDEX_FORMATS[iw]
+    count = len(history)
+
+    yield MAGIC + bytes([FLAG_ZLIB if compress else 0])
+    compressor = zlib.compressobj(9) if compress else None
+
+    def out(data: bytes) -> bytes:
+        return compressor.compress(data) if compressor is not None else data
+
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    yield out(struct.pack("<I", len(header_bytes)) + header_bytes + struct.pack("<BI", iw, count))
+    for start in range(0, count, CHUNK_MOVES):
+        indices: List[int] = []
+        for i in range(start, min(start + CHUNK_MOVES, count)):
+            (fx, fy), (tx, ty) = history.squares(i)
+            indices.append((fy % height) * width + fx % width)
+            indices.append((ty % height) * width + tx % width)
+        chunk = out(struct.pack(fmt[0] + fmt[1] * len(indices), *indices))
+        if chunk:
+            yield chunk
+    if compressor is not None:
+        yield compressor.flush()
+
+
+def read_export(data: bytes) -> Tuple[Dict[str, Any], List[Tuple[Square, Square]]]:
+    """Decode an export into its header and ``[((fx, fy), (tx, ty)), ...]``."""
+    if data[:4] != MAGIC:
+        raise ValueError("Not a FlexiBoard export")
+    body = data[5:]
+    if data[4] & FLAG_ZLIB:
+        body = zlib.decompress(body)
+    (header_len,) = struct.unpack_from("<I", body, 0)
+    header = json.loads(body[4 : 4 + header_len].decode("utf-8"))
+    iw, count = struct.unpack_from("<BI", body, 4 + header_len)
+    if iw not in _INDEX_FORMATS:
+        raise ValueError(f"Invalid square index width: {iw}")
+    offset = 4 + header_len + 5
+    indices = struct.unpack_from(f"<{2 * count}{_INDEX_FORMATS[iw]}", body, offset)
+    width = header["board"]["size"][0]
+    moves = [
+        ((indices[i] % width, indices[i] // width), (indices[i + 1] % width, indices[i + 1] // width))
+        for i in range(0, len(indices), 2)
+    ]
+    return header, moves
+
+
+def replay_export(data: bytes) -> Game:
+    """Rebuild a game from an export: its starting layout plus every move replayed."""
+    header, moves = read_export(data)
+    if header.get("initial_pieces") is None:
+        raise ValueError("Export has no initial layout to replay")
+    start = {**header, "pieces": header["initial_pieces"], "state": initial_state()}
+    game = Game.from_dict(start, header.get("piece_types") or {})
+    for from_pos, to_pos in moves:
+        replay_move(game, from_pos, to_pos)
+    return game
@@ -0,0 +1,125 @@
+"""Move history packed into a typed array.
+
+Each move is one fixed-width record of eight 32-bit ints::
+
+    from_x, from_y, to_x, to_y, player, piece, captured (-1 = none), promoted
+
+Player and piece-type names are stored as indices into a process-wide symbol
+table, so a move costs 32 bytes instead of a dict of lists and strings.
+``MoveHistory`` still reads like the list of record dicts it replaces
+(``len``, indexing, slicing, iteration, ``append``), and ``to_list()``
+produces the JSON form.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Union, overload
+
+RECORD_WIDTH = 8
+
+_symbols: List[str] = []
+_symbol_ids: Dict[str, int] = {}
+_symbols_lock = threading.Lock()
+
+
+def symbol_id(name: str) -> int:
+    sid = _symbol_ids.get(name)
+    if sid is None:
+        with _symbols_lock:
+            sid = _symbol_ids.get(name)
+            if sid is None:
+                sid = len(_symbols)
+                _symbols.append(sys.intern(name))
+                _symbol_ids[_symbols[sid]] = sid
+    return sid
+
+
+def symbol(sid: int) -> str:
+    return _symbols[sid]
+
+
+class MoveHistory:
+    __slots__ = ("_data",)
+
+    def __init__(self, records: Iterable[Dict[str, Any]] = ()) -> None:
+        self._data = array("i")
+        for record in records:
+            self.append(record)
+
+    def append(self, record: Dict[str, Any]) -> None:
+        captured = record.get("captured")
+        self._data.extend((
+            record["from"][0],
+            record["from"][1],
+            record["to"][0],
+            record["to"][1],
+            symbol_id(record["player"]),
+            symbol_id(record["piece"]),
+            -1 if captured is None else symbol_id(captured),
+            1 if record.get("promoted") else 0,
+        ))
+
+    def __len__(self) -> int:
+        return len(self._data) // RECORD_WIDTH
+
+    @overload
+    def __getitem__(self, index: int) -> Dict[str, Any]: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[Dict[str, Any]]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        if isinstance(index, slice):
+            return [self._record(i) for i in range(*index.indices(len(self)))]
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("history index out of range")
+        return self._record(index)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(len(self)):
+            yield self._record(i)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, MoveHistory):
+            return self._data == other._data
+        if isinstance(other, list):
+            return self.to_list() == other
+        return NotImplemented
+
+    def _record(self, i: int) -> Dict[str, Any]:
+        fx, fy, tx, ty, player, piece, captured, promoted = self._data[i * RECORD_WIDTH : (i + 1) * RECORD_WIDTH]
+        return {
+            "from": [fx, fy],
+            "to": [tx, ty],
+            "player": _symbols[player],
+            "piece": _symbols[piece],
+            "captured": None if captured < 0 else _symbols[captured],
+            "promoted": bool(promoted),
+        }
+
+    def squares(self, i: int) -> tuple:
+        """``((from_x, from_y), (to_x, to_y))`` of move ``i`` without building a dict."""
+        fx, fy, tx, ty = self._data[i * RECORD_WIDTH : i * RECORD_WIDTH + 4]
+        return (fx, fy), (tx, ty)
+
+    def truncate(self, length: int) -> None:
+        """Drop every move from index ``length`` on (used to roll back a rejected batch)."""
+        del self._data[length * RECORD_WIDTH :]
+
+    def copy(self) -> "MoveHistory":
+        clone = MoveHistory()
+        clone._data = array("i", self._data)
+        return clone
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        return [self._record(i) for i in range(len(self))]
+
+    @property
+    def nbytes(self) -> int:
+        return self._data.itemsize * len(self._data)
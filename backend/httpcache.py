@@ -0,0 +1,63 @@
+"""Serialized ``GET /api/games/<id>`` bodies, cached per game version.
+
+A game's version changes with every move, so ``(game id, version)``
+identifies one exact JSON body: the version doubles as the ETag, and a poll carrying a
+matching ``If-None-Match`` is answered 304 without serializing anything. The
+cache keeps one body per game in a bounded LRU; a stale version is simply
+replaced on the next render.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Dict, Tuple
+
+if TYPE_CHECKING:
+    from .models import Game
+
+
+def game_etag(game: "Game") -> str:
+    # the bare version, so the same value works as If-Match on a move (see locks.py)
+    return str(game.version)
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 4096) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[int, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_render(self, game_id: str, version: int, render: Callable[[], bytes]) -> bytes:
+        with self._lock:
+            entry = self._entries.get(game_id)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(game_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        body = render()
+        if self.max_entries > 0:
+            with self._lock:
+                self._entries[game_id] = (version, body)
+                self._entries.move_to_end(game_id)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return body
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_entries,
+                "bytes": sum(len(body) for _, body in self._entries.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+def default_cache_size() -> int:
+    return int(os.environ.get("FLEXIBOARD_RESPONSE_CACHE_SIZE", "4096"))
@@ -0,0 +1,83 @@
+"""Per-game mutual exclusion with contention accounting.
+
+Each game owns one lock, so moves on unrelated games never wait on each
+other. The counters are only written while the lock is held, so they need no
+extra synchronization.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+class GameLock:
+    __slots__ = ("_lock", "acquisitions", "contended", "wait_seconds", "max_wait_seconds", "retired")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.acquisitions = 0
+        self.contended = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        # set when the game was evicted from memory; this object is stale from then on
+        self.retired = False
+
+    def __enter__(self) -> "GameLock":
+        if not self._lock.acquire(blocking=False):
+            start = time.perf_counter()
+            self._lock.acquire()
+            waited = time.perf_counter() - start
+            self.contended += 1
+            self.wait_seconds += waited
+            if waited > self.max_wait_seconds:
+                self.max_wait_seconds = waited
+        self.acquisitions += 1
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._lock.release()
+
+    def try_acquire(self) -> bool:
+        # not counted: used by housekeeping, not by requests
+        return self._lock.acquire(blocking=False)
+
+    def release(self) -> None:
+        self._lock.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "acquisitions": self.acquisitions,
+            "contended": self.contended,
+            "contention_ratio": self.contended / self.acquisitions if self.acquisitions else 0.0,
+            "wait_seconds_total": self.wait_seconds,
+            "wait_seconds_max": self.max_wait_seconds,
+        }
+
+
+class VersionConflict(Exception):
+    def __init__(self, expected: int, current: int) -> None:
+        super().__init__(f"Version conflict: expected {expected}, current {current}")
+        self.expected = expected
+        self.current = current
+
+
+def parse_expected_version(header: Optional[str], body_value: Any) -> Optional[int]:
+    """Expected game version from ``expected_version`` in the body or an ``If-Match`` header.
+
+    ``If-Match`` accepts ETag syntax (``"7"``, ``W/"7"``); ``*`` means any version.
+    Raises ValueError on anything that is not a version number.
+    """
+    if body_value is not None:
+        if isinstance(body_value, bool) or not isinstance(body_value, int):
+            raise ValueError(f"Invalid expected_version: {body_value!r}")
+        return body_value
+    if header is None:
+        return None
+    value = header.strip()
+    if value == "*":
+        return None
+    if value.startswith("W/"):
+        value = value[2:]
+    return int(value.strip('"'))
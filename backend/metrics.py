@@ -0,0 +1,164 @@
+"""Process-wide instrumentation rendered in the Prometheus text format.
+
+Recording a value is a bisect plus two additions under a lock, so the
+request and broadcast hooks can stay on permanently. Gauges whose value
+already lives elsewhere (registry size, Socket.IO rooms, history lengths) are
+computed by collector callbacks only when ``/api/metrics`` is scraped.
+
+In multi-worker mode every worker keeps its own numbers; samples carry a
+``worker`` label so scrapes of different workers can be told apart.
+"""
+
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+BYTES_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 65536)
+LENGTH_BUCKETS = (0, 10, 25, 50, 100, 200, 500, 1000, 2000, 5000)
+
+Labels = Tuple[Tuple[str, str], ...]
+# (metric name, type, help, [(sample suffix, labels, value)])
+Family = Tuple[str, str, str, List[Tuple[str, Labels, float]]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def histogram_samples(buckets: Sequence[float], counts: Sequence[int], total: float, labels: Labels) -> List[Tuple[str, Labels, float]]:
+    """Cumulative ``_bucket``/``_sum``/``_count`` samples from per-bucket counts (last = +Inf)."""
+    samples = []
+    cumulative = 0
+    for bound, count in zip(list(buckets) + [float("inf")], counts):
+        cumulative += count
+        samples.append(("_bucket", labels + (("le", _format_value(bound)),), cumulative))
+    samples.append(("_sum", labels, total))
+    samples.append(("_count", labels, cumulative))
+    return samples
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: Sequence[float], labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.labelnames = tuple(labelnames)
+        # label values -> (per-bucket counts, sum)
+        self._series: Dict[Tuple[str, ...], List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def collect(self) -> Family:
+        with self._lock:
+            snapshot = [(lv, list(counts), total) for lv, (counts, total) in self._series.items()]
+        samples = []
+        for labelvalues, counts, total in snapshot:
+            samples.extend(histogram_samples(self.buckets, counts, total, tuple(zip(self.labelnames, labelvalues))))
+        return self.name, "histogram", self.help, samples
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, *labelvalues: str) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def collect(self) -> Family:
+        with self._lock:
+            items = list(self._values.items())
+        samples = [("", tuple(zip(self.labelnames, lv)), value) for lv, value in items]
+        return self.name, "counter", self.help, samples
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: List = []
+        self._collectors: Dict[str, Callable[[], Iterable[Family]]] = {}
+        self.const_labels: Labels = ()
+
+    def histogram(self, name: str, help: str, buckets: Sequence[float], labelnames: Sequence[str] = ()) -> Histogram:
+        metric = Histogram(name, help, buckets, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, help, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, key: str, collector: Callable[[], Iterable[Family]]) -> None:
+        """Register a callback producing families at scrape time (replaces one under ``key``)."""
+        self._collectors[key] = collector
+
+    def render(self) -> str:
+        families: List[Family] = [metric.collect() for metric in self._metrics]
+        for collector in list(self._collectors.values()):
+            families.extend(collector())
+        lines = []
+        for name, kind, help, samples in families:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for suffix, labels, value in samples:
+                lines.append(f"{name}{suffix}{_format_labels(self.const_labels + labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def gauge(name: str, help: str, value: float, labels: Optional[Labels] = None) -> Family:
+    return name, "gauge", help, [("", labels or (), value)]
+
+
+METRICS = MetricsRegistry()
+
+REQUEST_SECONDS = METRICS.histogram(
+    "flexiboard_request_duration_seconds", "HTTP API request latency by route", LATENCY_BUCKETS, ("route",)
+)
+YAML_PARSE_SECONDS = METRICS.histogram(
+    "flexiboard_yaml_parse_seconds", "YAML parsing time of uncached rule sets", LATENCY_BUCKETS
+)
+VALIDATION_SECONDS = METRICS.histogram(
+    "flexiboard_validation_seconds", "Settings validation time of uncached rule sets", LATENCY_BUCKETS
+)
+EMIT_BYTES = METRICS.histogram(
+    "flexiboard_emit_payload_bytes",
+    "JSON size of one room broadcast (every FLEXIBOARD_EMIT_SIZE_SAMPLE-th per event)",
+    BYTES_BUCKETS,
+    ("event",),
+)
+EMIT_BYTES_TOTAL = METRICS.counter(
+    "flexiboard_emitted_bytes_total",
+    "Payload bytes sent to room members (last measured size x recipients)",
+    ("event",),
+)
@@ -0,0 +1,611 @@
+"""Game models, settings validation and rule set compilation.
+
+Everything here is plain Python with no Flask or Socket.IO dependency, so the
+server (``backend.app``, which re-exports these names) and headless tools such
+as ``backend.simulate`` share the exact same models and validation.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import time
+from dataclasses import InitVar, asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from .history import MoveHistory
+from .locks import GameLock
+from .metrics import VALIDATION_SECONDS, YAML_PARSE_SECONDS
+from .position import Position
+from .sparse import SparsePosition, is_sparse
+from .rulesets import load_yaml
+from .victory import VictoryConditions, VictoryTracker, compile_victory, square_list
+from .zobrist import side_key
+
+# -----------------------------
+# Models (minimal viable set)
+# -----------------------------
+
+
+@dataclass(slots=True)
+class SpecialSquare:
+    position: Tuple[int, int]
+    effect: str
+    value: Any | None = None
+
+
+@dataclass(slots=True)
+class Obstacle:
+    position: Tuple[int, int]
+    type: str
+
+
+@dataclass(slots=True)
+class Cell:
+    # everything on one square; only squares with a feature get a Cell
+    effect: Optional[str] = None
+    value: Any = None
+    obstacle: Optional[str] = None
+    # last square of the teleport chain starting here
+    destination: Optional[Tuple[int, int]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {}
+        if self.effect is not None:
+            data["effect"] = self.effect
+            data["value"] = self.value
+        if self.obstacle is not None:
+            data["obstacle"] = self.obstacle
+        if self.destination is not None:
+            data["destination"] = list(self.destination)
+        return data
+
+
+@dataclass(slots=True)
+class Board:
+    type: str
+    size: Tuple[int, int]
+    special_squares: List[SpecialSquare]
+    obstacles: List[Obstacle]
+    # square index (y * width + x, normalized) -> Cell, compiled from the two lists
+    cells: Dict[int, Cell] = field(init=False, repr=False, compare=False)
+    # square index -> final square index, for every teleport square
+    teleports: Dict[int, int] = field(init=False, repr=False, compare=False)
+    # large enough that nothing may be allocated per square (backend.sparse); fixed at creation
+    sparse: bool = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.sparse = is_sparse(self.size[0], self.size[1], self.type)
+        self.cells = {}
+        for square in self.special_squares:
+            cell = self._cell(square.position)
+            cell.effect, cell.value = square.effect, square.value
+        for obstacle in self.obstacles:
+            self._cell(obstacle.position).obstacle = obstacle.type
+        width = self.size[0]
+        self.teleports = resolve_teleports(
+            {sq: self.index(*cell.value) for sq, cell in self.cells.items() if cell.effect == "teleport"}, width
+        )
+        for sq, dest in self.teleports.items():
+            self.cells[sq].destination = (dest % width, dest // width)
+
+    def _cell(self, position: Tuple[int, int]) -> Cell:
+        sq = self.index(*position)
+        cell = self.cells.get(sq)
+        if cell is None:
+            cell = self.cells[sq] = Cell()
+        return cell
+
+    def index(self, x: int, y: int) -> int:
+        x, y = self.normalize_pos(x, y)
+        return y * self.size[0] + x
+
+    def in_window(self, x: int, y: int, x0: int, y0: int, x1: int, y1: int) -> bool:
+        """Whether (x, y) lies in the half-open window [x0, x1) x [y0, y1); windows wrap on quadsphere."""
+        if self.type == "quadsphere":
+            width, height = self.size
+            return (x - x0) % width < x1 - x0 and (y - y0) % height < y1 - y0
+        return x0 <= x < x1 and y0 <= y < y1
+
+    def new_position(self, pieces: List["Piece"]) -> Position | SparsePosition:
+        if self.sparse:
+            return SparsePosition.from_board(self, pieces)
+        return Position.from_board(self, pieces)
+
+    def cell_at(self, x: int, y: int) -> Optional[Cell]:
+        return self.cells.get(self.index(x, y))
+
+    def is_valid_position(self, x: int, y: int) -> bool:
+        width, height = self.size
+        if self.type == "rectangular":
+            return 0 <= x < width and 0 <= y < height
+        # quadsphere: allow any integer, valid by modulo wrap
+        return isinstance(x, int) and isinstance(y, int)
+
+    def parse_square(self, value: Any) -> Tuple[int, int]:
+        """A client's ``[x, y]`` as an on-board square (wrapped on quadsphere); ValidationError otherwise."""
+        if (
+            not isinstance(value, (list, tuple))
+            or len(value) != 2
+            or not all(isinstance(c, int) and not isinstance(c, bool) for c in value)
+        ):
+            raise ValidationError("Expected from/to as [x, y] integers")
+        if not self.is_valid_position(*value):
+            raise ValidationError(f"Square {list(value)} is off the board")
+        return self.normalize_pos(*value)
+
+    def normalize_pos(self, x: int, y: int) -> Tuple[int, int]:
+        width, height = self.size
+        if self.type == "rectangular":
+            return x, y
+        # wrap on both axes
+        return (x % width, y % height)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "type": self.type,
+            "size": list(self.size),
+            "special_squares": [asdict(s) for s in self.special_squares],
+            "obstacles": [asdict(o) for o in self.obstacles],
+            # clients of sparse boards render a window (GET /api/games/<id>/region)
+            "sparse": self.sparse,
+            # per-square lookup for clients: {"<y * width + x>": {effect, value, obstacle, destination}}
+            "cells": {str(sq): cell.to_dict() for sq, cell in sorted(self.cells.items())},
+        }
+
+
+def resolve_teleports(teleports: Dict[int, int], width: int) -> Dict[int, int]:
+    """Follow every teleport chain to its last square; ValueError on a cycle."""
+    resolved: Dict[int, int] = {}
+    for start in teleports:
+        path = []
+        on_path = set()
+        sq = start
+        while sq in teleports and sq not in resolved:
+            if sq in on_path:
+                raise ValueError(f"Teleport cycle through {[sq % width, sq // width]}")
+            path.append(sq)
+            on_path.add(sq)
+            sq = teleports[sq]
+        final = resolved.get(sq, sq)
+        for step in path:
+            resolved[step] = final
+    return resolved
+
+
+@dataclass(slots=True)
+class Piece:
+    type: str
+    position: Tuple[int, int]
+    owner: str
+    promoted: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "type": self.type,
+            "position": list(self.position),
+            "owner": self.owner,
+            "promoted": self.promoted,
+        }
+
+
+@dataclass(slots=True)
+class Rules:
+    turn_system: str
+    victory_conditions: List[Dict[str, Any]]
+    draw_conditions: Dict[str, Any] | None
+    piece_reuse: str | None
+    reuse_rules: Dict[str, Any] | None
+    time_limit: Dict[str, Any] | None
+    players: Dict[str, Any]
+
+
+@dataclass(slots=True)
+class Game:
+    id: str
+    board: Board
+    pieces: List[Piece]
+    rules: Rules
+    players: List[Dict[str, Any]]
+    state: Dict[str, Any]
+    piece_types: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    # initial position of the rule set; cloned instead of rebuilt from the pieces
+    template: InitVar[Optional[Position | SparsePosition]] = None
+    # compiled victory conditions of the rule set; compiled here when not given
+    conditions: InitVar[Optional[VictoryConditions]] = None
+    position: Position | SparsePosition = field(init=False, repr=False, compare=False)
+    # counters the victory conditions are evaluated from; movegen keeps them in sync
+    victory: VictoryTracker = field(init=False, repr=False, compare=False)
+    # Zobrist hash -> number of times the position occurred (repetition draws)
+    repetitions: Dict[int, int] = field(init=False, repr=False, compare=False)
+    # guards every read-modify-write of this game (not of other games)
+    lock: GameLock = field(init=False, repr=False, compare=False)
+    # board + rules JSON fragment; both never change, so it is built once per rule set
+    static_json: Optional[str] = field(default=None, repr=False, compare=False)
+    # starting layout (the rule set's, shared); None when restored from a snapshot that predates it
+    initial_pieces: Optional[List[Tuple[str, Tuple[int, int], str, bool]]] = field(
+        default=None, repr=False, compare=False
+    )
+
+    def __post_init__(
+        self, template: Optional[Position | SparsePosition], conditions: Optional[VictoryConditions]
+    ) -> None:
+        # bitboard (or, on huge boards, hashed) view of self.pieces; movegen keeps both in sync
+        if template is not None:
+            self.position = template.clone(self.pieces)
+        else:
+            self.position = self.board.new_position(self.pieces)
+        if conditions is None:
+            conditions = compile_victory(self.rules, self.board, self.piece_types)
+        self.victory = VictoryTracker(conditions, self.pieces, self.board)
+        self.repetitions = {self.zobrist: 1}
+        self.lock = GameLock()
+
+    @property
+    def version(self) -> int:
+        return self.state.get("version", 0)
+
+    @property
+    def zobrist(self) -> int:
+        # piece placement plus side to move; usable as a cache/TT key
+        return self.position.hash ^ side_key(self.state.get("turn", ""))
+
+    def to_dict(self, include_history: bool = True) -> Dict[str, Any]:
+        return {
+            "game_id": self.id,
+            "board": self.board.to_dict(),
+            "pieces": [p.to_dict() for p in self.pieces],
+            "rules": asdict(self.rules),
+            "players": self.players,
+            "state": self.state_dict(include_history),
+            "position_hash": f"{self.zobrist:016x}",
+        }
+
+    def initial_layout(self) -> Optional[List[Dict[str, Any]]]:
+        """JSON form of the starting pieces (None if unknown), for replaying the history."""
+        if self.initial_pieces is None:
+            return None if self.state["history"] else [p.to_dict() for p in self.pieces]
+        return [Piece(t, pos, owner, promoted).to_dict() for t, pos, owner, promoted in self.initial_pieces]
+
+    def to_json(self, include_history: bool = True) -> bytes:
+        """``to_dict()`` as JSON; only the pieces and state are serialized per call."""
+        if self.static_json is None:
+            self.static_json = static_json(self.board, self.rules)
+        dynamic = json.dumps(
+            {
+                "game_id": self.id,
+                "pieces": [p.to_dict() for p in self.pieces],
+                "players": self.players,
+                "state": self.state_dict(include_history),
+                "position_hash": f"{self.zobrist:016x}",
+            },
+            separators=(",", ":"),
+        )
+        return (dynamic[:-1] + "," + self.static_json + "}").encode("utf-8")
+
+    def region(self, x0: int, y0: int, x1: int, y1: int) -> Dict[str, Any]:
+        """Pieces and board features inside a window; cost follows pieces + features, not the area."""
+        board = self.board
+        width = board.size[0]
+        cells = []
+        for sq, cell in board.cells.items():
+            x, y = sq % width, sq // width
+            if board.in_window(x, y, x0, y0, x1, y1):
+                cells.append({"position": [x, y], **cell.to_dict()})
+        return {
+            "game_id": self.id,
+            "version": self.version,
+            "seq": len(self.state["history"]),
+            "region": [x0, y0, x1, y1],
+            "pieces": [p.to_dict() for p in self.pieces if board.in_window(*p.position, x0, y0, x1, y1)],
+            "cells": cells,
+        }
+
+    def state_dict(self, include_history: bool = True) -> Dict[str, Any]:
+        # JSON form of self.state (the history is kept packed in memory);
+        # without the history, "seq" tells how many moves /history can page through
+        if not include_history:
+            return {**{k: v for k, v in self.state.items() if k != "history"}, "seq": len(self.state["history"])}
+        return {**self.state, "history": self.state["history"].to_list()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], piece_types: Dict[str, Dict[str, Any]]) -> "Game":
+        board = data["board"]
+        state = dict(data["state"])
+        state["history"] = MoveHistory(state.get("history") or [])
+        initial = data.get("initial_pieces")
+        return cls(
+            id=data["game_id"],
+            board=Board(
+                type=board["type"],
+                size=tuple(board["size"]),  # type: ignore[arg-type]
+                special_squares=[
+                    SpecialSquare(tuple(s["position"]), s["effect"], s.get("value"))  # type: ignore[arg-type]
+                    for s in board["special_squares"]
+                ],
+                obstacles=[Obstacle(tuple(o["position"]), o["type"]) for o in board["obstacles"]],  # type: ignore[arg-type]
+            ),
+            pieces=[
+                Piece(sys.intern(p["type"]), tuple(p["position"]), sys.intern(p["owner"]), p["promoted"])  # type: ignore[arg-type]
+                for p in data["pieces"]
+            ],
+            rules=Rules(**data["rules"]),
+            players=data["players"],
+            state=state,
+            piece_types=piece_types,
+            initial_pieces=None if initial is None else [
+                (sys.intern(p["type"]), tuple(p["position"]), sys.intern(p["owner"]), p["promoted"]) for p in initial
+            ],
+        )
+
+
+def static_json(board: Board, rules: Rules) -> str:
+    # '"board":{...},"rules":{...}' without the outer braces; interned so games
+    # rebuilt from disk share one copy per rule set as well
+    fragment = json.dumps({"board": board.to_dict(), "rules": asdict(rules)}, separators=(",", ":"))
+    return sys.intern(fragment[1:-1])
+
+
+# -----------------------------
+# Validation utilities
+# -----------------------------
+
+
+class ValidationError(Exception):
+    pass
+
+
+def validate_board(board_data: Dict[str, Any]) -> None:
+    board_type = board_data.get("board_type", "rectangular")
+    if board_type not in ["rectangular", "quadsphere"]:
+        raise ValidationError(f"Invalid board_type: {board_type}")
+
+    board_size = board_data.get("board_size")
+    if (
+        not isinstance(board_size, list)
+        or len(board_size) != 2
+        or not all(isinstance(x, int) and x > 0 for x in board_size)
+    ):
+        raise ValidationError("Invalid board_size: Expected [width, height] with positive integers")
+
+    width, height = board_size
+    for square in board_data.get("special_squares", []) or []:
+        position = square.get("position")
+        if not (isinstance(position, list) and len(position) == 2 and all(isinstance(x, int) for x in position)):
+            raise ValidationError(f"Invalid position in special_squares: {position}")
+        if board_type == "rectangular" and not (0 <= position[0] < width and 0 <= position[1] < height):
+            raise ValidationError(f"Position {position} out of bounds for board size {board_size}")
+        if square.get("effect") not in ["teleport", "damage", "bonus", "block"]:
+            raise ValidationError(f"Invalid effect in special_squares: {square.get('effect')}")
+        if square.get("effect") == "teleport":
+            value = square.get("value")
+            if not (isinstance(value, list) and len(value) == 2 and all(isinstance(v, int) for v in value)) or (
+                board_type == "rectangular" and not (0 <= value[0] < width and 0 <= value[1] < height)
+            ):
+                raise ValidationError(f"Invalid teleport target: {value}")
+
+    for obstacle in board_data.get("obstacles", []) or []:
+        position = obstacle.get("position")
+        if not (isinstance(position, list) and len(position) == 2 and all(isinstance(x, int) for x in position)):
+            raise ValidationError(f"Invalid position in obstacles: {position}")
+        if board_type == "rectangular" and not (0 <= position[0] < width and 0 <= position[1] < height):
+            raise ValidationError(f"Obstacle position {position} out of bounds for board size {board_size}")
+
+    # chains are resolved once per board (Board.teleports); a cycle would never end
+    def square(position: List[int]) -> int:
+        x, y = position
+        if board_type == "quadsphere":
+            x, y = x % width, y % height
+        return y * width + x
+
+    teleports = {
+        square(s["position"]): square(s["value"])
+        for s in board_data.get("special_squares", []) or []
+        if s.get("effect") == "teleport"
+    }
+    try:
+        resolve_teleports(teleports, width)
+    except ValueError as e:
+        raise ValidationError(str(e)) from e
+
+
+def validate_pieces(pieces_data: Dict[str, Any], board_size: List[int], board_type: str) -> None:
+    width, height = board_size
+    piece_types = pieces_data.get("piece_types", []) or []
+    seen_names = set()
+
+    for pt in piece_types:
+        name = pt.get("name")
+        if not name or name in seen_names:
+            raise ValidationError(f"Duplicate or missing piece type name: {name}")
+        seen_names.add(name)
+
+        movement = pt.get("movement")
+        valid_patterns = [
+            "adjacent",
+            "horizontal_vertical_unlimited",
+            "diagonal_unlimited",
+            "knight",
+            "forward_1",
+            "custom",
+        ]
+        if isinstance(movement, list):
+            ok = all(
+                isinstance(m, list) and len(m) == 2 and all(isinstance(x, int) for x in m)
+                for m in movement
+            )
+            if not ok:
+                raise ValidationError(f"Invalid movement coordinates for {name}: {movement}")
+        elif movement not in valid_patterns:
+            raise ValidationError(f"Invalid movement pattern for {name}: {movement}")
+
+        # points for capturing a piece of this type (victory "score" condition)
+        points = pt.get("points", 1)
+        if not (isinstance(points, (int, float)) and not isinstance(points, bool)):
+            raise ValidationError(f"Invalid points for {name}: {points}")
+
+        if pt.get("promotion"):
+            new_type = pt["promotion"].get("new_type")
+            if new_type and not any(pt2["name"] == new_type for pt2 in piece_types):
+                raise ValidationError(f"Unknown promotion new_type: {new_type}")
+            zone = pt["promotion"].get("zone")
+            if zone not in ["enemy_back_row", "enemy_territory", "specific_square"]:
+                raise ValidationError(f"Invalid promotion zone: {zone}")
+
+    seen_positions = set()
+    initial_positions = pieces_data.get("initial_positions", {}) or {}
+    for _player_id, pieces in initial_positions.items():
+        for piece in pieces:
+            if piece.get("type") not in seen_names:
+                raise ValidationError(f"Unknown piece type in initial_positions: {piece.get('type')}")
+            position = piece.get("position")
+            if not (isinstance(position, list) and len(position) == 2):
+                raise ValidationError(f"Invalid initial position: {position}")
+            x, y = position
+            if not (isinstance(x, int) and isinstance(y, int)):
+                raise ValidationError(f"Non-integer position for piece {piece.get('type')}: {position}")
+            if board_type == "rectangular" and not (0 <= x < width and 0 <= y < height):
+                raise ValidationError(f"Position {position} out of bounds for board size {board_size}")
+            pos_tuple = (x, y)
+            if pos_tuple in seen_positions:
+                raise ValidationError(f"Duplicate position {position} found")
+            seen_positions.add(pos_tuple)
+
+
+def validate_rules(
+    rules_data: Dict[str, Any],
+    piece_types: List[Dict[str, Any]],
+    board_size: Optional[List[int]] = None,
+    board_type: str = "rectangular",
+) -> None:
+    if rules_data.get("turn_system") != "alternate":
+        raise ValidationError(f"Invalid turn_system: {rules_data.get('turn_system')}")
+
+    valid_conditions = ["capture_king", "eliminate_all", "control_center", "reach_square", "score"]
+    for condition in rules_data.get("victory_conditions", []) or []:
+        kind, value = condition.get("type"), condition.get("value")
+        if kind not in valid_conditions:
+            raise ValidationError(f"Invalid victory condition: {kind}")
+        if kind == "capture_king" and value not in [pt["name"] for pt in piece_types]:
+            raise ValidationError(f"Unknown piece type in victory condition: {value}")
+        if kind == "reach_square" or (kind == "control_center" and value is not None):
+            squares = square_list(value)
+            if not squares:
+                raise ValidationError(f"Invalid squares in {kind}: {value}")
+            if board_size is not None and board_type == "rectangular":
+                width, height = board_size
+                for x, y in squares:
+                    if not (0 <= x < width and 0 <= y < height):
+                        raise ValidationError(f"{kind} square {[x, y]} out of bounds for board size {board_size}")
+        if kind == "score" and not (isinstance(value, (int, float)) and not isinstance(value, bool) and value > 0):
+            raise ValidationError(f"Invalid score target: {value}")
+
+    draw_conditions = rules_data.get("draw_conditions")
+    if draw_conditions is not None:
+        if not isinstance(draw_conditions, dict):
+            raise ValidationError(f"Invalid draw_conditions: {draw_conditions}")
+        repetition = draw_conditions.get("repetition")
+        if repetition is not None and not (isinstance(repetition, int) and not isinstance(repetition, bool) and repetition > 0):
+            raise ValidationError(f"Invalid repetition count: {repetition}")
+
+    if rules_data.get("piece_reuse") == "on" and not rules_data.get("reuse_rules"):
+        raise ValidationError("reuse_rules is required when piece_reuse is 'on'")
+
+
+def validate_settings(board: Dict[str, Any], pieces: Dict[str, Any], rules: Dict[str, Any]) -> None:
+    validate_board(board)
+    validate_pieces(pieces, board["board_size"], board.get("board_type", "rectangular"))
+    validate_rules(rules, pieces.get("piece_types", []) or [], board["board_size"], board.get("board_type", "rectangular"))
+
+
+# -----------------------------
+# Rule sets
+# -----------------------------
+
+
+@dataclass
+class CompiledRuleset:
+    # shared by every game created from the same YAML triple; treat as read-only
+    board: Board
+    piece_types: Dict[str, Dict[str, Any]]
+    rules: Rules
+    initial_pieces: List[Tuple[str, Tuple[int, int], str, bool]]
+    position: Position | SparsePosition
+    static_json: str
+    victory: VictoryConditions
+
+
+
+def compile_ruleset(board_yaml: str, pieces_yaml: str, rules_yaml: str) -> CompiledRuleset:
+    start = time.perf_counter()
+    board_data = load_yaml(board_yaml) or {}
+    pieces_data = load_yaml(pieces_yaml) or {}
+    rules_data = load_yaml(rules_yaml) or {}
+    parsed = time.perf_counter()
+    YAML_PARSE_SECONDS.observe(parsed - start)
+
+    validate_settings(board_data, pieces_data, rules_data)
+    VALIDATION_SECONDS.observe(time.perf_counter() - parsed)
+
+    width, height = board_data["board_size"]
+    board = Board(
+        type=board_data.get("board_type", "rectangular"),
+        size=(width, height),
+        special_squares=[
+            SpecialSquare(tuple(s["position"]), s["effect"], s.get("value"))
+            for s in (board_data.get("special_squares") or [])
+        ],
+        obstacles=[Obstacle(tuple(o["position"]), o["type"]) for o in (board_data.get("obstacles") or [])],
+    )
+
+    initial_pieces: List[Tuple[str, Tuple[int, int], str, bool]] = []
+    initial_positions = pieces_data.get("initial_positions", {}) or {}
+    for player_id, plist in initial_positions.items():
+        for p in plist:
+            # interned: every game's pieces share these strings
+            initial_pieces.append(
+                (sys.intern(p["type"]), board.normalize_pos(*p["position"]), sys.intern(player_id), bool(p.get("promoted", False)))
+            )
+
+    rules = Rules(
+        turn_system=rules_data.get("turn_system", "alternate"),
+        victory_conditions=rules_data.get("victory_conditions", []) or [],
+        draw_conditions=rules_data.get("draw_conditions"),
+        piece_reuse=rules_data.get("piece_reuse"),
+        reuse_rules=rules_data.get("reuse_rules"),
+        time_limit=rules_data.get("time_limit"),
+        players=rules_data.get("players", {"number": 2}),
+    )
+
+    piece_types = {pt["name"]: pt for pt in (pieces_data.get("piece_types") or [])}
+    return CompiledRuleset(
+        board=board,
+        piece_types=piece_types,
+        rules=rules,
+        initial_pieces=initial_pieces,
+        position=board.new_position([Piece(t, pos, owner, promoted) for t, pos, owner, promoted in initial_pieces]),
+        static_json=static_json(board, rules),
+        victory=compile_victory(rules, board, piece_types),
+    )
+
+
+def initial_state() -> Dict[str, Any]:
+    return {"turn": "player_1", "history": MoveHistory(), "status": "active", "version": 0}
+
+
+def new_game(ruleset: CompiledRuleset, game_id: str) -> Game:
+    """A fresh game in the rule set's initial position (not registered anywhere)."""
+    return Game(
+        id=game_id,
+        board=ruleset.board,
+        # only the position is per-game; board, rules and piece types are shared
+        pieces=[Piece(t, pos, owner, promoted) for t, pos, owner, promoted in ruleset.initial_pieces],
+        rules=ruleset.rules,
+        players=[],
+        state=initial_state(),
+        piece_types=ruleset.piece_types,
+        template=ruleset.position,
+        conditions=ruleset.victory,
+        static_json=ruleset.static_json,
+        initial_pieces=ruleset.initial_pieces,
+    )
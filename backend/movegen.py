@@ -0,0 +1,446 @@
+"""Server-side move generation.
+
+``piece_types[*].movement`` patterns are compiled into per-square step/ray
+tables once per board geometry (type, size, blocked squares) and shared by
+every game on that geometry. Occupancy comes from the game's bitboard
+``Position``, so legality checks are table lookups plus mask tests.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, Hashable, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .models import Game, Piece
+    from .position import Position
+    from .sparse import SparsePosition
+
+
+Square = Tuple[int, int]
+Offset = Tuple[int, int]
+
+
+ADJACENT: Tuple[Offset, ...] = ((-1, -1), (0, -1), (1, -1), (-1, 0), (1, 0), (-1, 1), (0, 1), (1, 1))
+ORTHOGONAL: Tuple[Offset, ...] = ((1, 0), (-1, 0), (0, 1), (0, -1))
+DIAGONAL: Tuple[Offset, ...] = ((1, 1), (-1, 1), (1, -1), (-1, -1))
+KNIGHT: Tuple[Offset, ...] = ((1, 2), (2, 1), (2, -1), (1, -2), (-1, -2), (-2, -1), (-2, 1), (-1, 2))
+
+STEP_PATTERNS: Dict[str, Tuple[Offset, ...]] = {
+    "adjacent": ADJACENT,
+    "knight": KNIGHT,
+    # "custom" needs scripted movement, which the server does not run yet
+    "custom": (),
+}
+RAY_PATTERNS: Dict[str, Tuple[Offset, ...]] = {
+    "horizontal_vertical_unlimited": ORTHOGONAL,
+    "diagonal_unlimited": DIAGONAL,
+}
+
+
+class IllegalMoveError(Exception):
+    pass
+
+
+class BatchMoveError(IllegalMoveError):
+    """Move ``index`` of a batch was rejected; none of the batch was applied."""
+
+    def __init__(self, index: int, error: Exception) -> None:
+        super().__init__(f"Move {index}: {error}")
+        self.index = index
+        self.error = error
+
+
+# -----------------------------
+# Compiled tables
+# -----------------------------
+
+
+@dataclass(frozen=True)
+class MoveTable:
+    """Per-square destinations for one movement pattern on one geometry.
+
+    Every sequence is indexed by origin square (``y * width + x``) and holds
+    square indices/bitmasks. ``rays`` are ordered slider paths already cut at
+    blocked squares; a ray target is legal when the squares before it on the
+    ray are empty (``ray_reaches``). Memory is O(area x ray length) small
+    ints plus one mask per ray, never a mask per (origin, target).
+    """
+
+    steps: Tuple[Tuple[int, ...], ...]
+    step_masks: Tuple[int, ...]
+    rays: Tuple[Tuple[Tuple[int, ...], ...], ...]
+    ray_masks: Tuple[Tuple[int, ...], ...]
+    targets: Tuple[int, ...]
+
+
+def forward_direction(owner: str) -> int:
+    # player_1 starts on the low rows and advances toward +y (matches the UI)
+    return 1 if owner == "player_1" else -1
+
+
+def pattern_key(movement: Any, owner: str) -> Hashable:
+    """Hashable table key for a movement spec as seen by ``owner``."""
+    if isinstance(movement, list):
+        # custom offsets are absolute board directions, not owner-relative
+        return tuple((int(dx), int(dy)) for dx, dy in movement)
+    if movement == "forward_1":
+        return ("forward_1", forward_direction(owner))
+    return movement
+
+
+def _split_pattern(key: Hashable) -> Tuple[Tuple[Offset, ...], Tuple[Offset, ...]]:
+    if isinstance(key, tuple) and key and key[0] == "forward_1":
+        return ((0, key[1]),), ()
+    if isinstance(key, tuple):
+        return key, ()
+    if key in RAY_PATTERNS:
+        return (), RAY_PATTERNS[key]
+    return STEP_PATTERNS.get(key, ()), ()
+
+
+@lru_cache(maxsize=512)
+def compile_table(board_type: str, width: int, height: int, blocked: int, key: Hashable) -> MoveTable:
+    step_offsets, ray_dirs = _split_pattern(key)
+    wrap = board_type == "quadsphere"
+    # one int object per square, shared by every table entry; None marks blocked squares
+    squares: List[Optional[int]] = [None if (blocked >> sq) & 1 else sq for sq in range(width * height)]
+
+    def target(x: int, y: int) -> Optional[int]:
+        if wrap:
+            x, y = x % width, y % height
+        elif not (0 <= x < width and 0 <= y < height):
+            return None
+        return squares[y * width + x]
+
+    steps: List[Tuple[int, ...]] = []
+    step_masks: List[int] = []
+    rays: List[Tuple[Tuple[int, ...], ...]] = []
+    ray_masks: List[Tuple[int, ...]] = []
+    targets: List[int] = []
+    for y in range(height):
+        for x in range(width):
+            origin = y * width + x
+            sq_steps: List[int] = []
+            for dx, dy in step_offsets:
+                dest = target(x + dx, y + dy)
+                if dest is not None and dest != origin and dest not in sq_steps:
+                    sq_steps.append(dest)
+            sq_rays: List[Tuple[int, ...]] = []
+            for dx, dy in ray_dirs:
+                path: List[int] = []
+                cx, cy = x, y
+                while True:
+                    cx, cy = cx + dx, cy + dy
+                    dest = target(cx, cy)
+                    # stop at the edge, at obstacles, or once a wrapped ray comes back around
+                    # (a wrapped ray is a cycle through its origin, so nothing repeats before it)
+                    if dest is None or dest == origin:
+                        break
+                    path.append(dest)
+                if path:
+                    sq_rays.append(tuple(path))
+            step_mask = sum(1 << sq for sq in sq_steps)
+            masks = tuple(sum(1 << sq for sq in ray) for ray in sq_rays)
+            steps.append(tuple(sq_steps))
+            step_masks.append(step_mask)
+            rays.append(tuple(sq_rays))
+            ray_masks.append(masks)
+            reach = step_mask
+            for mask in masks:
+                reach |= mask  # rays may overlap once they wrap
+            targets.append(reach)
+    return MoveTable(
+        steps=tuple(steps),
+        step_masks=tuple(step_masks),
+        rays=tuple(rays),
+        ray_masks=tuple(ray_masks),
+        targets=tuple(targets),
+    )
+
+
+def table_for(position: "Position", piece_types: Dict[str, Dict[str, Any]], piece: "Piece") -> MoveTable:
+    cache_key = (piece.type, piece.owner)
+    table = position.move_tables.get(cache_key)
+    if table is None:
+        movement = piece_types.get(piece.type, {}).get("movement")
+        table = compile_table(
+            position.board_type,
+            position.width,
+            position.height,
+            position.blocked,
+            pattern_key(movement, piece.owner),
+        )
+        position.move_tables[cache_key] = table
+    return table
+
+
+# -----------------------------
+# Generation and application
+# -----------------------------
+
+
+def sparse_pattern(
+    position: "SparsePosition", piece_types: Dict[str, Dict[str, Any]], piece: "Piece"
+) -> Tuple[Tuple[Offset, ...], Tuple[Offset, ...]]:
+    # sparse boards have no per-square tables: (step offsets, ray directions) per piece
+    cache_key = (piece.type, piece.owner)
+    pattern = position.move_tables.get(cache_key)
+    if pattern is None:
+        movement = piece_types.get(piece.type, {}).get("movement")
+        pattern = position.move_tables[cache_key] = _split_pattern(pattern_key(movement, piece.owner))
+    return pattern
+
+
+def pseudo_moves(position: "Position", piece_types: Dict[str, Dict[str, Any]], piece: "Piece") -> List[int]:
+    """Destination squares for ``piece`` as square indices."""
+    if position.sparse:
+        return position.moves(piece, *sparse_pattern(position, piece_types, piece))  # type: ignore[attr-defined]
+    table = table_for(position, piece_types, piece)
+    sq = position.index(*piece.position)
+    own = position.owner_mask(piece.owner)
+    occupied = position.occupied
+    moves = [to for to in table.steps[sq] if not (own >> to) & 1]
+    for ray, mask in zip(table.rays[sq], table.ray_masks[sq]):
+        if not mask & occupied:
+            moves.extend(ray)
+            continue
+        for to in ray:
+            if (occupied >> to) & 1:
+                if not (own >> to) & 1:
+                    moves.append(to)
+                break
+            moves.append(to)
+    return moves
+
+
+def ray_reaches(table: MoveTable, src: int, dst: int, occupied: int) -> bool:
+    """Whether some ray from ``src`` reaches ``dst`` over empty squares."""
+    for ray, mask in zip(table.rays[src], table.ray_masks[src]):
+        if not (mask >> dst) & 1:
+            continue
+        for sq in ray:
+            if sq == dst:
+                return True
+            if (occupied >> sq) & 1:
+                break
+    return False
+
+
+def piece_moves(game: "Game", piece: "Piece") -> List[int]:
+    return pseudo_moves(game.position, game.piece_types, piece)
+
+
+def generate_moves(game: "Game", player: Optional[str] = None) -> List[Tuple[Square, Square]]:
+    position = game.position
+    player = player or game.state.get("turn")
+    moves: List[Tuple[Square, Square]] = []
+    for sq in position.owner_squares(player):
+        piece = position.squares[sq]
+        moves.extend((piece.position, position.coords(to)) for to in piece_moves(game, piece))
+    return moves
+
+
+def check_move(game: "Game", from_pos: Square, to_pos: Square, player: Optional[str]) -> "Piece":
+    """Validate a move against the compiled tables and return the moving piece."""
+    if game.state.get("status", "active") != "active":
+        raise IllegalMoveError("Game is already finished")
+    turn = game.state.get("turn")
+    if player is not None and player != turn:
+        raise IllegalMoveError(f"Not {player}'s turn")
+    position = game.position
+    for x, y in (from_pos, to_pos):
+        # indices of off-board squares would alias other squares
+        if not (0 <= x < position.width and 0 <= y < position.height):
+            raise IllegalMoveError(f"Square {[x, y]} is off the board")
+    src = position.index(*from_pos)
+    dst = position.index(*to_pos)
+    piece = position.squares[src]
+    if piece is None or piece.owner != turn:
+        raise IllegalMoveError(f"No {turn} piece at {list(from_pos)}")
+    if position.sparse:
+        if not position.reaches(piece, *sparse_pattern(position, game.piece_types, piece), dst):
+            raise IllegalMoveError(f"Illegal move for {piece.type}: {list(from_pos)} -> {list(to_pos)}")
+        return piece
+    table = table_for(position, game.piece_types, piece)
+    if not (table.targets[src] >> dst) & 1 or (position.owner_mask(turn) >> dst) & 1:
+        raise IllegalMoveError(f"Illegal move for {piece.type}: {list(from_pos)} -> {list(to_pos)}")
+    if not (table.step_masks[src] >> dst) & 1 and not ray_reaches(table, src, dst, position.occupied):
+        raise IllegalMoveError(f"Path blocked for {piece.type}: {list(from_pos)} -> {list(to_pos)}")
+    return piece
+
+
+def apply_move(game: "Game", piece: "Piece", to_pos: Square) -> Dict[str, Any]:
+    """Move ``piece`` (already checked), resolve capture/promotion/victory and pass the turn."""
+    position = game.position
+    victory = game.victory
+    from_pos = piece.position
+    from_sq = position.index(*from_pos)
+    to_sq = position.index(*to_pos)
+    captured = position.move(piece, to_sq)
+    if captured is not None:
+        game.pieces.remove(captured)
+        victory.captured(captured, to_sq)
+    # landing on a teleport square continues to the end of its chain, if that is free
+    landing_sq = to_sq
+    destination = game.board.teleports.get(to_sq)
+    if destination is not None and position.squares[destination] is None:
+        position.move(piece, destination)
+        landing_sq = destination
+    victory.moved(piece.owner, from_sq, landing_sq)
+    promoted_from = None
+    new_type = promotion_target(game.piece_types, piece, position.height)
+    if new_type is not None:
+        promoted_from = piece.type
+        position.retype(piece, new_type, promoted=True)
+        victory.retyped(piece.owner, promoted_from, new_type)
+    game.state["turn"] = next_turn(game)
+    if victory.conditions.score_target is not None:
+        victory.score(game.state, piece.owner, captured, landing_sq)
+    reason = victory.winner(game.state, piece.owner, captured, landing_sq)
+    if reason is not None:
+        finish_game(game, piece.owner, reason)
+    return {
+        "from": list(from_pos),
+        # the landing square; replaying it re-applies any teleport
+        "to": list(position.coords(to_sq)),
+        "player": piece.owner,
+        "piece": promoted_from or piece.type,
+        "captured": captured.type if captured else None,
+        "promoted": promoted_from is not None,
+    }
+
+
+def play_move(game: "Game", from_pos: Square, to_pos: Square, player: Optional[str]) -> Dict[str, Any]:
+    """Check, apply and record one move, then evaluate end-of-game conditions."""
+    piece = check_move(game, from_pos, to_pos, player)
+    record = apply_move(game, piece, to_pos)
+    _record(game, record)
+    return record
+
+
+def play_moves(
+    game: "Game", moves: List[Tuple[Square, Square, Optional[str]]]
+) -> List[Dict[str, Any]]:
+    """Play ``(from, to, player)`` moves in order, all or nothing.
+
+    On the first illegal move the game is put back exactly as it was and
+    BatchMoveError carries that move's index. Any other error also puts the
+    game back before it propagates.
+    """
+    records = []
+    with rollback_on_error(game):
+        for index, (from_pos, to_pos, player) in enumerate(moves):
+            try:
+                records.append(play_move(game, from_pos, to_pos, player))
+            except IllegalMoveError as e:
+                raise BatchMoveError(index, e) from e
+    return records
+
+
+@contextmanager
+def rollback_on_error(game: "Game") -> Iterator[None]:
+    """Put ``game`` back as it was when the block raises, whatever the exception."""
+    saved = save_state(game)
+    try:
+        yield
+    except BaseException:
+        restore_state(game, saved)
+        raise
+
+
+def save_state(game: "Game") -> Tuple[Any, ...]:
+    """Everything a move can change, for ``restore_state``."""
+    # pieces are mutated in place by moves/promotions, so their fields are saved too
+    return (
+        game.position.clone(()),
+        list(game.pieces),
+        [(piece, piece.type, piece.position, piece.promoted) for piece in game.pieces],
+        {k: v for k, v in game.state.items() if k != "history"},
+        len(game.state["history"]),
+        dict(game.repetitions),
+        game.victory.copy(),
+    )
+
+
+def restore_state(game: "Game", saved: Tuple[Any, ...]) -> None:
+    position, pieces, fields, state, seq, repetitions, victory = saved
+    for piece, type_, pos, promoted in fields:
+        piece.type, piece.position, piece.promoted = type_, pos, promoted
+    history = game.state["history"]
+    history.truncate(seq)
+    game.position = position
+    game.pieces = pieces
+    game.state = {**state, "history": history}
+    game.repetitions = repetitions
+    game.victory = victory
+
+
+def replay_move(game: "Game", from_pos: Square, to_pos: Square) -> Dict[str, Any]:
+    """Re-apply a move that was already accepted once (log replay); skips legality checks."""
+    position = game.position
+    piece = position.squares[position.index(*from_pos)]
+    if piece is None:
+        raise IllegalMoveError(f"No piece at {list(from_pos)} to replay")
+    record = apply_move(game, piece, to_pos)
+    _record(game, record)
+    return record
+
+
+def _record(game: "Game", record: Dict[str, Any]) -> None:
+    game.state["history"].append(record)
+    # monotonic; clients send it back as the expected version of their next move
+    game.state["version"] = game.state.get("version", 0) + 1
+    if record["captured"] is not None or record["promoted"]:
+        # irreversible: no earlier position can occur again
+        game.repetitions.clear()
+    if game.state["status"] == "active":
+        _check_repetition(game)
+
+
+def finish_game(game: "Game", winner: Optional[str], reason: str) -> None:
+    game.state["status"] = "finished"
+    game.state["winner"] = winner
+    game.state["reason"] = reason
+
+
+def _check_repetition(game: "Game") -> None:
+    key = game.zobrist
+    count = game.repetitions.get(key, 0) + 1
+    game.repetitions[key] = count
+    limit = (game.rules.draw_conditions or {}).get("repetition")
+    if limit and count >= int(limit):
+        finish_game(game, None, "repetition")
+
+
+def turn_order(game: "Game") -> List[str]:
+    number = int((game.rules.players or {}).get("number", 2) or 2)
+    return [f"player_{i}" for i in range(1, number + 1)]
+
+
+def next_turn(game: "Game") -> str:
+    order = turn_order(game)
+    current = game.state.get("turn")
+    if current not in order:
+        return order[0]
+    return order[(order.index(current) + 1) % len(order)]
+
+
+def promotion_target(piece_types: Dict[str, Dict[str, Any]], piece: "Piece", height: int) -> Optional[str]:
+    """Type ``piece`` promotes to on its current square, if any."""
+    promotion = piece_types.get(piece.type, {}).get("promotion")
+    if not promotion or not promotion.get("new_type"):
+        return None
+    x, y = piece.position
+    forward = forward_direction(piece.owner)
+    zone = promotion.get("zone")
+    if zone == "enemy_back_row":
+        reached = y == (height - 1 if forward > 0 else 0)
+    elif zone == "enemy_territory":
+        depth = max(1, height // 3)
+        reached = y >= height - depth if forward > 0 else y < depth
+    else:
+        reached = list(piece.position) == list(promotion.get("square") or [])
+    return promotion["new_type"] if reached else None
@@ -0,0 +1,202 @@
+"""Compact bitboard position core.
+
+Squares are indexed ``y * width + x``. Occupancy is kept per owner and per
+piece type as Python int bitmasks next to a square-indexed piece array, so
+"what is on (x, y)", captures and slider blocking are constant-time bit
+operations. ``shift`` moves whole bitboards, wrapping on quadsphere boards.
+``hash`` is the Zobrist hash of the piece placement, updated on every change.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .zobrist import piece_key
+
+if TYPE_CHECKING:
+    from .models import Board, Piece
+
+
+class Position:
+    # see backend.sparse for the hash-based variant used on very large boards
+    sparse = False
+
+    __slots__ = (
+        "board_type", "width", "height", "wrap", "num_squares", "full", "squares",
+        "occupied", "by_owner", "by_type", "blocked", "hash", "move_tables",
+    )
+
+    def __init__(self, board_type: str, width: int, height: int) -> None:
+        self.board_type = board_type
+        self.width = width
+        self.height = height
+        self.wrap = board_type == "quadsphere"
+        self.num_squares = width * height
+        self.full = (1 << self.num_squares) - 1
+        self.squares: List[Optional["Piece"]] = [None] * self.num_squares
+        self.occupied = 0
+        self.by_owner: Dict[str, int] = {}
+        self.by_type: Dict[str, int] = {}
+        # squares no piece may enter (obstacles, "block" special squares)
+        self.blocked = 0
+        self.hash = 0
+        # compiled move tables per (piece type, owner), filled by movegen
+        self.move_tables: Dict[Tuple[str, str], Any] = {}
+
+    @classmethod
+    def from_board(cls, board: "Board", pieces: Iterable["Piece"]) -> "Position":
+        pos = cls(board.type, *board.size)
+        for sq, cell in board.cells.items():
+            if cell.obstacle is not None or cell.effect == "block":
+                pos.blocked |= 1 << sq
+        for piece in pieces:
+            pos.place(piece)
+        return pos
+
+    def clone(self, pieces: Iterable["Piece"]) -> "Position":
+        """Same placement, occupied by ``pieces`` (copies of this position's pieces).
+
+        Bitboards, hash and compiled move tables are shared with ``self`` until the
+        copy moves, which is cheaper in time and memory than ``from_board``.
+        """
+        pos = Position.__new__(Position)
+        for name in Position.__slots__:
+            setattr(pos, name, getattr(self, name))
+        pos.squares = list(self.squares)
+        pos.by_owner = dict(self.by_owner)
+        pos.by_type = dict(self.by_type)
+        pos.move_tables = dict(self.move_tables)
+        for piece in pieces:
+            pos.squares[pos.index(*piece.position)] = piece
+        return pos
+
+    # ---- coordinates ----
+
+    def index(self, x: int, y: int) -> int:
+        if self.wrap:
+            x, y = x % self.width, y % self.height
+        return y * self.width + x
+
+    def coords(self, sq: int) -> Tuple[int, int]:
+        return sq % self.width, sq // self.width
+
+    @staticmethod
+    def bit(sq: int) -> int:
+        return 1 << sq
+
+    @staticmethod
+    def iter_bits(bb: int) -> Iterator[int]:
+        while bb:
+            low = bb & -bb
+            yield low.bit_length() - 1
+            bb ^= low
+
+    # ---- queries ----
+
+    def piece_at(self, x: int, y: int) -> Optional["Piece"]:
+        return self.squares[self.index(x, y)]
+
+    def is_occupied(self, sq: int) -> bool:
+        return (self.occupied >> sq) & 1 == 1
+
+    def owner_squares(self, owner: str) -> Iterator[int]:
+        return self.iter_bits(self.owner_mask(owner))
+
+    def owner_mask(self, owner: str) -> int:
+        return self.by_owner.get(owner, 0)
+
+    def type_mask(self, piece_type: str) -> int:
+        return self.by_type.get(piece_type, 0)
+
+    def count(self, owner: Optional[str] = None, piece_type: Optional[str] = None) -> int:
+        bb = self.occupied
+        if owner is not None:
+            bb &= self.owner_mask(owner)
+        if piece_type is not None:
+            bb &= self.type_mask(piece_type)
+        return bb.bit_count()
+
+    def pieces(self) -> Iterator["Piece"]:
+        for sq in self.iter_bits(self.occupied):
+            yield self.squares[sq]  # type: ignore[misc]
+
+    # ---- mutation ----
+
+    def place(self, piece: "Piece") -> None:
+        sq = self.index(*piece.position)
+        if self.squares[sq] is not None:
+            raise ValueError(f"Square {list(piece.position)} is already occupied")
+        self._set(piece, sq)
+
+    def remove(self, piece: "Piece") -> None:
+        sq = self.index(*piece.position)
+        self._clear(piece, sq)
+
+    def move(self, piece: "Piece", to_sq: int) -> Optional["Piece"]:
+        """Move ``piece`` to ``to_sq``; returns the captured piece, if any."""
+        captured = self.squares[to_sq]
+        if captured is not None:
+            self._clear(captured, to_sq)
+        self._clear(piece, self.index(*piece.position))
+        piece.position = self.coords(to_sq)
+        self._set(piece, to_sq)
+        return captured
+
+    def retype(self, piece: "Piece", new_type: str, promoted: bool) -> None:
+        sq = self.index(*piece.position)
+        self._clear(piece, sq)
+        piece.type = new_type
+        piece.promoted = promoted
+        self._set(piece, sq)
+
+    def _set(self, piece: "Piece", sq: int) -> None:
+        b = 1 << sq
+        self.squares[sq] = piece
+        self.occupied |= b
+        self.by_owner[piece.owner] = self.by_owner.get(piece.owner, 0) | b
+        self.by_type[piece.type] = self.by_type.get(piece.type, 0) | b
+        self.hash ^= piece_key(piece.type, piece.owner, piece.promoted, sq)
+
+    def _clear(self, piece: "Piece", sq: int) -> None:
+        b = ~(1 << sq)
+        self.squares[sq] = None
+        self.occupied &= b
+        self.by_owner[piece.owner] &= b
+        self.by_type[piece.type] &= b
+        self.hash ^= piece_key(piece.type, piece.owner, piece.promoted, sq)
+
+    # ---- bitboard shifts ----
+
+    def shift(self, bb: int, dx: int, dy: int) -> int:
+        """Translate every set square by (dx, dy); off-board bits drop unless the board wraps."""
+        w, h = self.width, self.height
+        if self.wrap:
+            dx %= w
+            if dx:
+                keep = columns_below(w, h, w - dx)
+                low = bb & keep
+                high = bb & ~keep
+                bb = (low << dx) | (high >> (w - dx))
+            rot = (dy % h) * w
+            if rot:
+                bb = ((bb << rot) | (bb >> (self.num_squares - rot))) & self.full
+            return bb
+        if abs(dx) >= w or abs(dy) >= h:
+            return 0
+        if dx > 0:
+            bb = (bb & columns_below(w, h, w - dx)) << dx
+        elif dx < 0:
+            bb = (bb & ~columns_below(w, h, -dx)) >> -dx
+        if dy > 0:
+            bb <<= dy * w
+        elif dy < 0:
+            bb >>= -dy * w
+        return bb & self.full
+
+
+@lru_cache(maxsize=1024)
+def columns_below(width: int, height: int, k: int) -> int:
+    """Mask of every square with ``x < k``."""
+    ranks = sum(1 << (y * width) for y in range(height))
+    return ((1 << k) - 1) * ranks
@@ -0,0 +1,118 @@
+"""Named rule sets compiled once per process: ``POST /api/games {"preset": ...}``.
+
+``presets.yaml`` in the preset directory (``FLEXIBOARD_PRESET_DIR``, default
+``backend/sample_configs``) maps each name to a board, pieces and rules file
+next to it. ``create_app`` reads and validates every preset (``validate``),
+so a broken preset stops the server from starting. Compiling them (board
+cells, move tables) waits for first use: the first preset game or
+``GET /api/presets``. After that a game created from a preset touches no
+YAML at all. In multi-worker mode the presets are compiled before the
+workers are forked and shared with them.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .models import CompiledRuleset, ValidationError, compile_ruleset, validate_settings
+from .rulesets import load_yaml
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "presets.yaml"
+DEFAULT_PRESET_DIR = Path(__file__).with_name("sample_configs")
+
+
+class PresetRegistry:
+    def __init__(self, directory: Optional[Path] = None) -> None:
+        # where to read from; None: FLEXIBOARD_PRESET_DIR at that time
+        self.source = directory
+        # set once validated
+        self.directory: Optional[Path] = None
+        self.load_seconds = 0.0
+        # name -> (board, pieces, rules) YAML texts, validated
+        self._sources: Dict[str, Tuple[str, str, str]] = {}
+        # set once compiled
+        self._rulesets: Optional[Dict[str, CompiledRuleset]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def validated(self) -> bool:
+        return self.directory is not None
+
+    @property
+    def loaded(self) -> bool:
+        return self._rulesets is not None
+
+    def validate(self) -> None:
+        """Read and validate every preset once; raises ValidationError naming a broken one."""
+        if self.directory is None:
+            with self._lock:
+                if self.directory is None:
+                    self._read(self.source or preset_dir_from_env())
+
+    def ensure_loaded(self) -> None:
+        if self._rulesets is None:
+            self.validate()
+            with self._lock:
+                if self._rulesets is None:
+                    start = time.perf_counter()
+                    rulesets = {name: compile_ruleset(*texts) for name, texts in self._sources.items()}
+                    self.load_seconds = time.perf_counter() - start
+                    self._rulesets = rulesets
+                    logger.info("compiled %d presets in %.1f ms", len(rulesets), self.load_seconds * 1000)
+
+    def _read(self, directory: Path) -> None:
+        """Load and validate the presets listed in ``directory/presets.yaml`` (none if it is missing)."""
+        from yaml import YAMLError
+
+        sources: Dict[str, Tuple[str, str, str]] = {}
+        manifest = directory / MANIFEST
+        if manifest.exists():
+            entries = load_yaml(manifest.read_text(encoding="utf-8")) or {}
+            if not isinstance(entries, dict):
+                raise ValidationError(f"{manifest}: expected a mapping of preset names")
+            for name, files in entries.items():
+                if not isinstance(files, dict) or not all(
+                    isinstance(files.get(kind), str) for kind in ("board", "pieces", "rules")
+                ):
+                    raise ValidationError(f"preset {name}: expected board, pieces and rules file names")
+                try:
+                    texts = tuple(
+                        (directory / files[kind]).read_text(encoding="utf-8") for kind in ("board", "pieces", "rules")
+                    )
+                    validate_settings(*(load_yaml(text) or {} for text in texts))
+                except (OSError, YAMLError, ValidationError) as e:
+                    raise ValidationError(f"preset {name}: {e}") from e
+                sources[str(name)] = texts  # type: ignore[assignment]
+        self._sources = sources
+        self.directory = directory
+
+    def get(self, name: str) -> Optional[CompiledRuleset]:
+        self.ensure_loaded()
+        return self._rulesets.get(name)  # type: ignore[union-attr]
+
+    def names(self) -> List[str]:
+        self.validate()
+        return sorted(self._sources)
+
+    def describe(self) -> List[Dict[str, Any]]:
+        self.ensure_loaded()
+        return [
+            {
+                "name": name,
+                "board_type": ruleset.board.type,
+                "board_size": list(ruleset.board.size),
+                "pieces": len(ruleset.initial_pieces),
+            }
+            for name, ruleset in sorted(self._rulesets.items())  # type: ignore[union-attr]
+        ]
+
+
+def preset_dir_from_env() -> Path:
+    return Path(os.environ.get("FLEXIBOARD_PRESET_DIR") or DEFAULT_PRESET_DIR)
@@ -0,0 +1,142 @@
+"""On-demand cProfile sampling for a live worker.
+
+Two ways to turn it on:
+
+- ``FLEXIBOARD_PROFILE_SAMPLE_RATE`` (0..1, default 0): profile that fraction
+  of HTTP requests and Socket.IO handler calls, continuously;
+- an admin-opened window (``POST /api/admin/profile``) that profiles every
+  call for N seconds.
+
+Profiles of all sampled calls are merged into one ``pstats`` aggregate that
+can be downloaded and opened with ``python -m pstats`` or snakeviz. While
+neither is active the hooks only read one attribute, so they stay installed
+in production. The admin endpoints exist only when ``FLEXIBOARD_ADMIN_TOKEN``
+is set.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import functools
+import io
+import marshal
+import os
+import pstats
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# longest admin window, so a forgotten one cannot keep a worker slow for hours
+MAX_WINDOW_SECONDS = 600.0
+
+
+class SamplingProfiler:
+    def __init__(self, sample_rate: float = 0.0) -> None:
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+        self.window_until = 0.0
+        # read by every hook; True while sampling or inside a window
+        self.active = self.sample_rate > 0
+        self.profiled_calls = 0
+        self._stats: Optional[pstats.Stats] = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    # ---- control ----
+
+    def open_window(self, seconds: float) -> float:
+        seconds = max(0.0, min(seconds, MAX_WINDOW_SECONDS))
+        self.window_until = time.monotonic() + seconds
+        self.active = True
+        return seconds
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats = None
+            self.profiled_calls = 0
+
+    def _should_sample(self) -> bool:
+        if self.window_until:
+            if time.monotonic() < self.window_until:
+                return True
+            self.window_until = 0.0
+            self.active = self.sample_rate > 0
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    # ---- hooks ----
+
+    def start(self) -> Optional[cProfile.Profile]:
+        """Begin profiling this call if it is sampled; pass the result to ``stop``."""
+        if not self.active or getattr(self._local, "busy", False) or not self._should_sample():
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:  # another profiler already owns this interpreter/thread
+            return None
+        self._local.busy = True
+        return profile
+
+    def stop(self, profile: Optional[cProfile.Profile]) -> None:
+        if profile is None:
+            return
+        profile.disable()
+        self._local.busy = False
+        stats = pstats.Stats(profile)
+        with self._lock:
+            if self._stats is None:
+                self._stats = stats
+            else:
+                self._stats.add(stats)
+            self.profiled_calls += 1
+
+    def profiled(self, fn: F) -> F:
+        """Decorator for Socket.IO handlers and other non-request entry points."""
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not self.active:
+                return fn(*args, **kwargs)
+            profile = self.start()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.stop(profile)
+
+        return wrapper  # type: ignore[return-value]
+
+    # ---- results ----
+
+    def dump(self) -> bytes:
+        """The aggregate in the ``.pstats`` file format (empty profile if nothing was sampled)."""
+        with self._lock:
+            data = dict(self._stats.stats) if self._stats is not None else {}  # type: ignore[attr-defined]
+        return marshal.dumps(data)
+
+    def summary(self, limit: int = 40, sort: str = "cumulative") -> str:
+        with self._lock:
+            if self._stats is None:
+                return "no samples\n"
+            out = io.StringIO()
+            self._stats.stream = out  # type: ignore[attr-defined]
+            self._stats.sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def status(self) -> Dict[str, Any]:
+        remaining = max(0.0, self.window_until - time.monotonic()) if self.window_until else 0.0
+        return {
+            "active": self.active,
+            "sample_rate": self.sample_rate,
+            "window_seconds_remaining": remaining,
+            "profiled_calls": self.profiled_calls,
+        }
+
+
+def profiler_from_env() -> SamplingProfiler:
+    return SamplingProfiler(float(os.environ.get("FLEXIBOARD_PROFILE_SAMPLE_RATE", "0")))
+
+
+def admin_token() -> Optional[str]:
+    return os.environ.get("FLEXIBOARD_ADMIN_TOKEN") or None
@@ -0,0 +1,191 @@
+"""Room broadcasts that can cross worker processes.
+
+Every accepted move is published as ``(room, event, data)``; each worker
+subscribes and re-emits it to the Socket.IO room members connected to *it*.
+``LocalPubSub`` is the single-process default. ``UnixSocketPubSub`` talks to a
+``PubSubHub`` in the supervisor process that relays every frame to the other
+workers; anything offering ``publish``/``subscribe``/``close`` (e.g. a Redis
+adapter) can be dropped in instead.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import socket
+import struct
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[str, str, Any], None]
+
+FRAME = struct.Struct("<I")
+
+
+class PubSub:
+    def __init__(self) -> None:
+        self._handlers: List[Handler] = []
+
+    def subscribe(self, handler: Handler) -> None:
+        self._handlers.append(handler)
+
+    def publish(self, room: str, event: str, data: Any) -> None:
+        self._dispatch(room, event, data)
+
+    def close(self) -> None:
+        pass
+
+    def _dispatch(self, room: str, event: str, data: Any) -> None:
+        for handler in list(self._handlers):
+            try:
+                handler(room, event, data)
+            except Exception:  # one bad subscriber must not drop the broadcast for the rest
+                logger.exception("pub/sub handler failed for %s/%s", room, event)
+
+
+class LocalPubSub(PubSub):
+    """In-process delivery: publish calls the subscribers directly."""
+
+
+def _send_frame(sock: socket.socket, body: bytes) -> None:
+    sock.sendall(FRAME.pack(len(body)) + body)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    chunks = []
+    while size:
+        chunk = sock.recv(size)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _recv_frame(sock: socket.socket) -> Optional[bytes]:
+    header = _recv_exact(sock, FRAME.size)
+    if header is None:
+        return None
+    return _recv_exact(sock, FRAME.unpack(header)[0])
+
+
+class PubSubHub:
+    """Relay listening on a Unix socket; forwards each frame to every other peer."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._peers: List[socket.socket] = []
+        self._lock = threading.Lock()
+        self._server: Optional[socket.socket] = None
+
+    def start(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self.path)
+        server.listen()
+        self._server = server
+        threading.Thread(target=self._accept_loop, name="flexiboard-pubsub-hub", daemon=True).start()
+
+    def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        with self._lock:
+            for peer in self._peers:
+                peer.close()
+            self._peers.clear()
+
+    def _accept_loop(self) -> None:
+        server = self._server
+        while server is not None:
+            try:
+                peer, _ = server.accept()
+            except OSError:
+                return
+            with self._lock:
+                self._peers.append(peer)
+            threading.Thread(target=self._relay, args=(peer,), daemon=True).start()
+
+    def _relay(self, peer: socket.socket) -> None:
+        while True:
+            try:
+                body = _recv_frame(peer)
+            except OSError:
+                body = None
+            if body is None:
+                break
+            with self._lock:
+                targets = [p for p in self._peers if p is not peer]
+            for target in targets:
+                try:
+                    _send_frame(target, body)
+                except OSError:
+                    pass  # the peer's own relay thread notices and drops it
+        with self._lock:
+            if peer in self._peers:
+                self._peers.remove(peer)
+        peer.close()
+
+
+class UnixSocketPubSub(PubSub):
+    """Worker side of PubSubHub: local subscribers run directly, peers via the hub."""
+
+    def __init__(self, path: str, connect_timeout: float = 10.0) -> None:
+        super().__init__()
+        self.path = path
+        self._sock = self._connect(connect_timeout)
+        self._send_lock = threading.Lock()
+        threading.Thread(target=self._read_loop, name="flexiboard-pubsub", daemon=True).start()
+
+    def _connect(self, timeout: float) -> socket.socket:
+        # the hub may still be starting up alongside the workers
+        deadline = time.monotonic() + timeout
+        while True:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(self.path)
+                return sock
+            except OSError:
+                sock.close()
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.05)
+
+    def publish(self, room: str, event: str, data: Any) -> None:
+        body = json.dumps({"room": room, "event": event, "data": data}, separators=(",", ":")).encode("utf-8")
+        with self._send_lock:
+            _send_frame(self._sock, body)
+        self._dispatch(room, event, data)
+
+    def close(self) -> None:
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._sock.close()
+
+    def _read_loop(self) -> None:
+        while True:
+            try:
+                body = _recv_frame(self._sock)
+            except OSError:
+                body = None
+            if body is None:
+                return
+            message: Dict[str, Any] = json.loads(body)
+            self._dispatch(message["room"], message["event"], message["data"])
+
+
+def pubsub_from_env() -> PubSub:
+    """``FLEXIBOARD_PUBSUB``: ``local`` (default) or ``unix:<socket path>``."""
+    spec = os.environ.get("FLEXIBOARD_PUBSUB", "local")
+    if spec.startswith("unix:"):
+        return UnixSocketPubSub(spec[len("unix:") :])
+    if spec != "local":
+        raise ValueError(f"Unknown FLEXIBOARD_PUBSUB: {spec}")
+    return LocalPubSub()
@@ -0,0 +1,343 @@
+"""Bounded registry of resident games with spill-to-disk.
+
+Games live in an LRU ordered by last access. A game idle for longer than the
+TTL, or the least recently used one once the count or estimated-memory limit
+is exceeded, is written to disk and dropped from memory; the next ``get``
+reloads it transparently. With the durable move log enabled the game's
+snapshot plus log already are on disk, so eviction only makes sure a snapshot
+exists; otherwise a scratch store under ``FLEXIBOARD_SPILL_DIR`` (default a
+temporary directory) is used, whose files are deleted once a game is read
+back and whose temporary directory is removed by ``close()``.
+
+Victims are chosen, and their game locks taken, under the registry lock; the
+disk writes happen after it is released, so a slow spill never stalls
+requests for other games. While being written a victim stays reachable
+through ``get``. An evicted game object may still be referenced by a request
+that fetched it just before; its lock is retired under the lock, so
+``locked()`` notices and reloads instead of mutating a stale copy.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Mapping, Optional, Set, Tuple
+
+from .storage import GameStore
+
+if TYPE_CHECKING:
+    from .models import Game
+
+logger = logging.getLogger(__name__)
+
+# idle (TTL) evictions per access, so one request never pays for a whole sweep
+MAX_IDLE_EVICTIONS_PER_CALL = 64
+
+# rough per-game overhead of the slotted objects, dicts and lock (bench_memory.py)
+GAME_BASE_BYTES = 2048
+PIECE_BYTES = 80
+# sparse boards: square-map entry, owner-set entry and four line entries per piece
+SPARSE_PIECE_BYTES = 400
+REPETITION_BYTES = 100
+
+
+def estimate_bytes(game: "Game") -> int:
+    return (
+        GAME_BASE_BYTES
+        + PIECE_BYTES * len(game.pieces)
+        + (SPARSE_PIECE_BYTES * len(game.pieces) if game.position.sparse else 8 * game.position.num_squares)
+        + game.state["history"].nbytes
+        + REPETITION_BYTES * len(game.repetitions)
+    )
+
+
+class GameRegistry:
+    def __init__(
+        self,
+        build_game: Callable[[Dict[str, Any], Dict[str, Dict[str, Any]]], "Game"],
+        replay_move: Callable[["Game", Tuple[int, int], Tuple[int, int]], Any],
+        max_games: int = 100_000,
+        max_bytes: int = 0,
+        ttl: float = 3600.0,
+        spill_dir: Optional[str] = None,
+    ) -> None:
+        self.max_games = max_games
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._build_game = build_game
+        self._replay_move = replay_move
+        self._spill_dir = spill_dir
+        self._store: Optional[GameStore] = None
+        self._durable = False
+        # set when the scratch store lives in a directory we created (removed by close())
+        self._temp_dir: Optional[str] = None
+        # game id -> (game, last access, estimated bytes), least recently used first
+        self._games: "OrderedDict[str, Tuple[Game, float, int]]" = OrderedDict()
+        # evicted, snapshot being written outside the lock; same entries as _games
+        self._spilling: Dict[str, Tuple["Game", float, int]] = {}
+        self._spilled: Set[str] = set()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.rehydrations = 0
+        self.rehydration_seconds = 0.0
+        self.rehydration_max_seconds = 0.0
+        self.rehydration_failures = 0
+
+    def use_store(self, store: GameStore) -> None:
+        """Spill into the durable store: its snapshot + log already hold every game."""
+        self._store = store
+        self._durable = True
+
+    # ---- mapping interface ----
+
+    def get(self, game_id: Any, default: Optional["Game"] = None) -> Optional["Game"]:
+        if not isinstance(game_id, str):
+            return default
+        now = time.monotonic()
+        with self._lock:
+            entry = self._games.get(game_id)
+            if entry is not None:
+                game = entry[0]
+                self._touch(game_id, game, now)
+                victims = self._evict(now)
+            else:
+                entry = self._spilling.get(game_id)
+                if entry is not None:
+                    return entry[0]  # locked() waits for the spill, then reloads
+                if game_id not in self._spilled:
+                    return default
+        if entry is not None:
+            self._spill_all(victims)
+            return game
+        game = self._rehydrate(game_id)
+        return game if game is not None else default
+
+    def __getitem__(self, game_id: str) -> "Game":
+        game = self.get(game_id)
+        if game is None:
+            raise KeyError(game_id)
+        return game
+
+    def __setitem__(self, game_id: str, game: "Game") -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._spilled.discard(game_id)
+            self._spilling.pop(game_id, None)
+            self._touch(game_id, game, now)
+            victims = self._evict(now)
+        self._spill_all(victims)
+
+    def __contains__(self, game_id: object) -> bool:
+        with self._lock:
+            return game_id in self._games or game_id in self._spilling or game_id in self._spilled
+
+    def __len__(self) -> int:
+        # resident games only
+        return len(self._games)
+
+    def pop(self, game_id: str, default: Optional["Game"] = None) -> Optional["Game"]:
+        with self._lock:
+            was_spilled = game_id in self._spilled
+            self._spilled.discard(game_id)
+            entry = self._games.pop(game_id, None)
+            if entry is not None:
+                self._bytes -= entry[2]
+            else:
+                # being spilled: _spill_all sees it gone and drops what it wrote
+                entry = self._spilling.pop(game_id, None)
+        if was_spilled:
+            self._drop_spilled(game_id)
+        return entry[0] if entry is not None else default
+
+    def update(self, games: Mapping[str, "Game"]) -> None:
+        for game_id, game in games.items():
+            self[game_id] = game
+
+    def values(self) -> List["Game"]:
+        with self._lock:
+            return [entry[0] for entry in self._games.values()]
+
+    @contextmanager
+    def locked(self, game_id: str) -> Iterator[Optional["Game"]]:
+        """Yield the live game with its lock held (None if it does not exist)."""
+        while True:
+            game = self.get(game_id)
+            if game is None:
+                yield None
+                return
+            with game.lock:
+                if game.lock.retired:
+                    continue  # evicted between get() and the lock; load it again
+                yield game
+                return
+
+    # ---- eviction ----
+
+    def sweep(self) -> None:
+        """Evict idle games now (normally this happens on every access)."""
+        with self._lock:
+            victims = self._evict(time.monotonic())
+        self._spill_all(victims)
+
+    def _touch(self, game_id: str, game: "Game", now: float) -> None:
+        # caller holds self._lock
+        old = self._games.pop(game_id, None)
+        if old is not None:
+            self._bytes -= old[2]
+        size = estimate_bytes(game)
+        self._games[game_id] = (game, now, size)
+        self._bytes += size
+
+    def _over_limit(self) -> bool:
+        return (self.max_games > 0 and len(self._games) > self.max_games) or (
+            self.max_bytes > 0 and self._bytes > self.max_bytes
+        )
+
+    def _evict(self, now: float) -> List["Game"]:
+        """Take victims off the LRU with their game locks held; the caller spills them
+        with ``_spill_all`` once it has released ``self._lock``."""
+        # caller holds self._lock; walks from the least recently used end
+        victims: List["Game"] = []
+        skipped = []
+        idle_budget = MAX_IDLE_EVICTIONS_PER_CALL
+        while self._games:
+            game_id, (game, last_access, size) = next(iter(self._games.items()))
+            if not self._over_limit():
+                if idle_budget <= 0 or self.ttl <= 0 or now - last_access <= self.ttl:
+                    break
+                idle_budget -= 1
+            entry = self._games.popitem(last=False)[1]
+            if not game.lock.try_acquire():
+                skipped.append((game_id, entry))
+                continue
+            self._bytes -= size
+            self._spilling[game_id] = entry
+            victims.append(game)
+        for game_id, entry in skipped:
+            # busy right now; keep it and retry on a later access
+            self._games[game_id] = entry
+            self._games.move_to_end(game_id, last=False)
+        return victims
+
+    def _spill_all(self, victims: List["Game"]) -> None:
+        # called without self._lock; each victim's game lock is held until it is done
+        for game in victims:
+            try:
+                store = self._spill_store()
+                if not (self._durable and store.has_snapshot(game.id)):
+                    store.write_snapshot_now(game)
+            except OSError:
+                logger.exception("could not spill game %s; keeping it in memory", game.id)
+                with self._lock:
+                    entry = self._spilling.pop(game.id, None)
+                    if entry is not None and game.id not in self._games:
+                        self._games[game.id] = entry
+                        self._games.move_to_end(game.id, last=False)
+                        self._bytes += entry[2]
+                game.lock.release()
+                continue
+            game.lock.retired = True
+            with self._lock:
+                kept = self._spilling.pop(game.id, None) is not None
+                if kept:
+                    self._spilled.add(game.id)
+                    self.evictions += 1
+            game.lock.release()
+            if not kept:
+                # popped or replaced while it was being written
+                self._drop_spilled(game.id)
+
+    def _spill_store(self) -> GameStore:
+        with self._lock:
+            if self._store is None:
+                root = self._spill_dir
+                if root is None:
+                    root = self._temp_dir = tempfile.mkdtemp(prefix="flexiboard-spill-")
+                self._store = GameStore(root, sync=False)
+            return self._store
+
+    def _drop_spilled(self, game_id: str) -> None:
+        # scratch files are only a copy of memory; the durable store keeps its own
+        if not self._durable and self._store is not None:
+            self._store.delete(game_id)
+
+    def _rehydrate(self, game_id: str) -> Optional["Game"]:
+        start = time.perf_counter()
+        try:
+            game = self._spill_store().load(game_id, self._build_game, self._replay_move)
+        except (OSError, ValueError, KeyError):
+            with self._lock:
+                entry = self._games.get(game_id)
+                if entry is not None:
+                    # a concurrent rehydration won and already removed the scratch files
+                    return entry[0]
+                self.rehydration_failures += 1
+            logger.exception("could not rehydrate game %s", game_id)
+            return None
+        elapsed = time.perf_counter() - start
+        now = time.monotonic()
+        with self._lock:
+            entry = self._games.get(game_id)
+            if entry is not None:
+                # another request rehydrated it concurrently; use that copy
+                return entry[0]
+            if game_id not in self._spilled:
+                return None  # popped meanwhile
+            self._spilled.discard(game_id)
+            self._touch(game_id, game, now)
+            self.rehydrations += 1
+            self.rehydration_seconds += elapsed
+            self.rehydration_max_seconds = max(self.rehydration_max_seconds, elapsed)
+            victims = self._evict(now)
+        self._drop_spilled(game_id)
+        self._spill_all(victims)
+        return game
+
+    def close(self) -> None:
+        """Drop the scratch spill files (and the temporary directory, if we created it)."""
+        with self._lock:
+            if self._durable or self._store is None:
+                return  # the durable store belongs to the app, which closes it
+            store, self._store = self._store, None
+            temp_dir, self._temp_dir = self._temp_dir, None
+            spilled = list(self._spilled)
+            self._spilled.clear()
+        store.close()
+        if temp_dir is not None:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+        else:
+            for game_id in spilled:
+                store.delete(game_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "resident": len(self._games),
+                "spilled": len(self._spilled),
+                "spilling": len(self._spilling),
+                "estimated_bytes": self._bytes,
+                "max_games": self.max_games,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "evictions": self.evictions,
+                "rehydrations": self.rehydrations,
+                "rehydration_failures": self.rehydration_failures,
+                "rehydration_seconds_total": self.rehydration_seconds,
+                "rehydration_seconds_max": self.rehydration_max_seconds,
+            }
+
+
+def registry_limits_from_env() -> Dict[str, Any]:
+    return {
+        "max_games": int(os.environ.get("FLEXIBOARD_MAX_GAMES", "100000")),
+        "max_bytes": int(float(os.environ.get("FLEXIBOARD_MAX_GAME_MEMORY_MB", "0")) * 1024 * 1024),
+        "ttl": float(os.environ.get("FLEXIBOARD_GAME_TTL", "3600")),
+        "spill_dir": os.environ.get("FLEXIBOARD_SPILL_DIR") or None,
+    }
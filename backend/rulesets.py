@@ -0,0 +1,92 @@
+"""Content-addressed cache of parsed and validated rule sets.
+
+Lobbies create many games from the same few YAML triples, so the triple is
+hashed and the compiled result (board, piece types, rules, initial layout) is
+kept in a bounded LRU. A hit skips YAML parsing and validation entirely.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+_loader: Optional[Any] = None
+
+
+def safe_loader() -> Any:
+    # PyYAML is imported on the first parse: processes that only serve presets
+    # or cached rule sets (and AI search workers) never load it
+    global _loader
+    if _loader is None:
+        import yaml
+
+        # libyaml-backed loader when PyYAML was built with it
+        _loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    return _loader
+
+
+def load_yaml(text: str) -> Any:
+    import yaml
+
+    return yaml.load(text, Loader=safe_loader())
+
+
+def ruleset_key(board_yaml: str, pieces_yaml: str, rules_yaml: str) -> str:
+    digest = hashlib.sha256()
+    for part in (board_yaml, pieces_yaml, rules_yaml):
+        data = part.encode("utf-8")
+        # length prefix keeps ("ab", "c") and ("a", "bc") distinct
+        digest.update(len(data).to_bytes(8, "little"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+class RulesetCache(Generic[T]):
+    def __init__(self, max_size: int = 128) -> None:
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, T]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compile(self, key: str, compile_fn: Callable[[], T]) -> T:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+        # compile outside the lock; failures (ValidationError, YAML errors) are not cached
+        entry = compile_fn()
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "libyaml": safe_loader().__name__ == "CSafeLoader",
+            }
+
+
+def default_cache_size() -> int:
+    return int(os.environ.get("FLEXIBOARD_RULESET_CACHE_SIZE", "128"))
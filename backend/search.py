@@ -0,0 +1,430 @@
+"""Server-side AI: iterative-deepening alpha-beta over the game's Position.
+
+Searches run in a ``ProcessPoolExecutor`` so they never hold the Socket.IO
+server. The worker receives a plain, picklable ``SearchRequest`` snapshot and
+rebuilds its own ``Position`` (a ``SparsePosition`` on sparse boards), so it
+does not need Flask or the live Game.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, FrozenSet, List, Optional, Tuple
+
+from .asyncmode import run_blocking
+from .movegen import pseudo_moves, promotion_target, turn_order, table_for
+from .position import Position
+from .sparse import SparsePosition
+from .zobrist import side_key
+
+if TYPE_CHECKING:
+    from .models import Game
+
+
+Square = Tuple[int, int]
+Move = Tuple[int, int]
+
+INF = 10**9
+WIN = 10**6
+
+TT_EXACT, TT_LOWER, TT_UPPER = 0, 1, 2
+TT_MAX_ENTRIES = 200_000
+# material values count at most this many reachable squares, so sliders on very large boards stay below WIN
+MAX_REACH = 256
+
+
+@dataclass(frozen=True)
+class SearchBudget:
+    max_depth: int
+    time_limit: float
+    node_limit: int
+
+
+DIFFICULTY_BUDGETS: Dict[str, SearchBudget] = {
+    "easy": SearchBudget(max_depth=1, time_limit=0.2, node_limit=2_000),
+    "medium": SearchBudget(max_depth=4, time_limit=0.75, node_limit=60_000),
+    "hard": SearchBudget(max_depth=8, time_limit=2.5, node_limit=400_000),
+}
+
+
+@dataclass
+class SearchRequest:
+    board_type: str
+    size: Tuple[int, int]
+    # bitboard of blocked squares, or their set on sparse boards
+    blocked: Any
+    piece_types: Dict[str, Dict[str, Any]]
+    pieces: List[Tuple[str, Square, str, bool]]
+    turn: str
+    order: List[str]
+    royal: FrozenSet[str]
+    # landing square -> end of its teleport chain (Board.teleports)
+    teleports: Dict[int, int] = field(default_factory=dict)
+    sparse: bool = False
+
+
+@dataclass
+class SearchResult:
+    move: Optional[Tuple[Square, Square]]
+    score: int
+    depth: int
+    nodes: int
+    elapsed: float
+
+
+class _SearchPiece:
+    __slots__ = ("type", "position", "owner", "promoted")
+
+    def __init__(self, type: str, position: Square, owner: str, promoted: bool) -> None:
+        self.type = type
+        self.position = position
+        self.owner = owner
+        self.promoted = promoted
+
+
+class _BudgetExceeded(Exception):
+    pass
+
+
+def build_request(game: "Game") -> SearchRequest:
+    position = game.position
+    return SearchRequest(
+        board_type=position.board_type,
+        size=(position.width, position.height),
+        blocked=position.blocked,
+        piece_types={
+            name: {"movement": pt.get("movement"), "promotion": pt.get("promotion")}
+            for name, pt in game.piece_types.items()
+        },
+        pieces=[(p.type, p.position, p.owner, p.promoted) for p in game.pieces],
+        turn=game.state.get("turn", "player_1"),
+        order=turn_order(game),
+        royal=frozenset(
+            c.get("value") for c in game.rules.victory_conditions if c.get("type") == "capture_king"
+        ),
+        teleports=game.board.teleports,
+        sparse=position.sparse,
+    )
+
+
+# -----------------------------
+# Search
+# -----------------------------
+
+
+class Searcher:
+    def __init__(self, request: SearchRequest, budget: SearchBudget) -> None:
+        self.request = request
+        self.budget = budget
+        self.piece_types = request.piece_types
+        self.order = request.order
+        self.royal = request.royal
+        self.teleports = request.teleports
+        if request.sparse:
+            self.position: Any = SparsePosition(request.board_type, *request.size)
+            self.position.block(request.blocked)
+        else:
+            self.position = Position(request.board_type, *request.size)
+            self.position.blocked = request.blocked
+        for piece_type, pos, owner, promoted in request.pieces:
+            self.position.place(_SearchPiece(piece_type, tuple(pos), owner, promoted))
+        self.turn = request.turn
+        self.tt: Dict[int, Tuple[int, int, int, Optional[Move]]] = {}
+        self.values: Dict[str, int] = {}
+        self.nodes = 0
+        self.deadline = 0.0
+
+    def run(self) -> SearchResult:
+        start = time.perf_counter()
+        self.deadline = start + self.budget.time_limit
+        best: Optional[Move] = None
+        best_score = 0
+        depth_done = 0
+        # generated before searching: a budget abort unwinds back to this root position
+        root_moves = self._moves()
+        for depth in range(1, self.budget.max_depth + 1):
+            try:
+                score, move = self._root(root_moves, depth, best)
+            except _BudgetExceeded:
+                break
+            if move is None:
+                break
+            best, best_score, depth_done = move, score, depth
+            if abs(score) >= WIN - 1000:
+                break
+        if best is None:
+            # budget ran out before depth 1 finished; fall back to any legal move
+            best = root_moves[0] if root_moves else None
+        elapsed = time.perf_counter() - start
+        move = None
+        if best is not None:
+            move = (self.position.coords(best[0]), self.position.coords(best[1]))
+        return SearchResult(move=move, score=best_score, depth=depth_done, nodes=self.nodes, elapsed=elapsed)
+
+    def _root(self, moves: List[Move], depth: int, pv: Optional[Move]) -> Tuple[int, Optional[Move]]:
+        alpha, beta = -INF, INF
+        best_move = None
+        for move in self._ordered(moves, pv):
+            undo, won = self._make(move)
+            try:
+                score = WIN if won else -self._negamax(depth - 1, -beta, -alpha, 1)
+            finally:
+                self._unmake(undo)
+            if score > alpha or best_move is None:
+                alpha, best_move = score, move
+        if best_move is not None:
+            self._store(depth, alpha, TT_EXACT, best_move)
+        return alpha, best_move
+
+    def _negamax(self, depth: int, alpha: float, beta: float, ply: int) -> int:
+        self.nodes += 1
+        if not self.nodes & 1023:
+            self._check_budget()
+        entry = self.tt.get(self._key())
+        tt_move = None
+        if entry is not None:
+            e_depth, e_score, e_flag, tt_move = entry
+            if e_depth >= depth:
+                if e_flag == TT_EXACT:
+                    return e_score
+                if e_flag == TT_LOWER:
+                    alpha = max(alpha, e_score)
+                elif e_flag == TT_UPPER:
+                    beta = min(beta, e_score)
+                if alpha >= beta:
+                    return e_score
+        if depth <= 0:
+            return self._evaluate()
+        moves = self._moves()
+        if not moves:
+            return 0
+        original_alpha = alpha
+        best, best_move = -INF, None
+        for move in self._ordered(moves, tt_move):
+            undo, won = self._make(move)
+            try:
+                score = WIN - ply if won else -self._negamax(depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                self._unmake(undo)
+            if score > best:
+                best, best_move = score, move
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                break
+        flag = TT_UPPER if best <= original_alpha else TT_LOWER if best >= beta else TT_EXACT
+        self._store(depth, best, flag, best_move)
+        return int(best)
+
+    # ---- perft ----
+
+    def perft(self, depth: int) -> int:
+        """Leaf nodes ``depth`` plies ahead. A move that wins ends the line (no children)."""
+        if depth <= 0:
+            return 1
+        if depth == 1:
+            return len(self._moves())
+        total = 0
+        for move in self._moves():
+            undo, won = self._make(move)
+            if not won:
+                total += self.perft(depth - 1)
+            self._unmake(undo)
+        return total
+
+    def divide(self, depth: int) -> Dict[Tuple[Square, Square], int]:
+        """``perft(depth)`` split by root move."""
+        counts = {}
+        for move in self._moves():
+            undo, won = self._make(move)
+            counts[(self.position.coords(move[0]), self.position.coords(move[1]))] = (
+                1 if depth <= 1 else 0 if won else self.perft(depth - 1)
+            )
+            self._unmake(undo)
+        return counts
+
+    # ---- move handling ----
+
+    def _moves(self) -> List[Move]:
+        position = self.position
+        moves: List[Move] = []
+        for sq in position.owner_squares(self.turn):
+            piece = position.squares[sq]
+            moves.extend((sq, to) for to in pseudo_moves(position, self.piece_types, piece))
+        return moves
+
+    def _ordered(self, moves: List[Move], first: Optional[Move]) -> List[Move]:
+        squares = self.position.squares
+
+        def score(move: Move) -> int:
+            if move == first:
+                return INF
+            victim = squares[move[1]]
+            if victim is None:
+                return 0
+            # MVV-LVA: most valuable victim, least valuable attacker
+            return 1000 + self._value(victim.type) * 16 - self._value(squares[move[0]].type)
+
+        return sorted(moves, key=score, reverse=True)
+
+    def _make(self, move: Move) -> Tuple[Tuple[Any, ...], bool]:
+        position = self.position
+        piece = position.squares[move[0]]
+        old_type, old_promoted = piece.type, piece.promoted
+        captured = position.move(piece, move[1])
+        destination = self.teleports.get(move[1])
+        if destination is not None and position.squares[destination] is None:
+            position.move(piece, destination)
+        new_type = promotion_target(self.piece_types, piece, position.height)
+        if new_type is not None:
+            position.retype(piece, new_type, promoted=True)
+        previous_turn = self.turn
+        self.turn = self.order[(self.order.index(previous_turn) + 1) % len(self.order)]
+        won = captured is not None and self._lost(captured)
+        return (piece, move[0], captured, old_type, old_promoted, new_type, previous_turn), won
+
+    def _unmake(self, undo: Tuple[Any, ...]) -> None:
+        piece, from_sq, captured, old_type, old_promoted, new_type, previous_turn = undo
+        position = self.position
+        if new_type is not None:
+            position.retype(piece, old_type, old_promoted)
+        position.move(piece, from_sq)
+        if captured is not None:
+            position.place(captured)
+        self.turn = previous_turn
+
+    def _lost(self, captured: Any) -> bool:
+        position = self.position
+        if not position.count(captured.owner):
+            return True
+        if captured.type in self.royal:
+            return not any(position.count(captured.owner, t) for t in self.royal)
+        return False
+
+    # ---- evaluation / TT ----
+
+    def _evaluate(self) -> int:
+        position = self.position
+        if position.sparse:
+            return sum(
+                self._value(piece.type) * (1 if piece.owner == self.turn else -1)
+                for piece in position.squares.values()
+            )
+        mine = position.owner_mask(self.turn)
+        theirs = position.occupied & ~mine
+        score = 0
+        for piece_type, mask in position.by_type.items():
+            if mask:
+                score += self._value(piece_type) * ((mask & mine).bit_count() - (mask & theirs).bit_count())
+        return score
+
+    def _value(self, piece_type: str) -> int:
+        value = self.values.get(piece_type)
+        if value is None:
+            # average reach on an empty board is a workable material value for any movement spec
+            position = self.position
+            if position.sparse:
+                # no per-square tables: the reach from the centre of an empty board
+                empty = SparsePosition(position.board_type, position.width, position.height)
+                probe = _SearchPiece(piece_type, (position.width // 2, position.height // 2), self.order[0], False)
+                empty.place(probe)
+                reach = float(len(pseudo_moves(empty, self.piece_types, probe)))
+            else:
+                table = table_for(position, self.piece_types, _SearchPiece(piece_type, (0, 0), self.order[0], False))
+                reach = sum(t.bit_count() for t in table.targets) / max(1, len(table.targets))
+            value = 100 + int(min(reach, MAX_REACH) * 25)
+            if piece_type in self.royal:
+                value += 1000
+            self.values[piece_type] = value
+        return value
+
+    def _key(self) -> int:
+        return self.position.hash ^ side_key(self.turn)
+
+    def _store(self, depth: int, score: float, flag: int, move: Optional[Move]) -> None:
+        if len(self.tt) >= TT_MAX_ENTRIES:
+            self.tt.clear()
+        self.tt[self._key()] = (depth, int(score), flag, move)
+
+    def _check_budget(self) -> None:
+        if self.nodes >= self.budget.node_limit or time.perf_counter() >= self.deadline:
+            raise _BudgetExceeded()
+
+
+def search(request: SearchRequest, budget: SearchBudget) -> SearchResult:
+    return Searcher(request, budget).run()
+
+
+def perft(request: SearchRequest, depth: int) -> int:
+    # the budget only bounds run(); perft always walks the full tree
+    return Searcher(request, DIFFICULTY_BUDGETS["easy"]).perft(depth)
+
+
+# -----------------------------
+# Process pool
+# -----------------------------
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+# longest wait for one search result; searches are budgeted far below this
+SEARCH_TIMEOUT = float(os.environ.get("FLEXIBOARD_AI_TIMEOUT", "30"))
+
+
+class SearchUnavailable(Exception):
+    """The search pool crashed or timed out; the pool is rebuilt for the next request."""
+
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = int(os.environ.get("FLEXIBOARD_AI_WORKERS", "0")) or None
+            # spawn: forking a threaded server process is not safe
+            _executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        return _executor
+
+
+def submit_search(request: SearchRequest, difficulty: str) -> "Future[SearchResult]":
+    return get_executor().submit(search, request, DIFFICULTY_BUDGETS[difficulty])
+
+
+def run_search(request: SearchRequest, difficulty: str, timeout: Optional[float] = None) -> SearchResult:
+    """Search in the pool and wait for the result.
+
+    The wait goes through ``run_blocking``, so under eventlet/gevent only the
+    calling green thread waits, not the hub.
+    """
+    try:
+        future = submit_search(request, difficulty)
+        return run_blocking(future.result, SEARCH_TIMEOUT if timeout is None else timeout)
+    except BrokenProcessPool as e:
+        # a worker died; drop the pool so the next request starts a fresh one
+        shutdown_executor()
+        raise SearchUnavailable("AI worker pool crashed; retry the request") from e
+    except FutureTimeout as e:
+        future.cancel()
+        shutdown_executor(terminate=True)
+        raise SearchUnavailable("AI search timed out") from e
+
+
+def shutdown_executor(terminate: bool = False) -> None:
+    """Drop the pool; ``terminate`` also kills workers still running a search."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is None:
+        return
+    if terminate:
+        # no public API stops a running task; a stuck search would keep its CPU
+        for process in list((getattr(executor, "_processes", None) or {}).values()):
+            process.terminate()
+    executor.shutdown(wait=not terminate, cancel_futures=True)
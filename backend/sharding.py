@@ -0,0 +1,198 @@
+"""Multi-worker mode with game-affinity sharding (POSIX only).
+
+A supervisor binds the public port once and forks ``FLEXIBOARD_WORKERS``
+workers that all accept on it. Every game belongs to exactly one worker,
+chosen by hashing its id; a worker mints ids that hash to itself, so creating
+a game never leaves the process that received the request. HTTP requests for
+a game owned elsewhere are forwarded to the owner over its private Unix
+socket, carrying a secret the supervisor generates at startup (the owner
+trusts the forwarding marker only with that secret, so a client cannot
+sneak one in to skip routing), and room broadcasts reach the other workers through the pub/sub hub
+the supervisor runs (see pubsub.py). Game state is never shared, so each
+worker scales independently.
+
+Socket.IO sessions are per-process: clients must use the ``websocket``
+transport (polling requests could land on another worker).
+"""
+
+from __future__ import annotations
+
+import hmac
+import http.client
+import json
+import logging
+import os
+import secrets
+import signal
+import socket
+import sys
+import tempfile
+import threading
+import zlib
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+from .asyncmode import serve_listener
+from .pubsub import PubSubHub
+
+logger = logging.getLogger(__name__)
+
+# set on forwarded requests (value: ShardConfig.forward_secret) so the owner never forwards them again
+FORWARDED_HEADER = "X-Flexiboard-Forwarded"
+FORWARDED_REQUEST_HEADERS = ("Content-Type", "If-Match", "If-None-Match", "Accept")
+FORWARDED_RESPONSE_HEADERS = ("content-type", "etag", "cache-control", "content-disposition")
+
+
+def shard_of(game_id: str, num_workers: int) -> int:
+    return zlib.crc32(game_id.encode("utf-8")) % num_workers
+
+
+@dataclass(frozen=True)
+class ShardConfig:
+    worker_index: int = 0
+    num_workers: int = 1
+    run_dir: str = ""
+    # shared by the workers of one supervisor; proves a request came from a sibling
+    forward_secret: str = ""
+
+    def owner_of(self, game_id: str) -> int:
+        return shard_of(game_id, self.num_workers)
+
+    def owns(self, game_id: str) -> bool:
+        return self.num_workers == 1 or self.owner_of(game_id) == self.worker_index
+
+    def is_forwarded(self, header: Optional[str]) -> bool:
+        """Whether ``header`` (the FORWARDED_HEADER value) marks a request from another worker."""
+        return bool(self.forward_secret) and hmac.compare_digest(header or "", self.forward_secret)
+
+    def new_game_id(self) -> str:
+        # about num_workers draws on average
+        while True:
+            game_id = secrets.token_hex(4)
+            if self.owns(game_id):
+                return game_id
+
+    def worker_socket(self, worker_index: int) -> str:
+        return os.path.join(self.run_dir, f"worker-{worker_index}.sock")
+
+    @property
+    def hub_socket(self) -> str:
+        return os.path.join(self.run_dir, "pubsub.sock")
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: float = 30.0) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self.path = path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.path)
+        self.sock = sock
+
+
+def forward_request(
+    shards: ShardConfig,
+    game_id: str,
+    method: str,
+    path: str,
+    body: bytes = b"",
+    headers: Optional[Mapping[str, str]] = None,
+) -> Tuple[int, bytes, Dict[str, str]]:
+    """Replay an HTTP request on the game's owner; returns (status, body, headers)."""
+    out = {FORWARDED_HEADER: shards.forward_secret}
+    for name in FORWARDED_REQUEST_HEADERS:
+        if headers is not None and name in headers:
+            out[name] = headers[name]
+    conn = UnixHTTPConnection(shards.worker_socket(shards.owner_of(game_id)))
+    try:
+        conn.request(method, path, body=body or None, headers=out)
+        response = conn.getresponse()
+        data = response.read()
+        response_headers = {k: v for k, v in response.getheaders() if k.lower() in FORWARDED_RESPONSE_HEADERS}
+        return response.status, data, response_headers
+    finally:
+        conn.close()
+
+
+def fetch_game(shards: ShardConfig, game_id: str) -> Optional[Dict[str, Any]]:
+    """``Game.to_dict()`` of a game owned by another worker, or None if it does not exist."""
+    status, data, _ = forward_request(shards, game_id, "GET", f"/api/games/{game_id}")
+    if status != 200:
+        return None
+    return json.loads(data)
+
+
+def serve_shard(app: Any, shards: ShardConfig, listen_fd: int) -> None:
+    """Serve the shared public socket plus this worker's private forwarding socket."""
+    path = shards.worker_socket(shards.worker_index)
+    if os.path.exists(path):
+        os.remove(path)  # left over from a previous run of this worker
+    internal = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    internal.bind(path)
+    internal.listen(128)
+    threading.Thread(target=serve_listener, args=(app, internal), name="flexiboard-forwarding", daemon=True).start()
+    serve_listener(app, socket.socket(fileno=listen_fd))
+
+
+def _worker_entry(
+    serve_worker: Callable[[ShardConfig, int], None], shards: ShardConfig, listen_fd: int
+) -> None:
+    serve_worker(shards, listen_fd)
+
+
+def run_workers(
+    num_workers: int, host: str, port: int, serve_worker: Callable[[ShardConfig, int], None]
+) -> None:
+    """Supervise ``num_workers`` forked workers; a worker that dies is restarted."""
+    # only the supervisor needs these; workers and single-process servers skip the import
+    import multiprocessing
+    from multiprocessing.connection import wait
+
+    try:
+        ctx = multiprocessing.get_context("fork")
+    except ValueError as e:
+        raise RuntimeError("FLEXIBOARD_WORKERS > 1 requires a POSIX platform (fork + Unix sockets)") from e
+    run_dir = os.environ.get("FLEXIBOARD_RUN_DIR") or tempfile.mkdtemp(prefix="flexiboard-")
+    os.makedirs(run_dir, exist_ok=True)
+    listener = socket.create_server((host, port), backlog=1024)
+    listener.set_inheritable(True)
+    forward_secret = secrets.token_hex(16)
+
+    def spawn(index: int) -> Any:
+        shards = ShardConfig(
+            worker_index=index, num_workers=num_workers, run_dir=run_dir, forward_secret=forward_secret
+        )
+        process = ctx.Process(
+            target=_worker_entry,
+            args=(serve_worker, shards, listener.fileno()),
+            name=f"flexiboard-worker-{index}",
+            daemon=False,
+        )
+        process.start()
+        return process
+
+    # fork before starting any thread in this process
+    workers = {index: spawn(index) for index in range(num_workers)}
+    hub = PubSubHub(ShardConfig(run_dir=run_dir).hub_socket)
+    hub.start()
+    # SIGTERM gets the same cleanup as Ctrl+C so workers are not orphaned
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    logger.info("serving %s:%d with %d workers (run dir %s)", host, port, num_workers, run_dir)
+    try:
+        while True:
+            wait([p.sentinel for p in workers.values()])
+            for index, process in list(workers.items()):
+                if not process.is_alive():
+                    logger.warning("worker %d exited with %s; restarting", index, process.exitcode)
+                    workers[index] = spawn(index)
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        for process in workers.values():
+            process.terminate()
+        for process in workers.values():
+            process.join()
+        hub.close()
+        listener.close()
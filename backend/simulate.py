@@ -0,0 +1,214 @@
+"""Headless self-play for rule balancing: ``flexiboard-simulate``.
+
+Plays many games of one board/pieces/rules triple across a process pool and
+streams win/draw/length statistics while it runs. The YAML goes through the
+same ``compile_ruleset``/``validate_settings`` as ``POST /api/games``, and
+games are played with the server's move generator, but nothing here imports
+Flask or Socket.IO.
+
+    flexiboard-simulate --board board.yaml --pieces pieces.yaml --rules rules.yaml \\
+        --games 5000 --policy random
+    flexiboard-simulate --games 200 --policy engine,random --difficulty easy
+
+``--policy`` is one policy for every player or a comma-separated list in turn
+order (``random`` or ``engine``).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .models import CompiledRuleset, Game, ValidationError, compile_ruleset, new_game
+from .movegen import finish_game, generate_moves, play_move, turn_order
+from .search import DIFFICULTY_BUDGETS, build_request, search
+
+SAMPLE_CONFIGS = Path(__file__).with_name("sample_configs")
+POLICIES = ("random", "engine")
+
+# games per pool task: large enough to amortize IPC, small enough to stream
+CHUNK_GAMES = 20
+
+# (winner or None, reason, number of moves)
+GameResult = Tuple[Optional[str], str, int]
+
+_ruleset: Optional[CompiledRuleset] = None
+
+
+def _init_worker(board_yaml: str, pieces_yaml: str, rules_yaml: str) -> None:
+    global _ruleset
+    _ruleset = compile_ruleset(board_yaml, pieces_yaml, rules_yaml)
+
+
+def play_game(
+    ruleset: CompiledRuleset, seed: int, policies: Sequence[str], difficulty: str, max_moves: int
+) -> GameResult:
+    rng = random.Random(seed)
+    game = new_game(ruleset, f"sim-{seed}")
+    order = turn_order(game)
+    policy_of = {player: policies[i % len(policies)] for i, player in enumerate(order)}
+    while game.state["status"] == "active":
+        if len(game.state["history"]) >= max_moves:
+            return None, "move_limit", max_moves
+        mover = game.state["turn"]
+        move = _choose(game, policy_of[mover], rng, difficulty)
+        if move is None:
+            # side to move is stuck: it loses (two-player) or the game is drawn
+            winner = order[(order.index(mover) + 1) % len(order)] if len(order) == 2 else None
+            finish_game(game, winner, "no_moves")
+            break
+        # victory conditions are evaluated by the move itself (backend.victory)
+        play_move(game, move[0], move[1], mover)
+    return game.state.get("winner"), game.state.get("reason", "finished"), len(game.state["history"])
+
+
+def _choose(game: Game, policy: str, rng: random.Random, difficulty: str) -> Optional[Tuple[Any, Any]]:
+    if policy == "engine":
+        return search(build_request(game), DIFFICULTY_BUDGETS[difficulty]).move
+    legal = generate_moves(game)
+    return rng.choice(legal) if legal else None
+
+
+def _play_chunk(seeds: List[int], policies: Sequence[str], difficulty: str, max_moves: int) -> List[GameResult]:
+    assert _ruleset is not None
+    return [play_game(_ruleset, seed, policies, difficulty, max_moves) for seed in seeds]
+
+
+class Stats:
+    def __init__(self, players: Sequence[str]) -> None:
+        self.players = list(players)
+        self.wins: Counter = Counter()
+        self.reasons: Counter = Counter()
+        self.lengths: List[int] = []
+
+    def add(self, result: GameResult) -> None:
+        winner, reason, length = result
+        self.wins[winner] += 1
+        self.reasons[reason] += 1
+        self.lengths.append(length)
+
+    @property
+    def games(self) -> int:
+        return len(self.lengths)
+
+    def line(self, total: int, elapsed: float) -> str:
+        n = max(self.games, 1)
+        parts = [f"{self.games}/{total}"]
+        parts += [f"{p} {self.wins[p] / n:6.1%}" for p in self.players]
+        parts.append(f"draw {self.wins[None] / n:6.1%}")
+        parts.append(f"avg len {sum(self.lengths) / n:6.1f}")
+        parts.append(f"{self.games / elapsed if elapsed else 0:7.1f} games/s")
+        return "  ".join(parts)
+
+    def summary(self) -> Dict[str, Any]:
+        n = max(self.games, 1)
+        lengths = sorted(self.lengths) or [0]
+        first = self.players[0]
+        p = self.wins[first] / n
+        return {
+            "games": self.games,
+            "wins": {player: self.wins[player] for player in self.players},
+            "draws": self.wins[None],
+            "win_rate": {player: self.wins[player] / n for player in self.players},
+            # 95% normal interval: is the first-move advantage real or noise?
+            "first_player_win_rate_ci95": [
+                max(0.0, p - 1.96 * math.sqrt(p * (1 - p) / n)),
+                min(1.0, p + 1.96 * math.sqrt(p * (1 - p) / n)),
+            ],
+            "reasons": dict(self.reasons),
+            "length": {
+                "mean": sum(lengths) / len(lengths),
+                "p10": lengths[len(lengths) // 10],
+                "p50": lengths[len(lengths) // 2],
+                "p90": lengths[min(len(lengths) - 1, len(lengths) * 9 // 10)],
+                "max": lengths[-1],
+            },
+        }
+
+
+def simulate(
+    yamls: Tuple[str, str, str],
+    games: int,
+    policies: Sequence[str],
+    difficulty: str = "easy",
+    max_moves: int = 500,
+    workers: Optional[int] = None,
+    seed: int = 0,
+    report_every: float = 1.0,
+    out: Any = sys.stderr,
+) -> Stats:
+    ruleset = compile_ruleset(*yamls)  # raises ValidationError before any worker starts
+    stats = Stats(turn_order(new_game(ruleset, "sim")))
+    seeds = [seed + i for i in range(games)]
+    chunks = [seeds[i : i + CHUNK_GAMES] for i in range(0, games, CHUNK_GAMES)]
+    start = last_report = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=yamls,
+    ) as pool:
+        futures = [pool.submit(_play_chunk, chunk, list(policies), difficulty, max_moves) for chunk in chunks]
+        for future in as_completed(futures):
+            for result in future.result():
+                stats.add(result)
+            now = time.perf_counter()
+            if now - last_report >= report_every:
+                print(stats.line(games, now - start), file=out, flush=True)
+                last_report = now
+    print(stats.line(games, time.perf_counter() - start), file=out, flush=True)
+    return stats
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="flexiboard-simulate", description="Headless self-play statistics")
+    parser.add_argument("--board", type=Path, default=SAMPLE_CONFIGS / "board_rectangular.yaml")
+    parser.add_argument("--pieces", type=Path, default=SAMPLE_CONFIGS / "pieces_basic.yaml")
+    parser.add_argument("--rules", type=Path, default=SAMPLE_CONFIGS / "rules_basic.yaml")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--policy", default="random", help="random | engine, or one per player: engine,random")
+    parser.add_argument("--difficulty", default="easy", choices=sorted(DIFFICULTY_BUDGETS))
+    parser.add_argument("--max-moves", type=int, default=500, help="game is a draw after this many moves")
+    parser.add_argument("--workers", type=int, default=0, help="processes (default: all CPUs)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--report-every", type=float, default=1.0, help="seconds between progress lines")
+    parser.add_argument("--json", type=Path, help="also write the summary here")
+    args = parser.parse_args(argv)
+
+    policies = [p.strip() for p in args.policy.split(",") if p.strip()]
+    unknown = [p for p in policies if p not in POLICIES]
+    if not policies or unknown:
+        parser.error(f"unknown policy: {', '.join(unknown) or args.policy}")
+    yamls = tuple(path.read_text(encoding="utf-8") for path in (args.board, args.pieces, args.rules))
+    try:
+        stats = simulate(
+            yamls,  # type: ignore[arg-type]
+            args.games,
+            policies,
+            difficulty=args.difficulty,
+            max_moves=args.max_moves,
+            workers=args.workers or os.cpu_count(),
+            seed=args.seed,
+            report_every=args.report_every,
+        )
+    except ValidationError as e:
+        print(f"invalid configuration: {e}", file=sys.stderr)
+        sys.exit(2)
+    summary = stats.summary()
+    print(json.dumps(summary, indent=2))
+    if args.json:
+        args.json.write_text(json.dumps(summary, indent=2) + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,346 @@
+"""Hash-based position for very large boards.
+
+The bitboard ``Position`` and the per-square move tables of ``movegen`` cost
+memory and time in proportion to the board area, which is the right trade for
+chess-sized boards but not for a 2000x2000 board holding a few hundred pieces.
+Boards of more than ``SPARSE_MAX_DENSE_SQUARES`` squares, or whose slider
+tables would hold more than ``SPARSE_MAX_TABLE_ENTRIES`` entries
+(``table_entries``: squares x longest ray, which on a quadsphere with coprime
+sides is the area squared), use ``SparsePosition`` instead:
+
+- occupancy is a dict from square index to piece, plus a set of squares per
+  owner;
+- every occupied or blocked square is also filed under the four lines through
+  it (row, column, both diagonals) as a sorted list of positions along that
+  line, so a slider finds its first blocker with one bisect and emits the
+  empty run before it without probing each square.
+
+On quadsphere boards lines are cycles: rows and columns wrap, and a diagonal
+visits ``lcm(width, height)`` squares before it returns to its start.
+Positions along a wrapped diagonal are found with the Chinese remainder
+theorem.
+
+Memory and move generation scale with the number of pieces and features
+(plus the length of the emitted moves), never with width x height.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+from bisect import bisect_left, bisect_right, insort
+from typing import TYPE_CHECKING, Any, Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .zobrist import piece_key
+
+if TYPE_CHECKING:
+    from .models import Board, Piece
+
+Offset = Tuple[int, int]
+
+# boards with more squares than this use SparsePosition (64 x 64 is the largest
+# dense board: compiling its slider tables already takes about a second)
+SPARSE_MAX_DENSE_SQUARES = int(os.environ.get("FLEXIBOARD_SPARSE_MAX_DENSE_SQUARES", "4096"))
+# ... and so do smaller boards whose slider tables would be larger than 64 x 64's
+# (long strips, quadsphere boards whose wrapped diagonals visit every square)
+SPARSE_MAX_TABLE_ENTRIES = int(os.environ.get("FLEXIBOARD_SPARSE_MAX_TABLE_ENTRIES", str(4096 * 64)))
+
+# unit direction -> (line axis, step along the line)
+AXES: Dict[Offset, Tuple[int, int]] = {
+    (1, 0): (0, 1), (-1, 0): (0, -1),
+    (0, 1): (1, 1), (0, -1): (1, -1),
+    (1, 1): (2, 1), (-1, -1): (2, -1),
+    (1, -1): (3, 1), (-1, 1): (3, -1),
+}
+
+
+def table_entries(board_type: str, width: int, height: int) -> int:
+    """Upper bound of the squares one slider direction's move table lists: squares x longest ray."""
+    if board_type == "quadsphere":
+        # a wrapped diagonal visits lcm(width, height) squares before it returns
+        longest = width * height // math.gcd(width, height)
+    else:
+        longest = max(width, height)
+    return width * height * longest
+
+
+def is_sparse(width: int, height: int, board_type: str = "rectangular") -> bool:
+    return (
+        width * height > SPARSE_MAX_DENSE_SQUARES
+        or table_entries(board_type, width, height) > SPARSE_MAX_TABLE_ENTRIES
+    )
+
+
+class _Squares(dict):
+    # reads of empty squares give None, like the dense square list
+    def __missing__(self, sq: int) -> None:
+        return None
+
+
+class SparsePosition:
+    sparse = True
+
+    __slots__ = (
+        "board_type", "width", "height", "wrap", "num_squares", "squares", "by_owner",
+        "blocked", "hash", "move_tables", "lines", "_g", "_cycle", "_inverse",
+    )
+
+    def __init__(self, board_type: str, width: int, height: int) -> None:
+        self.board_type = board_type
+        self.width = width
+        self.height = height
+        self.wrap = board_type == "quadsphere"
+        self.num_squares = width * height
+        self.squares: Dict[int, "Piece"] = _Squares()
+        self.by_owner: Dict[str, Set[int]] = {}
+        self.blocked: FrozenSet[int] = frozenset()
+        self.hash = 0
+        # movement pattern per (piece type, owner), filled by movegen
+        self.move_tables: Dict[Tuple[str, str], Any] = {}
+        # (axis, line key) -> sorted positions of occupied or blocked squares on that line
+        self.lines: Dict[Tuple[int, int], List[int]] = {}
+        # wrapped diagonals: gcd, cycle length and the CRT inverse of height/g mod width/g
+        self._g = math.gcd(width, height)
+        self._cycle = width * height // self._g
+        self._inverse = pow(height // self._g, -1, width // self._g) if width // self._g > 1 else 0
+
+    @classmethod
+    def from_board(cls, board: "Board", pieces: Iterable["Piece"]) -> "SparsePosition":
+        pos = cls(board.type, *board.size)
+        pos.block(sq for sq, cell in board.cells.items() if cell.obstacle is not None or cell.effect == "block")
+        for piece in pieces:
+            pos.place(piece)
+        return pos
+
+    def clone(self, pieces: Iterable["Piece"]) -> "SparsePosition":
+        """Same placement, occupied by ``pieces`` (copies of this position's pieces)."""
+        pos = SparsePosition.__new__(SparsePosition)
+        for name in SparsePosition.__slots__:
+            setattr(pos, name, getattr(self, name))
+        pos.squares = _Squares(self.squares)
+        pos.by_owner = {owner: set(squares) for owner, squares in self.by_owner.items()}
+        pos.move_tables = dict(self.move_tables)
+        pos.lines = {key: list(line) for key, line in self.lines.items()}
+        for piece in pieces:
+            pos.squares[pos.index(*piece.position)] = piece
+        return pos
+
+    def block(self, squares: Iterable[int]) -> None:
+        """Mark ``squares`` as squares no piece may enter (obstacles, "block" special squares)."""
+        self.blocked = frozenset(squares)
+        for sq in self.blocked:
+            self._file(sq)
+
+    # ---- coordinates ----
+
+    def index(self, x: int, y: int) -> int:
+        if self.wrap:
+            x, y = x % self.width, y % self.height
+        return y * self.width + x
+
+    def coords(self, sq: int) -> Tuple[int, int]:
+        return sq % self.width, sq // self.width
+
+    def _line(self, axis: int, x: int, y: int) -> Tuple[int, int]:
+        """(line key, position along the line) of square (x, y) on ``axis``."""
+        if axis == 0:
+            return y, x
+        if axis == 1:
+            return x, y
+        if not self.wrap:
+            return (x - y, x) if axis == 2 else (x + y, x)
+        # wrapped diagonal through (k, 0): t-th square is (k + t, +-t); solve for t
+        w, h, g = self.width, self.height, self._g
+        yy = y if axis == 2 else -y % h
+        k = (x - yy) % g
+        s = ((x - k - yy) // g * self._inverse) % (w // g)
+        return k, yy + h * s
+
+    def _cycle_length(self, axis: int) -> int:
+        return (self.width, self.height, self._cycle, self._cycle)[axis]
+
+    def _file(self, sq: int) -> None:
+        x, y = self.coords(sq)
+        for axis in range(4):
+            key, t = self._line(axis, x, y)
+            line = self.lines.get((axis, key))
+            if line is None:
+                self.lines[(axis, key)] = [t]
+            else:
+                insort(line, t)
+
+    def _unfile(self, sq: int) -> None:
+        x, y = self.coords(sq)
+        for axis in range(4):
+            key, t = self._line(axis, x, y)
+            line = self.lines[(axis, key)]
+            del line[bisect_left(line, t)]
+            if not line:
+                del self.lines[(axis, key)]
+
+    # ---- queries ----
+
+    def piece_at(self, x: int, y: int) -> Optional["Piece"]:
+        return self.squares[self.index(x, y)]
+
+    def is_occupied(self, sq: int) -> bool:
+        return sq in self.squares
+
+    def owner_squares(self, owner: str) -> Iterator[int]:
+        return iter(sorted(self.by_owner.get(owner, ())))
+
+    def count(self, owner: Optional[str] = None, piece_type: Optional[str] = None) -> int:
+        squares: Iterable[int] = self.by_owner.get(owner, ()) if owner is not None else self.squares
+        if piece_type is None:
+            return len(squares)  # type: ignore[arg-type]
+        return sum(1 for sq in squares if self.squares[sq].type == piece_type)
+
+    def pieces(self) -> Iterator["Piece"]:
+        for sq in sorted(self.squares):
+            yield self.squares[sq]
+
+    # ---- mutation ----
+
+    def place(self, piece: "Piece") -> None:
+        sq = self.index(*piece.position)
+        if sq in self.squares:
+            raise ValueError(f"Square {list(piece.position)} is already occupied")
+        self._set(piece, sq)
+
+    def remove(self, piece: "Piece") -> None:
+        self._clear(piece, self.index(*piece.position))
+
+    def move(self, piece: "Piece", to_sq: int) -> Optional["Piece"]:
+        """Move ``piece`` to ``to_sq``; returns the captured piece, if any."""
+        captured = self.squares.get(to_sq)
+        if captured is not None:
+            self._clear(captured, to_sq)
+        self._clear(piece, self.index(*piece.position))
+        piece.position = self.coords(to_sq)
+        self._set(piece, to_sq)
+        return captured
+
+    def retype(self, piece: "Piece", new_type: str, promoted: bool) -> None:
+        sq = self.index(*piece.position)
+        self.hash ^= piece_key(piece.type, piece.owner, piece.promoted, sq)
+        piece.type = new_type
+        piece.promoted = promoted
+        self.hash ^= piece_key(piece.type, piece.owner, piece.promoted, sq)
+
+    def _set(self, piece: "Piece", sq: int) -> None:
+        self.squares[sq] = piece
+        self.by_owner.setdefault(piece.owner, set()).add(sq)
+        self._file(sq)
+        self.hash ^= piece_key(piece.type, piece.owner, piece.promoted, sq)
+
+    def _clear(self, piece: "Piece", sq: int) -> None:
+        del self.squares[sq]
+        self.by_owner[piece.owner].discard(sq)
+        self._unfile(sq)
+        self.hash ^= piece_key(piece.type, piece.owner, piece.promoted, sq)
+
+    # ---- move generation ----
+
+    def moves(self, piece: "Piece", steps: Tuple[Offset, ...], rays: Tuple[Offset, ...]) -> List[int]:
+        """Destination squares of ``piece`` (same order and rules as the dense move tables)."""
+        x, y = piece.position
+        origin = self.index(x, y)
+        owner = piece.owner
+        squares, blocked = self.squares, self.blocked
+        w, h = self.width, self.height
+        moves: List[int] = []
+        for dx, dy in steps:
+            tx, ty = x + dx, y + dy
+            if self.wrap:
+                tx, ty = tx % w, ty % h
+            elif not (0 <= tx < w and 0 <= ty < h):
+                continue
+            to = ty * w + tx
+            if to == origin or to in blocked or to in moves:
+                continue
+            target = squares.get(to)
+            if target is None or target.owner != owner:
+                moves.append(to)
+        for dx, dy in rays:
+            free, stop = self._ray(x, y, dx, dy)
+            for t in range(1, free + 1):
+                tx, ty = x + dx * t, y + dy * t
+                if self.wrap:
+                    tx, ty = tx % w, ty % h
+                moves.append(ty * w + tx)
+            if stop is not None:
+                target = squares.get(stop)
+                if target is not None and target.owner != owner:
+                    moves.append(stop)
+        return moves
+
+    def reaches(self, piece: "Piece", steps: Tuple[Offset, ...], rays: Tuple[Offset, ...], to_sq: int) -> bool:
+        """Whether ``to_sq`` is in ``moves(piece, ...)``, without listing the moves."""
+        x, y = piece.position
+        if to_sq == self.index(x, y) or to_sq in self.blocked:
+            return False
+        target = self.squares.get(to_sq)
+        if target is not None and target.owner == piece.owner:
+            return False
+        tx, ty = self.coords(to_sq)
+        for dx, dy in steps:
+            if (self.wrap or (0 <= x + dx < self.width and 0 <= y + dy < self.height)) and self.index(
+                x + dx, y + dy
+            ) == to_sq:
+                return True
+        for dx, dy in rays:
+            axis, step = AXES[(dx, dy)]
+            key, t = self._line(axis, x, y)
+            to_key, to_t = self._line(axis, tx, ty)
+            if key != to_key:
+                continue
+            distance = (to_t - t) * step
+            if self.wrap:
+                distance %= self._cycle_length(axis)
+            if distance <= 0:
+                continue
+            free, stop = self._ray(x, y, dx, dy)
+            if distance <= free or stop == to_sq:
+                return True
+        return False
+
+    def _ray(self, x: int, y: int, dx: int, dy: int) -> Tuple[int, Optional[int]]:
+        """(empty squares before the first blocker, blocker square or None) from (x, y)."""
+        axis, step = AXES[(dx, dy)]
+        key, t = self._line(axis, x, y)
+        line = self.lines.get((axis, key), ())
+        w, h = self.width, self.height
+        if self.wrap:
+            cycle = self._cycle_length(axis)
+            # the square itself is on the line (it holds the moving piece)
+            others = len(line) - (1 if line and line[bisect_left(line, t) % len(line)] == t else 0)
+            if not others:
+                return cycle - 1, None
+            if step > 0:
+                i = bisect_right(line, t)
+                nearest = line[i % len(line)]
+                distance = (nearest - t) % cycle
+            else:
+                i = bisect_left(line, t) - 1
+                nearest = line[i % len(line)]
+                distance = (t - nearest) % cycle
+        else:
+            if axis == 0:
+                limit = w - 1 - x if step > 0 else x
+            elif axis == 1:
+                limit = h - 1 - y if step > 0 else y
+            elif axis == 2:
+                limit = min(w - 1 - x, h - 1 - y) if step > 0 else min(x, y)
+            else:
+                limit = min(w - 1 - x, y) if step > 0 else min(x, h - 1 - y)
+            if step > 0:
+                i = bisect_right(line, t)
+                distance = line[i] - t if i < len(line) else limit + 1
+            else:
+                i = bisect_left(line, t) - 1
+                distance = t - line[i] if i >= 0 else limit + 1
+            if distance > limit:
+                return limit, None
+        sx, sy = x + dx * distance, y + dy * distance
+        stop = self.index(sx, sy)
+        return distance - 1, None if stop in self.blocked else stop
@@ -0,0 +1,319 @@
+"""Durable per-game move log with periodic snapshots.
+
+Layout under the data directory::
+
+    <game_id>.snap   JSON snapshot: Game.to_dict() plus piece types/repetitions
+    <game_id>.log    append-only binary move records written after the snapshot
+
+Each log record is ``seq, from_x, from_y, to_x, to_y`` followed by a CRC32, so
+a torn tail from a crash is detected and ignored. Appends ``write(2)`` and
+then wait until a background flusher, which fsyncs every dirty log once per
+commit interval, has synced their record (group commit): an acknowledged
+move is on disk, and concurrent moves share one fsync per log. Queued
+snapshots are written by the same flusher.
+Recovery loads each snapshot and replays the log records past its sequence
+number.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from .asyncmode import run_blocking
+
+if TYPE_CHECKING:
+    from .models import Game
+
+RECORD = struct.Struct("<Iiiii")
+CRC = struct.Struct("<I")
+RECORD_SIZE = RECORD.size + CRC.size
+
+SNAPSHOT_SUFFIX = ".snap"
+LOG_SUFFIX = ".log"
+
+
+def encode_record(seq: int, from_pos: Tuple[int, int], to_pos: Tuple[int, int]) -> bytes:
+    body = RECORD.pack(seq, from_pos[0], from_pos[1], to_pos[0], to_pos[1])
+    return body + CRC.pack(zlib.crc32(body))
+
+
+def decode_records(data: bytes) -> Iterator[Tuple[int, Tuple[int, int], Tuple[int, int]]]:
+    for offset in range(0, len(data) - RECORD_SIZE + 1, RECORD_SIZE):
+        body = data[offset : offset + RECORD.size]
+        (crc,) = CRC.unpack_from(data, offset + RECORD.size)
+        if zlib.crc32(body) != crc:
+            return  # torn or corrupt tail: everything after it is untrusted
+        seq, fx, fy, tx, ty = RECORD.unpack(body)
+        yield seq, (fx, fy), (tx, ty)
+
+
+class GameStore:
+    def __init__(
+        self,
+        root: str,
+        snapshot_interval: int = 64,
+        commit_interval: float = 0.005,
+        max_open_files: int = 256,
+        sync: bool = True,
+    ) -> None:
+        self.root = root
+        self.snapshot_interval = snapshot_interval
+        self.commit_interval = commit_interval
+        self.max_open_files = max_open_files
+        # False for scratch stores (spilled idle games) that need no crash safety
+        self.sync = sync
+        os.makedirs(root, exist_ok=True)
+        self._fds: "OrderedDict[str, int]" = OrderedDict()
+        self._dirty: Set[str] = set()
+        self._last_seq: Dict[str, int] = {}
+        self._snapshot_seq: Dict[str, int] = {}
+        self._snapshots: List[Tuple[str, int, bytes]] = []
+        self._lock = threading.Lock()
+        # appends are numbered; ``_synced`` is the last one a finished flush covers
+        self._written = 0
+        self._synced = 0
+        self._synced_cond = threading.Condition(self._lock)
+        # serializes snapshot files (flusher vs. synchronous writes of the same game)
+        self._snapshot_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        self.recovery_stats: Dict[str, Any] = {}
+
+    # ---- paths ----
+
+    def _path(self, game_id: str, suffix: str) -> str:
+        return os.path.join(self.root, game_id + suffix)
+
+    # ---- writes ----
+
+    def start(self) -> None:
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_loop, name="flexiboard-group-commit", daemon=True)
+            self._flusher.start()
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join()
+            self._flusher = None
+        self.flush()
+        with self._lock:
+            for fd in self._fds.values():
+                os.close(fd)
+            self._fds.clear()
+
+    def flush(self) -> None:
+        """Make every accepted append and queued snapshot durable now."""
+        with self._lock:
+            # dup so fsync can run without blocking appenders (or racing fd eviction)
+            fds = [os.dup(self._fds[game_id]) for game_id in self._dirty if game_id in self._fds]
+            self._dirty.clear()
+            snapshots, self._snapshots = self._snapshots, []
+            written = self._written
+        try:
+            for fd in fds:
+                run_blocking(os.fsync, fd)
+        finally:
+            for fd in fds:
+                os.close(fd)
+        with self._lock:
+            # evicted logs were fsynced when their fd was closed, so this covers every append so far
+            if written > self._synced:
+                self._synced = written
+                self._synced_cond.notify_all()
+        for game_id, seq, data in snapshots:
+            self._write_snapshot(game_id, seq, data)
+
+    def append_move(self, game: "Game") -> None:
+        """Log the game's latest move; queues a snapshot every ``snapshot_interval`` moves."""
+        history = game.state["history"]
+        seq = len(history) - 1
+        data = encode_record(seq, *history.squares(seq))
+        with self._lock:
+            os.write(self._fd(game.id), data)
+            self._dirty.add(game.id)
+            self._last_seq[game.id] = seq
+            self._written += 1
+            ticket = self._written
+        if len(history) % self.snapshot_interval == 0:
+            self.save_snapshot(game)
+        self._wait_synced(ticket)
+
+    def append_moves(self, game: "Game", count: int) -> None:
+        """Log the game's latest ``count`` moves with one write."""
+        if count <= 0:
+            return
+        history = game.state["history"]
+        end = len(history)
+        start = end - count
+        data = b"".join(encode_record(seq, *history.squares(seq)) for seq in range(start, end))
+        with self._lock:
+            os.write(self._fd(game.id), data)
+            self._dirty.add(game.id)
+            self._last_seq[game.id] = end - 1
+            self._written += 1
+            ticket = self._written
+        if end // self.snapshot_interval != start // self.snapshot_interval:
+            self.save_snapshot(game)
+        self._wait_synced(ticket)
+
+    def _wait_synced(self, ticket: int) -> None:
+        """Return once a flush has fsynced append number ``ticket``."""
+        if not self.sync:
+            return
+        if self._flusher is not None:
+            with self._synced_cond:
+                # a stuck or dead flusher must not hang the move: sync it ourselves then
+                if self._synced_cond.wait_for(
+                    lambda: self._synced >= ticket, timeout=max(1.0, 100 * self.commit_interval)
+                ):
+                    return
+        self.flush()
+
+    def save_snapshot(self, game: "Game") -> None:
+        # serialize now (the game keeps changing); the flusher does the disk work
+        seq, data = self._serialize(game)
+        with self._lock:
+            self._snapshots.append((game.id, seq, data))
+        if self._flusher is None:
+            self.flush()
+
+    def write_snapshot_now(self, game: "Game") -> None:
+        """Synchronous snapshot (used when a game is evicted from memory)."""
+        seq, data = self._serialize(game)
+        self._write_snapshot(game.id, seq, data)
+
+    def has_snapshot(self, game_id: str) -> bool:
+        return os.path.exists(self._path(game_id, SNAPSHOT_SUFFIX))
+
+    def _serialize(self, game: "Game") -> Tuple[int, bytes]:
+        seq = len(game.state.get("history", []))
+        payload = {
+            "seq": seq,
+            "game": {**game.to_dict(), "initial_pieces": game.initial_layout()},
+            "piece_types": game.piece_types,
+            "repetitions": {f"{k:x}": v for k, v in game.repetitions.items()},
+        }
+        return seq, json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+    def _write_snapshot(self, game_id: str, seq: int, data: bytes) -> None:
+        with self._snapshot_lock:
+            # a queued older snapshot must not replace a newer synchronous one
+            if self._snapshot_seq.get(game_id, -1) > seq:
+                return
+            self._snapshot_seq[game_id] = seq
+            path = self._path(game_id, SNAPSHOT_SUFFIX)
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+                if self.sync:
+                    f.flush()
+                    run_blocking(os.fsync, f.fileno())
+            os.replace(tmp, path)
+        with self._lock:
+            # log records before ``seq`` are folded into the snapshot; only drop the
+            # log when nothing newer was appended meanwhile (recovery skips old records anyway)
+            if self._last_seq.get(game_id, -1) < seq and game_id in self._fds:
+                os.ftruncate(self._fds[game_id], 0)
+                self._dirty.discard(game_id)
+
+    def delete(self, game_id: str) -> None:
+        with self._lock:
+            fd = self._fds.pop(game_id, None)
+            if fd is not None:
+                os.close(fd)
+            self._dirty.discard(game_id)
+            self._last_seq.pop(game_id, None)
+            self._snapshot_seq.pop(game_id, None)
+        for suffix in (SNAPSHOT_SUFFIX, LOG_SUFFIX):
+            try:
+                os.remove(self._path(game_id, suffix))
+            except FileNotFoundError:
+                pass
+
+    def _fd(self, game_id: str) -> int:
+        # caller holds self._lock
+        fd = self._fds.get(game_id)
+        if fd is not None:
+            self._fds.move_to_end(game_id)
+            return fd
+        fd = os.open(self._path(game_id, LOG_SUFFIX), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self._fds[game_id] = fd
+        while len(self._fds) > self.max_open_files:
+            old_id, old_fd = self._fds.popitem(last=False)
+            if old_id in self._dirty:
+                os.fsync(old_fd)
+                self._dirty.discard(old_id)
+            os.close(old_fd)
+        return fd
+
+    def _flush_loop(self) -> None:
+        while not self._stop.wait(self.commit_interval):
+            self.flush()
+
+    # ---- recovery ----
+
+    def game_ids(self) -> List[str]:
+        return [name[: -len(SNAPSHOT_SUFFIX)] for name in os.listdir(self.root) if name.endswith(SNAPSHOT_SUFFIX)]
+
+    def load(
+        self,
+        game_id: str,
+        build_game: Callable[[Dict[str, Any], Dict[str, Dict[str, Any]]], "Game"],
+        replay_move: Callable[["Game", Tuple[int, int], Tuple[int, int]], Any],
+    ) -> "Game":
+        with open(self._path(game_id, SNAPSHOT_SUFFIX), "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        game = build_game(payload["game"], payload["piece_types"])
+        game.repetitions = {int(k, 16): v for k, v in payload.get("repetitions", {}).items()} or game.repetitions
+        try:
+            with open(self._path(game_id, LOG_SUFFIX), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            data = b""
+        for seq, from_pos, to_pos in decode_records(data):
+            history_len = len(game.state.get("history", []))
+            if seq < history_len:
+                continue  # already folded into the snapshot
+            if seq != history_len:
+                break  # gap: the rest cannot be applied consistently
+            replay_move(game, from_pos, to_pos)
+        return game
+
+    def recover(
+        self,
+        build_game: Callable[[Dict[str, Any], Dict[str, Dict[str, Any]]], "Game"],
+        replay_move: Callable[["Game", Tuple[int, int], Tuple[int, int]], Any],
+        owns: Optional[Callable[[str], bool]] = None,
+    ) -> Tuple[Dict[str, "Game"], Dict[str, Any]]:
+        """Load every stored game (only those ``owns`` accepts, when given)."""
+        start = time.perf_counter()
+        games: Dict[str, "Game"] = {}
+        failed: List[str] = []
+        for game_id in self.game_ids():
+            if owns is not None and not owns(game_id):
+                continue
+            try:
+                games[game_id] = self.load(game_id, build_game, replay_move)
+            except Exception:  # a broken file must not keep the other games down
+                failed.append(game_id)
+        stats = {"games": len(games), "failed": failed, "seconds": time.perf_counter() - start}
+        return games, stats
+
+
+def store_from_env() -> Optional[GameStore]:
+    root = os.environ.get("FLEXIBOARD_DATA_DIR")
+    if not root:
+        return None
+    return GameStore(
+        root,
+        snapshot_interval=int(os.environ.get("FLEXIBOARD_SNAPSHOT_INTERVAL", "64")),
+        commit_interval=float(os.environ.get("FLEXIBOARD_COMMIT_INTERVAL_MS", "5")) / 1000.0,
+    )
@@ -0,0 +1,183 @@
+"""Incremental evaluation of ``rules.victory_conditions``.
+
+The conditions are compiled once per rule set into square/type sets
+(``VictoryConditions``); every game keeps a few counters over them
+(``VictoryTracker``) that ``movegen.apply_move`` updates as pieces move, are
+captured, teleport or promote. Checking for a winner after a move is then a
+handful of dict lookups, however many pieces are on the board.
+
+- ``capture_king`` (``value``: piece type): capturing an owner's last royal
+  piece wins;
+- ``eliminate_all``: the mover wins once every other player is out of pieces;
+- ``control_center`` (``value``: squares, default the central 1-4 squares):
+  one player occupies all of them;
+- ``reach_square`` (``value``: a square or a list of squares): a piece ends
+  its move there;
+- ``score`` (``value``: target): captures score the captured type's
+  ``points`` (default 1), stopping on a ``bonus`` square scores its value.
+
+Conditions are checked in the order the rules list them; the first one met
+ends the game, won by the player who moved.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .models import Board, Piece, Rules
+
+
+@dataclass(frozen=True)
+class VictoryConditions:
+    # condition types in rule order, each listed once
+    order: Tuple[str, ...]
+    royal: FrozenSet[str]
+    center: FrozenSet[int]
+    targets: FrozenSet[int]
+    score_target: Optional[float]
+    # piece type -> points for capturing it (types without "points" score 1)
+    points: Dict[str, float]
+    # square -> points for stopping there
+    bonus: Dict[int, float]
+
+
+def square_list(value: Any) -> List[Tuple[int, int]]:
+    """``[x, y]`` or ``[[x, y], ...]`` as a list of squares (empty if malformed)."""
+    if isinstance(value, list) and len(value) == 2 and all(isinstance(v, int) for v in value):
+        return [(value[0], value[1])]
+    if isinstance(value, list) and value and all(
+        isinstance(v, list) and len(v) == 2 and all(isinstance(c, int) for c in v) for v in value
+    ):
+        return [(v[0], v[1]) for v in value]
+    return []
+
+
+def center_squares(width: int, height: int) -> List[Tuple[int, int]]:
+    xs = [width // 2] if width % 2 else [width // 2 - 1, width // 2]
+    ys = [height // 2] if height % 2 else [height // 2 - 1, height // 2]
+    return [(x, y) for y in ys for x in xs]
+
+
+def compile_victory(rules: "Rules", board: "Board", piece_types: Dict[str, Dict[str, Any]]) -> VictoryConditions:
+    order: List[str] = []
+    royal, center, targets = set(), set(), set()
+    score_target = None
+    for condition in rules.victory_conditions:
+        kind = condition.get("type")
+        value = condition.get("value")
+        if kind not in order:
+            order.append(kind)
+        if kind == "capture_king":
+            royal.add(value)
+        elif kind == "control_center":
+            center.update(board.index(*sq) for sq in (square_list(value) or center_squares(*board.size)))
+        elif kind == "reach_square":
+            targets.update(board.index(*sq) for sq in square_list(value))
+        elif kind == "score" and value is not None:
+            score_target = float(value) if score_target is None else min(score_target, float(value))
+    bonus = {}
+    if score_target is not None:
+        bonus = {sq: float(cell.value or 0) for sq, cell in board.cells.items() if cell.effect == "bonus"}
+    return VictoryConditions(
+        order=tuple(order),
+        royal=frozenset(royal),
+        center=frozenset(center),
+        targets=frozenset(targets),
+        score_target=score_target,
+        points={name: float(pt.get("points", 1)) for name, pt in piece_types.items()},
+        bonus=bonus,
+    )
+
+
+class VictoryTracker:
+    """Per-game counters over one ``VictoryConditions``; see ``movegen.apply_move``."""
+
+    __slots__ = ("conditions", "royal_left", "pieces_left", "center_held", "alive")
+
+    def __init__(self, conditions: VictoryConditions, pieces: Iterable["Piece"], board: "Board") -> None:
+        self.conditions = conditions
+        self.royal_left: Dict[str, int] = {}
+        self.pieces_left: Dict[str, int] = {}
+        self.center_held: Dict[str, int] = {}
+        for piece in pieces:
+            owner = piece.owner
+            self.pieces_left[owner] = self.pieces_left.get(owner, 0) + 1
+            if piece.type in conditions.royal:
+                self.royal_left[owner] = self.royal_left.get(owner, 0) + 1
+            if board.index(*piece.position) in conditions.center:
+                self.center_held[owner] = self.center_held.get(owner, 0) + 1
+        # players that still have pieces
+        self.alive = sum(1 for count in self.pieces_left.values() if count)
+
+    def copy(self) -> "VictoryTracker":
+        clone = object.__new__(VictoryTracker)
+        clone.conditions = self.conditions
+        clone.royal_left = dict(self.royal_left)
+        clone.pieces_left = dict(self.pieces_left)
+        clone.center_held = dict(self.center_held)
+        clone.alive = self.alive
+        return clone
+
+    # ---- updates (called by movegen.apply_move) ----
+
+    def moved(self, owner: str, from_sq: int, to_sq: int) -> None:
+        center = self.conditions.center
+        if center:
+            held = (to_sq in center) - (from_sq in center)
+            if held:
+                self.center_held[owner] = self.center_held.get(owner, 0) + held
+
+    def captured(self, piece: "Piece", sq: int) -> None:
+        owner = piece.owner
+        self.pieces_left[owner] -= 1
+        if not self.pieces_left[owner]:
+            self.alive -= 1
+        if piece.type in self.conditions.royal:
+            self.royal_left[owner] -= 1
+        if sq in self.conditions.center:
+            self.center_held[owner] -= 1
+
+    def retyped(self, owner: str, old_type: str, new_type: str) -> None:
+        royal = self.conditions.royal
+        change = (new_type in royal) - (old_type in royal)
+        if change:
+            self.royal_left[owner] = self.royal_left.get(owner, 0) + change
+
+    # ---- evaluation ----
+
+    def score(self, state: Dict[str, Any], mover: str, captured: Optional["Piece"], landing_sq: int) -> None:
+        """Add the move's points to ``state["scores"]`` (replaced, never mutated in place)."""
+        conditions = self.conditions
+        gained = conditions.bonus.get(landing_sq, 0.0)
+        if captured is not None:
+            gained += conditions.points.get(captured.type, 1.0)
+        if gained:
+            scores = dict(state.get("scores") or {})
+            scores[mover] = scores.get(mover, 0) + gained
+            state["scores"] = scores
+
+    def winner(
+        self, state: Dict[str, Any], mover: str, captured: Optional["Piece"], landing_sq: int
+    ) -> Optional[str]:
+        """Reason the mover has just won, or None."""
+        conditions = self.conditions
+        for kind in conditions.order:
+            if kind == "capture_king":
+                if captured is not None and captured.type in conditions.royal and not self.royal_left[captured.owner]:
+                    return kind
+            elif kind == "eliminate_all":
+                if captured is not None and self.alive == 1 and self.pieces_left.get(mover):
+                    return kind
+            elif kind == "control_center":
+                if conditions.center and self.center_held.get(mover, 0) == len(conditions.center):
+                    return kind
+            elif kind == "reach_square":
+                if landing_sq in conditions.targets:
+                    return kind
+            elif kind == "score":
+                target = conditions.score_target
+                if target is not None and (state.get("scores") or {}).get(mover, 0) >= target:
+                    return kind
+        return None
@@ -0,0 +1,28 @@
+"""Zobrist keys for incremental position hashing.
+
+Keys are derived from a keyed BLAKE2 digest of the feature instead of a
+random table, so they are generated lazily for any piece type/board size and
+are identical in every process (search workers, other shards).
+"""
+
+from __future__ import annotations
+
+import hashlib
+from functools import lru_cache
+
+ZOBRIST_SEED = b"flexiboard-zobrist-v1"
+
+
+def _key(feature: str) -> int:
+    digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8, key=ZOBRIST_SEED).digest()
+    return int.from_bytes(digest, "little")
+
+
+@lru_cache(maxsize=65536)
+def piece_key(piece_type: str, owner: str, promoted: bool, sq: int) -> int:
+    return _key(f"piece|{piece_type}|{owner}|{int(promoted)}|{sq}")
+
+
+@lru_cache(maxsize=64)
+def side_key(owner: str) -> int:
+    return _key(f"side|{owner}")
@@ -9,6 +9,7 @@ class APIManager {
         this.socket = null;
         this.gameState = null;
         this.currentGameId = null;
+        this.seq = 0; // 受信済みの手数（サーバーの差分シーケンス番号）
     }
 
     /**
@@ -414,6 +415,7 @@ class APIManager {
             if (response.game_id) {
                 this.currentGameId = gameId;
                 this.gameState = response;
+                this.seq = (response.state.history || []).length;
 
                 // WebSocket接続の初期化
                 this.initWebSocket(gameId);
@@ -446,7 +448,8 @@ class APIManager {
             this.socket.disconnect();
         }
 
-        this.socket = io('http://localhost:8001');
+        // websocket を優先（マルチワーカー構成ではポーリングのセッションがワーカー間で共有されない）
+        this.socket = io('http://localhost:8001', { transports: ['websocket', 'polling'] });
 
         this.socket.on('connect', () => {
             console.log('WebSocket connected');
@@ -457,14 +460,16 @@ class APIManager {
             console.log('WebSocket disconnected');
         });
 
-        this.socket.on('update', (data) => {
-            console.log('Game state updated:', data);
-            this.handleGameUpdate(data);
+        // 参加時に一度だけ全体スナップショットを受信
+        this.socket.on('snapshot', (data) => {
+            console.log('Game snapshot received:', data.seq);
+            this.handleSnapshot(data);
+        });
 
-            // ゲームマネージャーに状態更新を通知
-            if (window.gameManager) {
-                window.gameManager.handleGameStateUpdate(data);
-            }
+        // 以降は新しい手と変化したマスのみの差分を受信
+        this.socket.on('delta', (data) => {
+            console.log('Game delta received:', data.base, '->', data.seq);
+            this.handleDelta(data);
         });
 
         this.socket.on('error', (data) => {
@@ -474,13 +479,52 @@ class APIManager {
     }
 
     /**
-     * ゲーム状態の更新を処理
-     * @param {Object} data - 更新データ
+     * スナップショットでゲーム状態を置き換え
+     * @param {Object} data - { game_id, seq, game }
+     */
+    handleSnapshot(data) {
+        this.gameState = data.game;
+        this.seq = data.seq;
+        this.notifyGameUpdate();
+    }
+
+    /**
+     * 差分をゲーム状態に適用（欠落を検知したら再同期を要求）
+     * @param {Object} data - { game_id, base, seq, moves, squares, state }
+     */
+    handleDelta(data) {
+        if (!this.gameState || data.seq <= this.seq) return;
+
+        if (data.base !== this.seq) {
+            this.socket.emit('resync', { game_id: this.currentGameId, since: this.seq });
+            return;
+        }
+
+        const key = (pos) => `${pos[0]},${pos[1]}`;
+        const touched = new Set(data.squares.map(sq => key(sq.position)));
+        const pieces = this.gameState.pieces.filter(p => !touched.has(key(p.position)));
+        data.squares.forEach(sq => {
+            if (sq.piece) pieces.push(sq.piece);
+        });
+
+        const history = (this.gameState.state.history || []).concat(data.moves);
+        this.gameState = {
+            ...this.gameState,
+            pieces: pieces,
+            state: { ...data.state, history: history }
+        };
+        this.seq = data.seq;
+        this.notifyGameUpdate();
+    }
+
+    /**
+     * 更新後のゲーム状態をUI・ゲームマネージャーへ通知
      */
-    handleGameUpdate(data) {
-        if (data.state) {
-            this.gameState = { ...this.gameState, ...data.state };
-            this.updateUI();
+    notifyGameUpdate() {
+        this.updateUI();
+
+        if (window.gameManager) {
+            window.gameManager.handleGameStateUpdate(this.gameState);
         }
     }
 
@@ -560,6 +604,35 @@ class APIManager {
         }
     }
 
+    /**
+     * サーバー側AIに手を指させる
+     * @param {string} player - AIプレイヤーID
+     * @param {string} difficulty - 難易度 ('easy', 'medium', 'hard')
+     * @returns {Promise<Object>} 移動結果
+     */
+    async makeAiMove(player, difficulty) {
+        try {
+            const response = await this.request(`/games/${this.currentGameId}/ai_move`, {
+                method: 'POST',
+                body: JSON.stringify({
+                    player: player,
+                    difficulty: difficulty
+                })
+            });
+
+            return {
+                success: true,
+                data: response
+            };
+
+        } catch (error) {
+            return {
+                success: false,
+                error: error.message
+            };
+        }
+    }
+
     /**
      * ゲーム状態の取得
      * @param {string} gameId - ゲームID
@@ -579,6 +652,7 @@ class APIManager {
         }
         this.gameState = null;
         this.currentGameId = null;
+        this.seq = 0;
     }
 }
 
@@ -3,6 +3,9 @@
  * ゲームのロジックと状態管理
  */
 
+// 巨大盤面（board.sparse）で一度に描画するマス数（一辺）
+const VIEWPORT_SIZE = 16;
+
 class GameManager {
     constructor() {
         this.currentGame = null;
@@ -14,6 +17,8 @@ class GameManager {
         this.gameHistory = [];
         this.isMyTurn = false;
         this.iconMap = {};
+        // 巨大盤面（board.sparse）で表示する窓の左上座標
+        this.viewport = null;
         this.init();
     }
 
@@ -45,6 +50,9 @@ class GameManager {
      * @param {Object} gameData - ゲームデータ
      */
     setGameData(gameData) {
+        if (!this.currentGame || this.currentGame.game_id !== gameData.game_id) {
+            this.viewport = null;
+        }
         this.currentGame = gameData;
         this.players = gameData.players || [];
         this.gameHistory = gameData.state?.history || [];
@@ -114,13 +122,15 @@ class GameManager {
             statusElement.innerHTML = `⏳ ${this.currentPlayer}のターンです<br>相手の手を待っています...`;
         }
 
-        // ゲーム終了判定（簡易）
-        if (this.currentGame.state && this.currentGame.state.game_over) {
+        // ゲーム終了判定（勝敗はサーバが着手ごとに判定し state.winner / state.reason に入る）
+        const state = this.currentGame.state;
+        if (state && state.status === 'finished') {
             statusElement.className = 'game-status';
             statusElement.style.background = 'rgba(16, 185, 129, 0.1)';
             statusElement.style.color = '#065f46';
             statusElement.style.border = '1px solid rgba(16, 185, 129, 0.2)';
-            statusElement.innerHTML = '🏆 <strong>ゲーム終了</strong><br>勝者: ' + (this.currentGame.state.winner || '不明');
+            const winner = state.winner || (state.reason === 'repetition' ? '引き分け' : '不明');
+            statusElement.innerHTML = `🏆 <strong>ゲーム終了</strong><br>勝者: ${winner}` + (state.reason ? ` (${state.reason})` : '');
         }
     }
 
@@ -200,25 +210,54 @@ class GameManager {
         if (!this.currentGame || !this.boardElement) return;
 
         const { board, pieces } = this.currentGame;
-        const { type: boardType, size: boardSize, special_squares: specialSquares, obstacles } = board;
+        const { type: boardType, size: boardSize } = board;
+        const lookup = this.buildSquareLookup(board, pieces);
 
         this.boardElement.innerHTML = '';
 
-        if (boardType === 'rectangular') {
-            this.renderRectangularBoard(boardSize, pieces, specialSquares, obstacles);
+        if (board.sparse) {
+            this.renderViewport(boardType, boardSize, lookup);
+        } else if (boardType === 'rectangular') {
+            this.renderRectangularBoard(boardSize, lookup);
         } else if (boardType === 'quadsphere') {
-            this.renderQuadsphereBoard(boardSize, pieces, specialSquares, obstacles);
+            this.renderQuadsphereBoard(boardSize, lookup);
+        }
+    }
+
+    /**
+     * マスごとの参照表を作成（各マスの描画で配列を走査しないため）
+     * @param {Object} board - 盤面情報
+     * @param {Array} pieces - 駒の配列
+     * @returns {Object} { width, cells: マス番号→マス情報, pieces: "x,y"→駒, moves: "x,y"の集合 }
+     */
+    buildSquareLookup(board, pieces) {
+        const width = board.size[0];
+        let cells = board.cells;
+        if (!cells) {
+            // cells を持たない古い応答向け
+            cells = {};
+            for (const sq of board.special_squares || []) {
+                cells[sq.position[1] * width + sq.position[0]] = { effect: sq.effect, value: sq.value };
+            }
+            for (const obs of board.obstacles || []) {
+                const key = obs.position[1] * width + obs.position[0];
+                cells[key] = { ...cells[key], obstacle: obs.type };
+            }
         }
+        return {
+            width,
+            cells,
+            pieces: new Map(pieces.map(p => [`${p.position[0]},${p.position[1]}`, p])),
+            moves: new Set(this.possibleMoves.map(move => `${move[0]},${move[1]}`))
+        };
     }
 
     /**
      * 矩形盤面のレンダリング
      * @param {Array} boardSize - 盤面サイズ [width, height]
-     * @param {Array} pieces - 駒の配列
-     * @param {Array} specialSquares - 特殊マスの配列
-     * @param {Array} obstacles - 障害物の配列
+     * @param {Object} lookup - buildSquareLookup の参照表
      */
-    renderRectangularBoard(boardSize, pieces, specialSquares, obstacles) {
+    renderRectangularBoard(boardSize, lookup) {
         const [width, height] = boardSize;
 
         // 盤面コンテナの作成
@@ -234,7 +273,7 @@ class GameManager {
         // 盤面のマス目を生成
         for (let y = 0; y < height; y++) {
             for (let x = 0; x < width; x++) {
-                const square = this.createSquare(x, y, pieces, specialSquares, obstacles);
+                const square = this.createSquare(x, y, lookup);
                 boardContainer.appendChild(square);
             }
         }
@@ -254,14 +293,86 @@ class GameManager {
         this.boardElement.appendChild(infoDiv);
     }
 
+    /**
+     * 巨大盤面の一部（VIEWPORT_SIZE 四方の窓）だけをレンダリング
+     * 全マスを描画すると盤面の面積に比例するため、窓内のマスのみ作成する
+     * @param {string} boardType - 盤面タイプ
+     * @param {Array} boardSize - 盤面サイズ [width, height]
+     * @param {Object} lookup - buildSquareLookup の参照表
+     */
+    renderViewport(boardType, boardSize, lookup) {
+        const [width, height] = boardSize;
+        const wrap = boardType === 'quadsphere';
+        const size = Math.min(VIEWPORT_SIZE, width, height);
+        if (!this.viewport) {
+            // 初期表示は手番側の最初の駒の周辺
+            const turn = this.currentGame.state?.turn;
+            const piece = this.currentGame.pieces.find(p => p.owner === turn) || this.currentGame.pieces[0];
+            const [px, py] = piece ? piece.position : [0, 0];
+            this.viewport = { x0: px - Math.floor(size / 2), y0: py - Math.floor(size / 2) };
+        }
+        if (wrap) {
+            this.viewport.x0 = ((this.viewport.x0 % width) + width) % width;
+            this.viewport.y0 = ((this.viewport.y0 % height) + height) % height;
+        } else {
+            this.viewport.x0 = Math.max(0, Math.min(this.viewport.x0, width - size));
+            this.viewport.y0 = Math.max(0, Math.min(this.viewport.y0, height - size));
+        }
+        const { x0, y0 } = this.viewport;
+
+        const controls = document.createElement('div');
+        controls.style.textAlign = 'center';
+        controls.style.marginBottom = '8px';
+        const step = Math.max(1, Math.floor(size / 2));
+        [['←', -step, 0], ['↑', 0, -step], ['↓', 0, step], ['→', step, 0]].forEach(([label, dx, dy]) => {
+            const button = document.createElement('button');
+            button.textContent = label;
+            button.style.margin = '0 4px';
+            button.addEventListener('click', () => {
+                this.viewport.x0 += dx;
+                this.viewport.y0 += dy;
+                this.renderBoard();
+            });
+            controls.appendChild(button);
+        });
+        this.boardElement.appendChild(controls);
+
+        const boardContainer = document.createElement('div');
+        boardContainer.className = wrap ? 'board-container quadsphere' : 'board-container';
+        boardContainer.style.display = 'grid';
+        boardContainer.style.gridTemplateColumns = `repeat(${size}, 1fr)`;
+        boardContainer.style.gap = '1px';
+        boardContainer.style.width = 'min(80vmin, 600px)';
+        boardContainer.style.aspectRatio = '1 / 1';
+        boardContainer.style.margin = '0 auto';
+
+        for (let dy = 0; dy < size; dy++) {
+            for (let dx = 0; dx < size; dx++) {
+                const x = (x0 + dx) % width;
+                const y = (y0 + dy) % height;
+                boardContainer.appendChild(this.createSquare(x, y, lookup));
+            }
+        }
+        this.boardElement.appendChild(boardContainer);
+
+        const infoDiv = document.createElement('div');
+        infoDiv.style.marginTop = '20px';
+        infoDiv.style.textAlign = 'center';
+        infoDiv.style.fontSize = '14px';
+        infoDiv.style.color = '#666';
+        infoDiv.innerHTML = `
+            <p>巨大盤面 (${width}×${height}) のうち [${x0}, ${y0}] から ${size}×${size} マスを表示</p>
+            <p>矢印ボタンで表示位置を移動</p>
+        `;
+        this.boardElement.appendChild(infoDiv);
+    }
+
     /**
      * クアッドスフィア盤面のレンダリング
      * @param {Array} boardSize - 盤面サイズ [width, height]
-     * @param {Array} pieces - 駒の配列
-     * @param {Array} specialSquares - 特殊マスの配列
-     * @param {Array} obstacles - 障害物の配列
+     * @param {Object} lookup - buildSquareLookup の参照表
      */
-    renderQuadsphereBoard(boardSize, pieces, specialSquares, obstacles) {
+    renderQuadsphereBoard(boardSize, lookup) {
         const [width, height] = boardSize;
 
         // 盤面コンテナの作成
@@ -281,7 +392,7 @@ class GameManager {
         // 盤面のマス目を生成
         for (let y = 0; y < height; y++) {
             for (let x = 0; x < width; x++) {
-                const square = this.createSquare(x, y, pieces, specialSquares, obstacles);
+                const square = this.createSquare(x, y, lookup);
                 boardContainer.appendChild(square);
             }
         }
@@ -306,12 +417,10 @@ class GameManager {
      * 盤面のマスを作成
      * @param {number} x - X座標
      * @param {number} y - Y座標
-     * @param {Array} pieces - 駒の配列
-     * @param {Array} specialSquares - 特殊マスの配列
-     * @param {Array} obstacles - 障害物の配列
+     * @param {Object} lookup - buildSquareLookup の参照表
      * @returns {HTMLElement} マスの要素
      */
-    createSquare(x, y, pieces, specialSquares, obstacles) {
+    createSquare(x, y, lookup) {
         const square = document.createElement('div');
         square.className = 'board-square';
         square.dataset.x = x;
@@ -334,22 +443,21 @@ class GameManager {
         const isLight = (x + y) % 2 === 0;
         square.style.backgroundColor = isLight ? '#f0f0f0' : '#ddd';
 
-        // 特殊マスのチェック
-        const isSpecial = specialSquares.some(sq =>
-            sq.position[0] === x && sq.position[1] === y
-        );
+        const cell = lookup.cells[y * lookup.width + x];
+        const key = `${x},${y}`;
 
-        if (isSpecial) {
+        // 特殊マスのチェック
+        if (cell && cell.effect) {
             square.style.backgroundColor = '#fff3cd';
             square.style.border = '2px solid #ffc107';
             square.innerHTML = '★';
-            square.title = '特殊マス';
+            square.title = cell.destination
+                ? `特殊マス (teleport → ${cell.destination[0]}, ${cell.destination[1]})`
+                : `特殊マス (${cell.effect})`;
         }
 
         // 障害物のチェック
-        const isObstacle = obstacles.some(obs =>
-            obs.position[0] === x && obs.position[1] === y
-        );
+        const isObstacle = Boolean(cell && cell.obstacle);
 
         if (isObstacle) {
             square.style.backgroundColor = '#dc3545';
@@ -360,9 +468,7 @@ class GameManager {
         }
 
         // 駒のチェックと配置
-        const piece = pieces.find(p =>
-            p.position[0] === x && p.position[1] === y
-        );
+        const piece = lookup.pieces.get(key);
 
         if (piece) {
             square.innerHTML = this.getPieceSymbol(piece.type);
@@ -379,9 +485,7 @@ class GameManager {
         }
 
         // 可能な移動先の場合
-        const isPossibleMove = this.possibleMoves.some(move =>
-            move[0] === x && move[1] === y
-        );
+        const isPossibleMove = lookup.moves.has(key);
 
         if (isPossibleMove) {
             square.style.backgroundColor = '#d1fae5';
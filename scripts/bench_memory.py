@@ -0,0 +1,100 @@
+"""Measure resident memory per game and per history move.
+
+Creates N games from the sample configs (alternating board types), then plays
+random legal moves in each, and reports traced Python heap growth for both
+phases plus the process RSS.
+
+    uv run python scripts/bench_memory.py --games 100000 --moves 40
+"""
+
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+from pathlib import Path
+
+from backend.app import GAMES, create_game_from_yamls
+from backend.movegen import generate_moves, play_move
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return float("nan")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=20_000)
+    parser.add_argument("--moves", type=int, default=40, help="random moves played in every game")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-trace", action="store_true", help="skip tracemalloc (faster; RSS only)")
+    args = parser.parse_args()
+
+    base = Path("backend/sample_configs")
+    pieces_yaml = (base / "pieces_basic.yaml").read_text(encoding="utf-8")
+    rules_yaml = (base / "rules_basic.yaml").read_text(encoding="utf-8")
+    boards = [(base / name).read_text(encoding="utf-8") for name in ("board_rectangular.yaml", "board_quadsphere.yaml")]
+    rng = random.Random(args.seed)
+
+    # warm the rule set cache and move tables so they are not billed to the games
+    for board_yaml in boards:
+        game = create_game_from_yamls(board_yaml, pieces_yaml, rules_yaml)
+        generate_moves(game)
+        GAMES.pop(game.id)
+
+    gc.collect()
+    if not args.no_trace:
+        tracemalloc.start()
+    heap0 = tracemalloc.get_traced_memory()[0] if not args.no_trace else 0
+    rss0 = rss_mb()
+    start = time.perf_counter()
+    for i in range(args.games):
+        create_game_from_yamls(boards[i % 2], pieces_yaml, rules_yaml)
+    create_seconds = time.perf_counter() - start
+    gc.collect()
+    heap1 = tracemalloc.get_traced_memory()[0] if not args.no_trace else 0
+    rss1 = rss_mb()
+
+    # moves: the first move also fills each position's move-table cache, so it
+    # is played before the history measurement starts
+    for game in GAMES.values():
+        legal = generate_moves(game)
+        if legal:
+            play_move(game, *rng.choice(legal), None)
+    gc.collect()
+    heap2 = tracemalloc.get_traced_memory()[0] if not args.no_trace else 0
+    rss2 = rss_mb()
+    moves = 0
+    for game in GAMES.values():
+        for _ in range(args.moves - 1):
+            if game.state["status"] != "active":
+                break
+            legal = generate_moves(game)
+            if not legal:
+                break
+            play_move(game, *rng.choice(legal), None)
+            moves += 1
+    gc.collect()
+    heap3 = tracemalloc.get_traced_memory()[0] if not args.no_trace else 0
+    rss3 = rss_mb()
+
+    n = max(len(GAMES), 1)
+    print(f"GAMES: {len(GAMES)} created in {create_seconds:.2f}s; RSS {rss0:.0f} -> {rss1:.0f} MB "
+          f"({(rss1 - rss0) * 1024 * 1024 / n:.0f} B/game)")
+    if not args.no_trace:
+        print(f"HEAP: {(heap1 - heap0) / n:.0f} B/game after creation, "
+              f"{(heap2 - heap0) / n:.0f} B/game after the first move")
+        print(f"HISTORY: {moves} further moves, {(heap3 - heap2) / max(moves, 1):.1f} B/move")
+    print(f"RSS: {rss3:.0f} MB total ({(rss3 - rss0) * 1024 * 1024 / n:.0f} B/game with "
+          f"{moves / n + 1:.1f} moves each)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Measure crash-recovery time of the durable move log.
+
+Builds a corpus of games (default 100k) with random legal moves through
+GameStore, then times GameStore.recover() and checks every game comes back
+with the same position hash.
+
+    uv run python scripts/bench_recovery.py --games 100000 --moves 40
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from backend.app import Game, create_game_from_yamls
+from backend.movegen import generate_moves, play_move, replay_move
+from backend.storage import GameStore
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=100_000)
+    parser.add_argument("--moves", type=int, default=40, help="max random moves per game")
+    parser.add_argument("--snapshot-interval", type=int, default=64)
+    parser.add_argument("--dir", default=None, help="data directory (default: temporary)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    base = Path("backend/sample_configs")
+    pieces_yaml = (base / "pieces_basic.yaml").read_text(encoding="utf-8")
+    rules_yaml = (base / "rules_basic.yaml").read_text(encoding="utf-8")
+    boards = [(base / name).read_text(encoding="utf-8") for name in ("board_rectangular.yaml", "board_quadsphere.yaml")]
+    rng = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = args.dir or tmp
+        store = GameStore(root, snapshot_interval=args.snapshot_interval)
+        store.start()
+        expected = {}
+        moves_written = 0
+        start = time.perf_counter()
+        for i in range(args.games):
+            game = create_game_from_yamls(boards[i % 2], pieces_yaml, rules_yaml)
+            store.save_snapshot(game)
+            for _ in range(rng.randint(0, args.moves)):
+                legal = generate_moves(game)
+                if not legal or game.state["status"] != "active":
+                    break
+                from_pos, to_pos = rng.choice(legal)
+                play_move(game, from_pos, to_pos, None)
+                store.append_move(game)
+                moves_written += 1
+            expected[game.id] = game.zobrist
+        store.close()
+        write_seconds = time.perf_counter() - start
+        print(f"WRITE: {args.games} games, {moves_written} moves in {write_seconds:.2f}s "
+              f"({moves_written / max(write_seconds, 1e-9):.0f} moves/s incl. move generation)")
+
+        games, stats = GameStore(root).recover(Game.from_dict, replay_move)
+        mismatched = [gid for gid, g in games.items() if expected.get(gid) != g.zobrist]
+        print(f"RECOVER: {stats['games']} games in {stats['seconds']:.2f}s "
+              f"({stats['games'] / max(stats['seconds'], 1e-9):.0f} games/s), "
+              f"failed={len(stats['failed'])}, mismatched={len(mismatched)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Cold-start budget of ``flexiboard``: imports and time until the first request is served.
+
+Every measurement runs in a fresh interpreter and reports the median of
+``--runs``:
+
+- import time of ``backend.cli`` (the console script; spawned AI search
+  workers re-import it), ``backend.search`` (what those workers need) and
+  ``backend.app`` (Flask, Socket.IO and the server);
+- ``create_app()`` (presets are compiled on first use, not here);
+- a real server (``python -m backend.cli`` on a free port): wall time from
+  process start until ``GET /api/health`` answers, then one game created
+  with ``POST /api/games {"preset": ...}``, which includes compiling the
+  presets.
+
+It also lists which of the modules that only some requests need (PyYAML,
+the AI search stack, NumPy) a fresh ``create_app()`` has already imported.
+
+The script exits with status 1 when the median time to first response
+exceeds ``--budget-ms``.
+
+    uv run python scripts/bench_startup.py
+    uv run python scripts/bench_startup.py --runs 10 --budget-ms 1500
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from typing import Dict, List
+
+IMPORT_TIMER = (
+    "import time; start = time.perf_counter(); import {module}; "
+    "print((time.perf_counter() - start) * 1000)"
+)
+CREATE_APP_TIMER = (
+    "import time; import backend.app as a; start = time.perf_counter(); a.create_app(); "
+    "print((time.perf_counter() - start) * 1000)"
+)
+# imported on first use only: ai_move, /analysis (PyYAML is imported to validate the presets)
+LAZY_MODULES = ("backend.search", "concurrent.futures.process", "numpy")
+STARTUP_MODULES = (
+    "import sys; import backend.app as a; a.create_app(); "
+    f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+)
+
+
+def run_timer(code: str) -> float:
+    out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    return float(out.strip().splitlines()[-1])
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve_once(preset: str, timeout: float) -> Dict[str, float]:
+    """Start a server; ms until /api/health answers and for the first preset game."""
+    port = free_port()
+    env = {**os.environ, "PORT": str(port), "FLEXIBOARD_WORKERS": "1"}
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "backend.cli"], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        while True:
+            if server.poll() is not None:
+                raise RuntimeError(f"server exited with status {server.returncode}")
+            if time.perf_counter() - start > timeout:
+                raise RuntimeError(f"server not ready after {timeout:.0f}s")
+            try:
+                with urllib.request.urlopen(f"{base}/api/health", timeout=1) as response:
+                    if response.status == 200:
+                        break
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.005)
+        ready = time.perf_counter() - start
+        body = json.dumps({"preset": preset}).encode()
+        request = urllib.request.Request(f"{base}/api/games", data=body, headers={"Content-Type": "application/json"})
+        t0 = time.perf_counter()
+        with urllib.request.urlopen(request, timeout=5) as response:
+            if response.status != 201:
+                raise RuntimeError(f"preset game: HTTP {response.status}")
+        return {"ready_ms": ready * 1000, "preset_game_ms": (time.perf_counter() - t0) * 1000}
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=2000.0, help="limit for the median time to first response")
+    parser.add_argument("--preset", default="chess_vs_shogi")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    results: Dict[str, List[float]] = {}
+    for _ in range(args.runs):
+        for module in ("backend.cli", "backend.search", "backend.app"):
+            results.setdefault(f"import {module}", []).append(run_timer(IMPORT_TIMER.format(module=module)))
+        results.setdefault("create_app", []).append(run_timer(CREATE_APP_TIMER))
+        for name, ms in serve_once(args.preset, args.timeout).items():
+            results.setdefault(name, []).append(ms)
+
+    for name, values in results.items():
+        print(f"{name:<24} p50 {statistics.median(values):8.1f} ms  max {max(values):8.1f} ms")
+    out = subprocess.run([sys.executable, "-c", STARTUP_MODULES], check=True, capture_output=True, text=True).stdout
+    eager = out.strip().splitlines()[-1] if out.strip() else ""
+    print(f"lazy modules imported at startup: {eager or 'none'}")
+    ready = statistics.median(results["ready_ms"])
+    verdict = "ok" if ready <= args.budget_ms else "OVER BUDGET"
+    print(f"cold start {ready:.0f} ms (budget {args.budget_ms:.0f} ms): {verdict}")
+    sys.exit(0 if ready <= args.budget_ms else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+"""Benchmark the backend hot paths in-process and compare with a baseline.
+
+Drives ``create_app()`` through Flask's test client and Flask-SocketIO's
+test client (no network, no extra dependencies) and reports ops/s plus p50
+and p99 latency for:
+
+- game creation for every board x pieces x rules combination in
+  ``backend/sample_configs`` (rule set cache warm, and cold)
+- move submission over HTTP
+- game fetch with a growing history (serialized, and answered 304)
+- WebSocket fan-out of one move to N room members
+- parsing + validation of a large generated configuration
+
+Results are written as JSON; with a baseline file every benchmark's p50 and
+ops/s are compared and the script exits with status 1 when one regressed by
+more than ``--tolerance``. Baselines are machine-specific: record one on the
+deploy hardware with ``--save-baseline``. ``--smoke`` runs every benchmark a
+couple of times, to check the suite itself (tests/test_bench_suite.py).
+
+    uv run python scripts/bench_suite.py --output bench_results.json
+    uv run python scripts/bench_suite.py --save-baseline
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from backend.app import GAMES, RESPONSES, RULESETS, create_app, validate_settings
+from backend.movegen import generate_moves, play_move
+from backend.rulesets import load_yaml
+
+CONFIG_DIR = Path(__file__).resolve().parent.parent / "backend" / "sample_configs"
+DEFAULT_BASELINE = Path(__file__).with_name("bench_baseline.json")
+
+
+def measure(
+    name: str,
+    op: Callable[[int], Any],
+    ops: int,
+    warmup: int = 10,
+    prepare: Optional[Callable[[int], Any]] = None,
+) -> Dict[str, Any]:
+    """Run ``op(i)`` ``ops`` times and summarize the per-call latencies.
+
+    ``prepare(i)``, when given, runs before each ``op(i)`` and is not timed.
+    """
+    for i in range(warmup):
+        if prepare is not None:
+            prepare(i)
+        op(i)
+    latencies: List[float] = []
+    elapsed = 0.0
+    for i in range(ops):
+        if prepare is not None:
+            prepare(i)
+        t0 = time.perf_counter()
+        op(i)
+        latencies.append(time.perf_counter() - t0)
+        elapsed += latencies[-1]
+    latencies.sort()
+    result = {
+        "ops": ops,
+        "ops_per_sec": ops / elapsed if elapsed else float("inf"),
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+    }
+    print(f"{name:<60} {result['ops_per_sec']:>10.0f} ops/s  p50 {result['p50_ms']:8.3f} ms  p99 {result['p99_ms']:8.3f} ms")
+    return result
+
+
+def sample_configs() -> Dict[str, List[Path]]:
+    return {kind: sorted(CONFIG_DIR.glob(f"{kind}_*.yaml")) for kind in ("board", "pieces", "rules")}
+
+
+def create_body(board: Path, pieces: Path, rules: Path) -> Dict[str, str]:
+    return {
+        "board_yaml": board.read_text(encoding="utf-8"),
+        "pieces_yaml": pieces.read_text(encoding="utf-8"),
+        "rules_yaml": rules.read_text(encoding="utf-8"),
+    }
+
+
+def new_game(client: Any, body: Dict[str, str]) -> str:
+    response = client.post("/api/games", json=body)
+    assert response.status_code == 201, response.get_data(as_text=True)
+    return response.get_json()["game_id"]
+
+
+def royal_types(game: Any) -> Set[str]:
+    return {c.get("value") for c in game.rules.victory_conditions if c.get("type") == "capture_king"}
+
+
+def play_random(game_id: str, moves: int, rng: random.Random) -> int:
+    game = GAMES[game_id]
+    played = 0
+    while played < moves and game.state["status"] == "active":
+        legal = generate_moves(game)
+        if not legal:
+            break
+        play_move(game, *rng.choice(legal), None)
+        played += 1
+    return played
+
+
+def large_config(size: int, specials: int) -> Dict[str, str]:
+    """A big but valid board/pieces/rules triple built from the sample pieces."""
+    rng = random.Random(size)
+    cells = rng.sample([(x, y) for x in range(size) for y in range(3, size - 3)], 2 * specials)
+    board = {
+        "board_type": "rectangular",
+        "board_size": [size, size],
+        "special_squares": [{"position": list(p), "effect": "damage", "value": 1} for p in cells[:specials]],
+        "obstacles": [{"position": list(p), "type": "wall"} for p in cells[specials:]],
+    }
+    pieces = load_yaml((CONFIG_DIR / "pieces_basic.yaml").read_text(encoding="utf-8"))
+    pieces["initial_positions"] = {
+        "player_1": [{"type": "chess_pawn", "position": [x, 1]} for x in range(size)]
+        + [{"type": "chess_king", "position": [0, 0]}],
+        "player_2": [{"type": "chess_pawn", "position": [x, size - 2]} for x in range(size)]
+        + [{"type": "chess_king", "position": [0, size - 1]}],
+    }
+    rules = load_yaml((CONFIG_DIR / "rules_basic.yaml").read_text(encoding="utf-8"))
+    return {
+        "board_yaml": json.dumps(board),  # JSON is valid YAML
+        "pieces_yaml": json.dumps(pieces),
+        "rules_yaml": json.dumps(rules),
+    }
+
+
+def run(args: argparse.Namespace) -> Dict[str, Dict[str, Any]]:
+    app, socketio = create_app()
+    client = app.test_client()
+    rng = random.Random(args.seed)
+    scale = 0.2 if args.quick else 1.0
+    n = lambda ops: 2 if args.smoke else max(20, int(ops * scale))  # noqa: E731
+    warmup = 1 if args.smoke else 10
+    results: Dict[str, Dict[str, Any]] = {}
+
+    def bench(name: str, op: Callable[[int], Any], ops: int) -> None:
+        if args.only and args.only not in name:
+            return
+        results[name] = measure(name, op, n(ops), warmup)
+
+    configs = sample_configs()
+    combos = list(itertools.product(configs["board"], configs["pieces"], configs["rules"]))
+    for board, pieces, rules in combos:
+        body = create_body(board, pieces, rules)
+        label = f"{board.stem}+{pieces.stem}+{rules.stem}"
+        bench(f"create_game[{label}]", lambda i: new_game(client, body), 500)
+
+        def create_cold(i: int, body: Dict[str, str] = body) -> None:
+            RULESETS.clear()
+            new_game(client, body)
+
+        bench(f"create_game_cold[{label}]", create_cold, 200)
+
+    body = create_body(*combos[0])
+
+    # move submission: one fresh game per batch of moves, legal move picked outside the timer
+    state: Dict[str, Any] = {"game_id": None, "moves": 0}
+
+    def submit_move(i: int) -> None:
+        if state["game_id"] is None or state["moves"] >= 40:
+            state["game_id"], state["moves"] = new_game(client, body), 0
+        game = GAMES[state["game_id"]]
+        legal = generate_moves(game)
+        if not legal or game.state["status"] != "active":
+            state["game_id"] = None
+            return submit_move(i)
+        (fx, fy), (tx, ty) = rng.choice(legal)
+        response = client.post(f"/api/games/{state['game_id']}/move", json={"from": [fx, fy], "to": [tx, ty]})
+        assert response.status_code == 200, response.get_data(as_text=True)
+        state["moves"] += 1
+
+    bench("move", submit_move, 1000)
+
+    # fetch with growing history: every op serializes (the response cache is bypassed)
+    for length in (0, 100, 1000):
+        game_id = new_game(client, body)
+        played = play_random(game_id, length, rng)
+        # random games often end early; pad with repeats of the played records
+        # so the serialized history really has ``length`` moves
+        history = GAMES[game_id].state["history"]
+        while len(history) < length:
+            history.append(history[len(history) % played])
+        cache_size, RESPONSES.max_entries = RESPONSES.max_entries, 0
+        try:
+            bench(f"get_game[history={length}]", lambda i: client.get(f"/api/games/{game_id}"), 500)
+        finally:
+            RESPONSES.max_entries = cache_size
+    etag = client.get(f"/api/games/{game_id}").headers["ETag"]
+    bench("get_game_304", lambda i: client.get(f"/api/games/{game_id}", headers={"If-None-Match": etag}), 1000)
+
+    # WS fan-out: time from the HTTP move until every member holds the delta
+    for members in args.members:
+        if args.only and args.only not in f"ws_fanout[members={members}]":
+            continue
+        sockets = [socketio.test_client(app) for _ in range(members)]
+        room: Dict[str, Any] = {"game_id": None, "move": None}
+
+        def pick_move(i: int, sockets: List[Any] = sockets, room: Dict[str, Any] = room) -> None:
+            # untimed: moves never capture a king, and a room whose game still
+            # ended (no moves left, repetition) is replaced by a fresh one
+            game = GAMES[room["game_id"]] if room["game_id"] else None
+            legal = []
+            if game is not None and game.state["status"] == "active":
+                royal = royal_types(game)
+                for move in generate_moves(game):
+                    victim = game.position.piece_at(*move[1])
+                    if victim is None or victim.type not in royal:
+                        legal.append(move)
+            if not legal:
+                room["game_id"] = new_game(client, body)
+                for sock in sockets:
+                    sock.emit("join", {"game_id": room["game_id"]})
+                    sock.get_received()
+                return pick_move(i)
+            room["move"] = rng.choice(legal)
+
+        def fanout(i: int, sockets: List[Any] = sockets, room: Dict[str, Any] = room) -> None:
+            (fx, fy), (tx, ty) = room["move"]
+            response = client.post(f"/api/games/{room['game_id']}/move", json={"from": [fx, fy], "to": [tx, ty]})
+            assert response.status_code == 200, response.get_data(as_text=True)
+            for sock in sockets:
+                received = sock.get_received()
+                assert any(packet["name"] == "delta" for packet in received), received
+
+        results[f"ws_fanout[members={members}]"] = measure(
+            f"ws_fanout[members={members}]", fanout, n(200), warmup=min(warmup, 2), prepare=pick_move
+        )
+        for sock in sockets:
+            sock.disconnect()
+
+    big = large_config(args.large_board, args.large_specials)
+
+    def validate_large(i: int) -> None:
+        validate_settings(load_yaml(big["board_yaml"]), load_yaml(big["pieces_yaml"]), load_yaml(big["rules_yaml"]))
+
+    bench(f"validate_large[{args.large_board}x{args.large_board}]", validate_large, 50)
+    return results
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], tolerance: float) -> List[str]:
+    regressions = []
+    print(f"\n{'benchmark':<60} {'p50 vs baseline':>16} {'ops/s vs baseline':>18}")
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<60} {'(new)':>16}")
+            continue
+        p50_ratio = result["p50_ms"] / base["p50_ms"] if base["p50_ms"] else 1.0
+        ops_ratio = result["ops_per_sec"] / base["ops_per_sec"] if base["ops_per_sec"] else 1.0
+        flag = ""
+        if p50_ratio > 1 + tolerance or ops_ratio < 1 / (1 + tolerance):
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<60} {p50_ratio:>15.2f}x {ops_ratio:>17.2f}x{flag}")
+    return regressions
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--output", type=Path, default=Path("bench_results.json"))
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before failing (0.25 = 25%%)")
+    parser.add_argument("--quick", action="store_true", help="fewer iterations (noisier)")
+    parser.add_argument("--smoke", action="store_true", help="two iterations per benchmark (checks the suite runs)")
+    parser.add_argument("--only", help="run only benchmarks whose name contains this")
+    parser.add_argument("--members", type=int, nargs="+", default=[1, 10, 100], help="room sizes for ws_fanout")
+    parser.add_argument("--large-board", type=int, default=128)
+    parser.add_argument("--large-specials", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+
+    results = run(args)
+    report = {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "async_mode": os.environ.get("FLEXIBOARD_ASYNC_MODE", "threading"),
+        },
+        "results": results,
+    }
+    args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    print(f"\nresults written to {args.output}")
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"baseline written to {args.baseline}")
+        return
+    if not args.baseline.exists():
+        print(f"no baseline at {args.baseline}; run with --save-baseline to record one")
+        return
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    regressions = compare(results, baseline.get("results", {}), args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+    print("\nno regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""WebSocket fan-out load test against a local server.
+
+Starts ``python -m backend.app`` in the requested FLEXIBOARD_ASYNC_MODE, opens
+N Socket.IO connections that all join one game room, then plays moves over
+HTTP and measures how long each delta takes to reach every member. Reports
+the server's resident memory before and after the sockets connect.
+
+Needs the async client extras (``pip install "python-socketio[asyncio_client]"``)
+and enough file descriptors (``ulimit -n``) on both sides:
+
+    uv run python scripts/load_ws.py --mode eventlet --sockets 10000 --moves 20
+"""
+
+import argparse
+import asyncio
+import os
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import aiohttp
+import socketio
+
+
+def rss_mb(pid: int) -> Optional[float]:
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def raise_fd_limit() -> None:
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+async def wait_healthy(http: aiohttp.ClientSession, url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            async with http.get(f"{url}/api/health") as resp:
+                if resp.status == 200:
+                    return
+        except aiohttp.ClientError:
+            pass
+        if time.monotonic() >= deadline:
+            raise RuntimeError(f"server at {url} did not become healthy")
+        await asyncio.sleep(0.2)
+
+
+async def create_game(http: aiohttp.ClientSession, url: str) -> str:
+    base = Path("backend/sample_configs")
+    body = {
+        "board_yaml": (base / "board_rectangular.yaml").read_text(encoding="utf-8"),
+        "pieces_yaml": (base / "pieces_basic.yaml").read_text(encoding="utf-8"),
+        "rules_yaml": (base / "rules_basic.yaml").read_text(encoding="utf-8"),
+    }
+    async with http.post(f"{url}/api/games", json=body) as resp:
+        return (await resp.json())["game_id"]
+
+
+async def connect_members(url: str, game_id: str, count: int, batch: int, received: Dict[int, List[float]]):
+    clients = []
+
+    async def connect_one() -> None:
+        client = socketio.AsyncClient(reconnection=False)
+        joined = asyncio.Event()
+
+        @client.on("snapshot")
+        async def on_snapshot(data):  # noqa: ANN001
+            joined.set()
+
+        @client.on("delta")
+        async def on_delta(data):  # noqa: ANN001
+            received.setdefault(data["seq"], []).append(time.perf_counter())
+
+        await client.connect(url, transports=["websocket"])
+        await client.emit("join", {"game_id": game_id})
+        await joined.wait()
+        clients.append(client)
+
+    for start in range(0, count, batch):
+        await asyncio.gather(*(connect_one() for _ in range(min(batch, count - start))))
+    return clients
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run(args: argparse.Namespace, server_pid: Optional[int]) -> None:
+    received: Dict[int, List[float]] = {}
+    async with aiohttp.ClientSession() as http:
+        await wait_healthy(http, args.url)
+        game_id = await create_game(http, args.url)
+        rss_before = rss_mb(server_pid) if server_pid else None
+
+        start = time.perf_counter()
+        clients = await connect_members(args.url, game_id, args.sockets, args.batch, received)
+        connect_seconds = time.perf_counter() - start
+        await asyncio.sleep(1.0)
+        rss_after = rss_mb(server_pid) if server_pid else None
+        print(f"CONNECT: {len(clients)} sockets joined in {connect_seconds:.2f}s")
+        if rss_before is not None and rss_after is not None:
+            per_socket = (rss_after - rss_before) * 1024 / max(len(clients), 1)
+            print(f"MEMORY: server RSS {rss_before:.1f} -> {rss_after:.1f} MB ({per_socket:.1f} KB/socket)")
+
+        latencies: List[float] = []
+        complete = 0
+        for _ in range(args.moves):
+            async with http.get(f"{args.url}/api/games/{game_id}/legal_moves") as resp:
+                moves = (await resp.json())["moves"]
+            if not moves:
+                break
+            sent = time.perf_counter()
+            async with http.post(f"{args.url}/api/games/{game_id}/move", json=moves[0]) as resp:
+                seq = len((await resp.json())["state"]["history"])
+            deadline = sent + args.timeout
+            while len(received.get(seq, [])) < len(clients) and time.perf_counter() < deadline:
+                await asyncio.sleep(0.01)
+            arrivals = received.get(seq, [])
+            complete += len(arrivals) == len(clients)
+            latencies.extend(t - sent for t in arrivals)
+
+        if latencies:
+            print(
+                f"FANOUT: {complete}/{args.moves} moves reached every socket; "
+                f"delivery p50={percentile(latencies, 0.5) * 1000:.1f}ms "
+                f"p99={percentile(latencies, 0.99) * 1000:.1f}ms max={max(latencies) * 1000:.1f}ms"
+            )
+        await asyncio.gather(*(client.disconnect() for client in clients), return_exceptions=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mode", default="eventlet", help="FLEXIBOARD_ASYNC_MODE for the spawned server")
+    parser.add_argument("--sockets", type=int, default=1000)
+    parser.add_argument("--batch", type=int, default=200, help="concurrent connection attempts")
+    parser.add_argument("--moves", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds to wait for one delta fan-out")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--url", default=None, help="use an already running server instead of spawning one")
+    args = parser.parse_args()
+
+    raise_fd_limit()
+    server = None
+    if args.url is None:
+        args.url = f"http://127.0.0.1:{args.port}"
+        env = dict(os.environ, PORT=str(args.port), FLEXIBOARD_ASYNC_MODE=args.mode)
+        server = subprocess.Popen([sys.executable, "-m", "backend.app"], env=env, stdout=subprocess.DEVNULL)
+    try:
+        asyncio.run(run(args, server.pid if server else None))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
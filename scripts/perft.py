@@ -0,0 +1,229 @@
+"""Perft: count move-generation leaf nodes to depth N, for correctness and speed.
+
+Positions are built with ``create_game_from_yamls`` (optionally after a list
+of prefix moves) and counted with the engine's make/unmake walk
+(``Searcher.perft``), reporting nodes/s. A capture that wins the game ends
+its line; repetition draws are not applied.
+
+    # one position
+    uv run python scripts/perft.py --depth 4
+    uv run python scripts/perft.py --board backend/sample_configs/board_quadsphere.yaml --depth 4 --divide
+
+    # regression corpus (exit status 1 on any mismatch)
+    uv run python scripts/perft.py --corpus scripts/perft_corpus.json
+    uv run python scripts/perft.py --corpus scripts/perft_corpus.json --verify 3
+
+``--verify D`` also counts up to depth D with ``naive_moves``, a reference
+generator that walks the movement offsets with ``Board.normalize_pos`` over
+a dict of occupied squares (no move tables, no bitboards), applying every
+move through the server's own path (``play_move`` + state restore). The
+engine's fast walk, the tables and the API's move handling are all checked
+against it. ``tests/test_perft.py`` runs the same cross-check under pytest.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.app import GAMES, Game, create_game_from_yamls
+from backend.movegen import (
+    RAY_PATTERNS,
+    STEP_PATTERNS,
+    Square,
+    forward_direction,
+    play_move,
+    restore_state,
+    save_state,
+)
+from backend.search import Searcher, DIFFICULTY_BUDGETS, build_request
+
+CONFIG_DIR = Path("backend/sample_configs")
+DEFAULT_CORPUS = Path(__file__).with_name("perft_corpus.json")
+
+
+def build_position(entry: Dict[str, Any]) -> Game:
+    texts = []
+    for kind in ("board", "pieces", "rules"):
+        # "<kind>": sample config file name, or "<kind>_yaml": inline YAML
+        inline = entry.get(f"{kind}_yaml")
+        texts.append(inline if inline is not None else (CONFIG_DIR / entry[kind]).read_text(encoding="utf-8"))
+    game = create_game_from_yamls(*texts)
+    GAMES.pop(game.id)
+    for from_pos, to_pos in entry.get("moves", []):
+        play_move(game, tuple(from_pos), tuple(to_pos), None)
+    return game
+
+
+def engine_perft(game: Game, depth: int) -> Tuple[int, float]:
+    searcher = Searcher(build_request(game), DIFFICULTY_BUDGETS["easy"])
+    start = time.perf_counter()
+    nodes = searcher.perft(depth)
+    return nodes, time.perf_counter() - start
+
+
+def _royal_lost(game: Game, captured_owner: str, captured_type: str, royal: set) -> bool:
+    # mirrors Searcher._lost: out of pieces, or the last royal piece was taken
+    position = game.position
+    own = position.owner_mask(captured_owner)
+    if not own:
+        return True
+    return captured_type in royal and not any(own & position.type_mask(t) for t in royal)
+
+
+def naive_moves(game: Game) -> List[Tuple[Square, Square]]:
+    """Moves of the side to move, straight from the movement specs.
+
+    Same order-insensitive result as ``generate_moves``, including the
+    duplicates of wrapped rays that cross each other on a quadsphere.
+    """
+    board = game.board
+    player = game.state.get("turn")
+    at = {board.normalize_pos(*piece.position): piece for piece in game.pieces}
+
+    def enterable(x: int, y: int) -> Optional[Square]:
+        if not board.is_valid_position(x, y):
+            return None
+        square = board.normalize_pos(x, y)
+        cell = board.cell_at(*square)
+        if cell is not None and (cell.obstacle is not None or cell.effect == "block"):
+            return None
+        return square
+
+    moves: List[Tuple[Square, Square]] = []
+    for piece in game.pieces:
+        if piece.owner != player:
+            continue
+        origin = board.normalize_pos(*piece.position)
+        movement = game.piece_types.get(piece.type, {}).get("movement")
+        if isinstance(movement, list):
+            steps, rays = [(int(dx), int(dy)) for dx, dy in movement], ()
+        elif movement == "forward_1":
+            steps, rays = [(0, forward_direction(piece.owner))], ()
+        else:
+            steps, rays = list(STEP_PATTERNS.get(movement, ())), RAY_PATTERNS.get(movement, ())
+        seen = set()
+        for dx, dy in steps:
+            square = enterable(origin[0] + dx, origin[1] + dy)
+            if square is None or square == origin or square in seen:
+                continue
+            seen.add(square)
+            if square not in at or at[square].owner != player:
+                moves.append((origin, square))
+        for dx, dy in rays:
+            x, y = origin
+            while True:
+                x, y = x + dx, y + dy
+                square = enterable(x, y)
+                # a wrapped ray ends when it comes back around to the piece
+                if square is None or square == origin:
+                    break
+                occupant = at.get(square)
+                if occupant is None:
+                    moves.append((origin, square))
+                    continue
+                if occupant.owner != player:
+                    moves.append((origin, square))
+                break
+    return moves
+
+
+def reference_perft(game: Game, depth: int) -> int:
+    """Slow perft with ``naive_moves`` and the API's move path; must match ``engine_perft``."""
+    if depth <= 0:
+        return 1
+    royal = {c.get("value") for c in game.rules.victory_conditions if c.get("type") == "capture_king"}
+    total = 0
+    for from_pos, to_pos in naive_moves(game):
+        if depth == 1:
+            total += 1
+            continue
+        saved = save_state(game)
+        victim = game.position.squares[game.position.index(*to_pos)]
+        # the count must not depend on end-of-game bookkeeping (repetition etc.)
+        game.state["status"] = "active"
+        play_move(game, from_pos, to_pos, None)
+        if victim is None or not _royal_lost(game, victim.owner, victim.type, royal):
+            game.state["status"] = "active"
+            total += reference_perft(game, depth - 1)
+        restore_state(game, saved)
+    return total
+
+
+def run_corpus(path: Path, max_depth: Optional[int], verify: int, update: bool) -> bool:
+    corpus = json.loads(path.read_text(encoding="utf-8"))
+    ok = True
+    total_nodes, total_seconds = 0, 0.0
+    for entry in corpus["positions"]:
+        game = build_position(entry)
+        counts: List[int] = entry.get("counts", [])
+        depths = range(1, (max_depth or len(counts) or 3) + 1)
+        if not update:
+            depths = range(1, min(len(counts), max_depth or len(counts)) + 1)
+        found = []
+        for depth in depths:
+            nodes, seconds = engine_perft(game, depth)
+            found.append(nodes)
+            total_nodes += nodes
+            total_seconds += seconds
+            status = ""
+            if not update and nodes != counts[depth - 1]:
+                status = f"  MISMATCH (expected {counts[depth - 1]})"
+                ok = False
+            if depth <= verify:
+                reference = reference_perft(game, depth)
+                if reference != nodes:
+                    status += f"  REFERENCE {reference}"
+                    ok = False
+            rate = nodes / seconds if seconds else float("inf")
+            print(f"{entry['name']:<32} depth {depth}  {nodes:>12}  {seconds:8.3f}s  {rate:>10.0f} nodes/s{status}")
+        if update:
+            entry["counts"] = found
+    print(f"total {total_nodes} nodes in {total_seconds:.2f}s ({total_nodes / total_seconds if total_seconds else 0:.0f} nodes/s)")
+    if update:
+        path.write_text(json.dumps(corpus, indent=2) + "\n", encoding="utf-8")
+        print(f"counts written to {path}")
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", type=Path, nargs="?", const=DEFAULT_CORPUS, help="check a corpus of known counts")
+    parser.add_argument("--update", action="store_true", help="rewrite the corpus counts (after a deliberate rules change)")
+    parser.add_argument(
+        "--verify", type=int, default=0, help="cross-check with the naive generator + API move path up to this depth"
+    )
+    parser.add_argument("--board", type=Path, default=CONFIG_DIR / "board_rectangular.yaml")
+    parser.add_argument("--pieces", type=Path, default=CONFIG_DIR / "pieces_basic.yaml")
+    parser.add_argument("--rules", type=Path, default=CONFIG_DIR / "rules_basic.yaml")
+    parser.add_argument("--depth", type=int, default=None, help="depth (single position) or maximum depth (corpus)")
+    parser.add_argument("--divide", action="store_true", help="print counts per root move")
+    args = parser.parse_args()
+
+    if args.corpus:
+        sys.exit(0 if run_corpus(args.corpus, args.depth, args.verify, args.update) else 1)
+
+    entry = {
+        "board_yaml": args.board.read_text(encoding="utf-8"),
+        "pieces_yaml": args.pieces.read_text(encoding="utf-8"),
+        "rules_yaml": args.rules.read_text(encoding="utf-8"),
+    }
+    game = build_position(entry)
+    depth = args.depth or 3
+    if args.divide:
+        searcher = Searcher(build_request(game), DIFFICULTY_BUDGETS["easy"])
+        for (from_pos, to_pos), nodes in sorted(searcher.divide(depth).items()):
+            print(f"{list(from_pos)} -> {list(to_pos)}: {nodes}")
+    for d in range(1, depth + 1):
+        nodes, seconds = engine_perft(game, d)
+        extra = ""
+        if d <= args.verify:
+            reference = reference_perft(game, d)
+            extra = "  ok" if reference == nodes else f"  REFERENCE {reference}"
+        print(f"depth {d}  {nodes:>12}  {seconds:8.3f}s  {nodes / seconds if seconds else 0:>10.0f} nodes/s{extra}")
+
+
+if __name__ == "__main__":
+    main()
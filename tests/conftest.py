@@ -0,0 +1,32 @@
+import pytest
+
+
+@pytest.fixture(scope="session")
+def server():
+    from backend.app import create_app
+
+    flask_app, socketio = create_app()
+    flask_app.config["TESTING"] = True
+    return flask_app, socketio
+
+
+@pytest.fixture(scope="session")
+def app(server):
+    return server[0]
+
+
+@pytest.fixture
+def socketio(server):
+    return server[1]
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def game_id(client):
+    response = client.post("/api/games", json={"preset": "chess_vs_shogi"})
+    assert response.status_code == 201
+    return response.get_json()["game_id"]
@@ -0,0 +1,37 @@
+import random
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.models import Game, compile_ruleset, new_game
+from backend.movegen import generate_moves, play_move
+
+CONFIG_DIR = Path(__file__).resolve().parent.parent / "backend" / "sample_configs"
+
+
+def sample_yamls(board: str = "board_rectangular.yaml") -> Tuple[str, str, str]:
+    return tuple(  # type: ignore[return-value]
+        (CONFIG_DIR / name).read_text(encoding="utf-8") for name in (board, "pieces_basic.yaml", "rules_basic.yaml")
+    )
+
+
+def make_game(
+    board_yaml: Optional[str] = None,
+    pieces_yaml: Optional[str] = None,
+    rules_yaml: Optional[str] = None,
+    game_id: str = "test",
+) -> Game:
+    """A game from the sample configs, with any of the three documents replaced."""
+    board, pieces, rules = sample_yamls()
+    return new_game(compile_ruleset(board_yaml or board, pieces_yaml or pieces, rules_yaml or rules), game_id)
+
+
+def planned_moves(count: int, seed: int = 3) -> Tuple[List[Dict[str, Any]], Game]:
+    """A legal sequence from the initial position of the chess_vs_shogi preset, and the game after it."""
+    game = make_game()
+    rng = random.Random(seed)
+    moves = []
+    for _ in range(count):
+        from_pos, to_pos = rng.choice(sorted(generate_moves(game)))
+        play_move(game, from_pos, to_pos, None)
+        moves.append({"from": list(from_pos), "to": list(to_pos)})
+    return moves, game
@@ -0,0 +1,79 @@
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from backend import search
+
+
+def failed_future(exc):
+    future = Future()
+    future.set_exception(exc)
+    return future
+
+
+@pytest.fixture
+def idle_pool(monkeypatch):
+    # a pool that never started a worker; run_search must drop it on failure
+    pool = ProcessPoolExecutor(max_workers=1)
+    monkeypatch.setattr(search, "_executor", pool)
+    yield pool
+    pool.shutdown()
+
+
+@pytest.mark.parametrize(
+    "future, timeout",
+    [
+        (lambda: failed_future(BrokenProcessPool("worker died")), 5.0),
+        (Future, 0.05),  # never completes
+    ],
+    ids=["broken_pool", "timeout"],
+)
+def test_ai_move_pool_failure_is_503(client, game_id, monkeypatch, idle_pool, future, timeout):
+    monkeypatch.setattr(search, "submit_search", lambda request, difficulty: future())
+    monkeypatch.setattr(search, "SEARCH_TIMEOUT", timeout)
+    before = client.get(f"/api/games/{game_id}").get_json()["state"]
+
+    response = client.post(f"/api/games/{game_id}/ai_move", json={"difficulty": "easy"})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    body = response.get_json()
+    assert body["state"]["version"] == before["version"]
+    assert body["state"]["turn"] == before["turn"]
+    # the next search starts a fresh pool
+    assert search._executor is None
+
+
+def test_ai_move_after_pool_failure(client, game_id, monkeypatch):
+    with monkeypatch.context() as patch:
+        patch.setattr(search, "submit_search", lambda request, difficulty: failed_future(BrokenProcessPool()))
+        assert client.post(f"/api/games/{game_id}/ai_move", json={"difficulty": "easy"}).status_code == 503
+    response = client.post(f"/api/games/{game_id}/ai_move", json={"difficulty": "easy"})
+    assert response.status_code == 200
+    assert response.get_json()["state"]["version"] == 1
+
+
+def test_budget_abort_restores_the_root_position():
+    # 60 sliders a side: depth 1 alone runs past the node budget
+    request = search.SearchRequest(
+        board_type="rectangular",
+        size=(60, 60),
+        blocked=0,
+        piece_types={"rook": {"movement": "horizontal_vertical_unlimited", "promotion": None}},
+        pieces=[("rook", (x, 0), "player_1", False) for x in range(60)]
+        + [("rook", (x, 59), "player_2", False) for x in range(60)],
+        turn="player_1",
+        order=["player_1", "player_2"],
+        royal=frozenset(),
+    )
+    searcher = search.Searcher(request, search.DIFFICULTY_BUDGETS["easy"])
+    root_hash = searcher.position.hash
+
+    result = searcher.run()
+
+    assert result.depth == 0
+    (x, y), _to = result.move
+    assert y == 0  # a player_1 rook
+    assert searcher.turn == "player_1"
+    assert searcher.position.hash == root_hash
@@ -0,0 +1,123 @@
+import random
+from collections import Counter
+
+import pytest
+from helpers import make_game, sample_yamls
+
+from backend import analysis, sparse
+from backend.models import compile_ruleset, new_game
+from backend.movegen import generate_moves, play_move, pseudo_moves, table_for, turn_order
+
+pytest.importorskip("numpy")
+
+BOARDS = {
+    "rectangular": sample_yamls()[0],
+    "quadsphere-features": """\
+board_type: quadsphere
+board_size: [8, 12]
+special_squares:
+  - {position: [2, 3], effect: teleport, value: [5, 4]}
+  - {position: [1, 1], effect: block}
+obstacles:
+  - {position: [4, 4], type: wall}
+""",
+    "rectangular-wall": "board_type: rectangular\nboard_size: [9, 10]\nobstacles:\n  - {position: [4, 4], type: wall}\n",
+}
+
+
+def reference(game):
+    """Attack counts and mobility walked piece by piece over the dense move tables."""
+    position = game.position
+    attacks = {player: Counter() for player in turn_order(game)}
+    mobility = Counter()
+    for piece in game.pieces:
+        table = table_for(position, game.piece_types, piece)
+        sq = position.index(*piece.position)
+        attacks[piece.owner].update(table.steps[sq])
+        for ray in table.rays[sq]:
+            for to in ray:
+                attacks[piece.owner][to] += 1
+                if position.is_occupied(to):
+                    break
+        mobility[piece.owner] += len(pseudo_moves(position, game.piece_types, piece))
+    return attacks, mobility
+
+
+@pytest.mark.parametrize("board", BOARDS)
+@pytest.mark.parametrize("seed", range(3))
+def test_dense_analysis_matches_a_per_piece_walk(board, seed):
+    rng = random.Random(seed)
+    game = make_game(BOARDS[board])
+    width, height = game.board.size
+    while game.state["status"] == "active" and len(game.state["history"]) < 40:
+        result = analysis.analyze(game)
+        attacks, mobility = reference(game)
+        for player in turn_order(game):
+            assert result["mobility"][player] == mobility[player]
+            expected = [[attacks[player][y * width + x] for x in range(width)] for y in range(height)]
+            assert result["attacks"][player] == expected
+        contested = [
+            [int(sum(attacks[p][y * width + x] > 0 for p in attacks) > 1) for x in range(width)] for y in range(height)
+        ]
+        assert result["contested"] == contested
+        moves = generate_moves(game)
+        if not moves:
+            break
+        play_move(game, *rng.choice(moves), None)
+
+
+@pytest.mark.parametrize("board", BOARDS)
+def test_sparse_boards_are_analysed_like_dense_ones(board, monkeypatch):
+    _board, pieces, rules = sample_yamls()
+    dense = new_game(compile_ruleset(BOARDS[board], pieces, rules), "g")
+    with monkeypatch.context() as patch:
+        patch.setattr(sparse, "SPARSE_MAX_DENSE_SQUARES", 0)
+        hashed = new_game(compile_ruleset(BOARDS[board], pieces, rules), "g")
+    assert hashed.board.sparse
+    rng = random.Random(1)
+    for _ in range(20):
+        assert analysis.analyze(hashed) == analysis.analyze(dense)
+        move = rng.choice(generate_moves(dense))
+        play_move(dense, *move, None)
+        play_move(hashed, *move, None)
+
+
+def create(client, board_yaml):
+    _board, pieces, rules = sample_yamls()
+    response = client.post("/api/games", json={"board_yaml": board_yaml, "pieces_yaml": pieces, "rules_yaml": rules})
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()["game_id"]
+
+
+def test_analysis_endpoint_on_a_64x64_board(client):
+    game_id = create(client, "board_type: rectangular\nboard_size: [64, 64]\n")
+
+    response = client.get(f"/api/games/{game_id}/analysis")
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["size"] == [64, 64] and body["version"] == 0
+    assert len(body["attacks"]["player_1"]) == 64 and len(body["attacks"]["player_1"][0]) == 64
+    assert client.get(
+        f"/api/games/{game_id}/analysis", headers={"If-None-Match": response.headers["ETag"]}
+    ).status_code == 304
+
+
+def test_analysis_endpoint_on_a_sparse_board(client):
+    # coprime quadsphere sides: sparse well below 64 x 64 squares
+    game_id = create(client, "board_type: quadsphere\nboard_size: [40, 41]\n")
+
+    response = client.get(f"/api/games/{game_id}/analysis")
+
+    assert response.status_code == 200
+    assert response.get_json()["size"] == [40, 41]
+
+
+def test_boards_above_the_size_limit_are_400(client, monkeypatch):
+    monkeypatch.setattr(analysis, "ANALYSIS_MAX_SQUARES", 63)
+    game_id = create(client, sample_yamls()[0])
+
+    response = client.get(f"/api/games/{game_id}/analysis")
+
+    assert response.status_code == 400
+    assert "63 squares" in response.get_json()["error"]
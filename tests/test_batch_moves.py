@@ -0,0 +1,130 @@
+import pytest
+from helpers import make_game, planned_moves, sample_yamls
+
+from backend import app as app_module
+from backend import movegen
+from backend.models import ValidationError
+
+
+def snapshot(game_id):
+    game = app_module.GAMES.get(game_id)
+    return game.zobrist, game.state["turn"], game.version, len(game.state["history"]), dict(game.repetitions)
+
+
+@pytest.mark.parametrize(
+    "bad",
+    [
+        {"from": [0, 0], "to": [7, 7]},  # rook through its own pawns
+        {"from": [3, 3], "to": [3, 4]},  # empty square
+        {"from": [0, 1], "to": [0, 2], "player": "player_2"},  # not their piece
+    ],
+)
+def test_failed_batch_changes_nothing(client, game_id, bad):
+    moves, _ = planned_moves(12)
+    # an earlier move so the rollback starts from a non-initial position
+    assert client.post(f"/api/games/{game_id}/moves", json={"moves": moves[:2]}).status_code == 200
+    before = snapshot(game_id)
+    pieces = app_module.GAMES.get(game_id).to_dict()["pieces"]
+
+    response = client.post(f"/api/games/{game_id}/moves", json={"moves": moves[2:10] + [bad] + moves[10:]})
+
+    assert response.status_code == 400
+    body = response.get_json()
+    assert body["index"] == 8 and body["applied"] == 0
+    assert snapshot(game_id) == before
+    game = app_module.GAMES.get(game_id)
+    assert game.to_dict()["pieces"] == pieces
+    assert body["state"]["version"] == before[2]
+    # the bitboards were rolled back too: the rest of the plan still plays
+    assert client.post(f"/api/games/{game_id}/moves", json={"moves": moves[2:]}).status_code == 200
+
+
+def test_batch_matches_single_moves_and_broadcasts_once(app, socketio, client, game_id):
+    moves, expected = planned_moves(20)
+    ws = socketio.test_client(app)
+    ws.emit("join", {"game_id": game_id})
+    ws.get_received()
+
+    response = client.post(f"/api/games/{game_id}/moves", json={"moves": moves, "expected_version": 0})
+
+    assert response.status_code == 200
+    assert response.get_json()["applied"] == 20
+    game = app_module.GAMES.get(game_id)
+    assert game.zobrist == expected.zobrist and game.version == 20
+    deltas = [packet for packet in ws.get_received() if packet["name"] == "delta"]
+    assert len(deltas) == 1 and len(deltas[0]["args"][0]["moves"]) == 20
+    ws.disconnect()
+
+
+def test_stale_batch_is_rejected_without_changes(client, game_id):
+    moves, _ = planned_moves(4)
+    assert client.post(f"/api/games/{game_id}/moves", json={"moves": moves[:1]}).status_code == 200
+    before = snapshot(game_id)
+    response = client.post(f"/api/games/{game_id}/moves", json={"moves": moves[1:], "expected_version": 0})
+    assert response.status_code == 409
+    assert snapshot(game_id) == before
+
+
+@pytest.fixture
+def broken_record(monkeypatch):
+    """Recording the move that reaches ``broken_record.at`` history entries raises a non-IllegalMoveError."""
+    check_repetition = movegen._check_repetition
+
+    def failing(game):
+        if len(game.state["history"]) >= failing.at:
+            raise ValueError("broken draw condition")
+        check_repetition(game)
+
+    failing.at = float("inf")
+    monkeypatch.setattr(movegen, "_check_repetition", failing)
+    return failing
+
+
+def test_unexpected_error_rolls_back_batch(client, game_id, broken_record):
+    moves, _ = planned_moves(6)
+    assert client.post(f"/api/games/{game_id}/moves", json={"moves": moves[:2]}).status_code == 200
+    before = snapshot(game_id)
+    broken_record.at = 5
+
+    response = client.post(f"/api/games/{game_id}/moves", json={"moves": moves[2:]})
+
+    assert response.status_code == 400
+    assert response.get_json()["applied"] == 0
+    assert snapshot(game_id) == before
+
+
+def test_unexpected_error_rolls_back_single_move(app, socketio, client, game_id, broken_record):
+    moves, _ = planned_moves(2)
+    ws = socketio.test_client(app)
+    ws.emit("join", {"game_id": game_id})
+    ws.get_received()
+    before = snapshot(game_id)
+    broken_record.at = 1
+
+    response = client.post(f"/api/games/{game_id}/move", json=moves[0])
+
+    assert response.status_code == 400
+    assert snapshot(game_id) == before
+    assert not [packet for packet in ws.get_received() if packet["name"] == "delta"]
+    broken_record.at = 10
+    assert client.post(f"/api/games/{game_id}/move", json=moves[0]).status_code == 200
+    ws.disconnect()
+
+
+@pytest.mark.parametrize(
+    "document, old, new",
+    [
+        ("rules", "repetition: 4", "repetition: often"),
+        ("rules", "repetition: 4", "repetition: 0"),
+        ("rules", "repetition: 4", "repetition: true"),
+        ("rules", "draw_conditions:\n  repetition: 4", "draw_conditions: [4]"),
+        ("pieces", 'movement: "knight"', 'movement: "knight"\n    points: lots'),
+    ],
+)
+def test_configs_that_would_fail_mid_move_are_rejected(document, old, new):
+    _board, pieces, rules = sample_yamls()
+    yamls = {"pieces": pieces, "rules": rules}
+    assert old in yamls[document]
+    yamls[document] = yamls[document].replace(old, new)
+    with pytest.raises(ValidationError):
+        make_game(pieces_yaml=yamls["pieces"], rules_yaml=yamls["rules"])
@@ -0,0 +1,29 @@
+import sys
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / "scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import bench_suite  # noqa: E402
+
+
+def test_every_benchmark_runs():
+    args = bench_suite.build_parser().parse_args(
+        ["--smoke", "--members", "1", "5", "--large-board", "16", "--large-specials", "20"]
+    )
+    results = bench_suite.run(args)
+
+    sections = {name.split("[")[0] for name in results}
+    assert sections == {
+        "create_game", "create_game_cold", "move", "get_game", "get_game_304", "ws_fanout", "validate_large"
+    }
+    assert {"ws_fanout[members=1]", "ws_fanout[members=5]"} <= results.keys()
+    assert all(result["ops"] == 2 and result["p50_ms"] > 0 for result in results.values())
+
+
+def test_ws_fanout_outlives_finished_games(monkeypatch):
+    # far more moves than one random game lasts
+    args = bench_suite.build_parser().parse_args(["--only", "ws_fanout", "--members", "2"])
+    monkeypatch.setattr(args, "smoke", False)
+    results = bench_suite.run(args)
+    assert results["ws_fanout[members=2]"]["ops"] == 200
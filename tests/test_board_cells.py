@@ -0,0 +1,70 @@
+import pytest
+from helpers import make_game, sample_yamls
+
+from backend.models import ValidationError
+from backend.movegen import play_move
+
+
+def board_yaml(squares, obstacles="[]", board_type="rectangular"):
+    lines = "".join(f"  - {square}\n" for square in squares)
+    return f"board_type: {board_type}\nboard_size: [8, 8]\nspecial_squares:\n{lines}obstacles: {obstacles}\n"
+
+
+CHAIN = [
+    "{position: [0, 2], effect: teleport, value: [3, 3]}",
+    "{position: [3, 3], effect: teleport, value: [3, 4]}",
+    "{position: [3, 4], effect: teleport, value: [6, 4]}",
+]
+
+
+def test_teleport_chain_resolves_to_its_last_square():
+    board = make_game(board_yaml(CHAIN)).board
+    width = board.size[0]
+    for start in ((0, 2), (3, 3), (3, 4)):
+        assert board.cell_at(*start).destination == (6, 4)
+        assert board.teleports[board.index(*start)] == 4 * width + 6
+    assert board.cell_at(6, 4) is None
+    cells = board.to_dict()["cells"]
+    assert cells[str(2 * width)] == {"effect": "teleport", "value": [3, 3], "destination": [6, 4]}
+
+
+def test_move_onto_a_chain_lands_on_the_final_square():
+    game = make_game(board_yaml(CHAIN))
+    pawn = game.position.squares[game.position.index(0, 1)]
+    play_move(game, (0, 1), (0, 2), None)
+    assert pawn.position == (6, 4)
+    assert game.position.squares[game.position.index(6, 4)] is pawn
+    for square in ((0, 1), (0, 2), (3, 3), (3, 4)):
+        assert game.position.squares[game.position.index(*square)] is None
+
+
+def test_quadsphere_cells_are_normalized():
+    squares = ["{position: [-1, 2], effect: teleport, value: [9, -5]}", "{position: [15, 10], effect: bonus, value: 2}"]
+    board = make_game(board_yaml(squares, "[{position: [7, 2], type: rock}]", "quadsphere")).board
+    # [-1, 2] and the obstacle at [7, 2] share one cell; [15, 10] wraps to [7, 2] as well
+    assert len(board.cells) == 1
+    cell = board.cell_at(7, 2)
+    assert cell.obstacle == "rock" and cell.effect == "bonus"
+    assert board.cell_at(-1, 10) is cell
+
+
+def test_quadsphere_teleport_target_wraps():
+    board = make_game(board_yaml(["{position: [0, 2], effect: teleport, value: [9, -5]}"], board_type="quadsphere")).board
+    assert board.cell_at(0, 2).destination == (1, 3)
+
+
+@pytest.mark.parametrize(
+    "squares",
+    [
+        ["{position: [2, 3], effect: teleport, value: [5, 4]}", "{position: [5, 4], effect: teleport, value: [2, 3]}"],
+        ["{position: [2, 3], effect: teleport, value: [2, 3]}"],
+        CHAIN + ["{position: [6, 4], effect: teleport, value: [3, 3]}"],
+    ],
+    ids=["two_cycle", "self_loop", "chain_into_cycle"],
+)
+def test_teleport_cycles_are_rejected(client, squares):
+    with pytest.raises(ValidationError):
+        make_game(board_yaml(squares))
+    _board, pieces, rules = sample_yamls()
+    response = client.post("/api/games", json={"board_yaml": board_yaml(squares), "pieces_yaml": pieces, "rules_yaml": rules})
+    assert response.status_code == 400
@@ -0,0 +1,64 @@
+import random
+
+import pytest
+from helpers import make_game
+
+from backend.export import export_header, iter_export, read_export, replay_export
+from backend.models import Game
+from backend.movegen import generate_moves, play_move
+from backend.storage import GameStore
+
+
+def play_random(client, game_id, plies, seed=0):
+    rng = random.Random(seed)
+    for _ in range(plies):
+        moves = client.get(f"/api/games/{game_id}/legal_moves").get_json()["moves"]
+        if not moves:
+            break
+        response = client.post(f"/api/games/{game_id}/move", json=rng.choice(moves))
+        assert response.status_code == 200
+        if response.get_json()["state"]["status"] != "active":
+            break
+
+
+@pytest.mark.parametrize("preset", ["chess_vs_shogi", "chess_vs_shogi_quadsphere"])
+@pytest.mark.parametrize("compress", ["zlib", "none"])
+def test_export_replays_to_the_same_position(client, preset, compress):
+    game_id = client.post("/api/games", json={"preset": preset}).get_json()["game_id"]
+    play_random(client, game_id, 80, seed=len(preset))
+    live = client.get(f"/api/games/{game_id}").get_json()
+
+    data = client.get(f"/api/games/{game_id}/export?compress={compress}").get_data()
+    header, moves = read_export(data)
+    assert header["initial_pieces"] and header["piece_types"]
+    assert len(moves) == len(live["state"]["history"])
+
+    game = replay_export(data)
+    assert f"{game.zobrist:016x}" == live["position_hash"] == header["position_hash"]
+    assert sorted(map(str, game.to_dict()["pieces"])) == sorted(map(str, live["pieces"]))
+    assert game.state["turn"] == live["state"]["turn"]
+    assert game.state["status"] == live["state"]["status"]
+    assert game.state["history"].to_list() == live["state"]["history"]
+
+
+def test_export_of_a_game_restored_from_a_snapshot(tmp_path):
+    game = make_game()
+    rng = random.Random(1)
+    for _ in range(30):
+        play_move(game, *rng.choice(sorted(generate_moves(game))), None)
+    store = GameStore(str(tmp_path))
+    store.write_snapshot_now(game)
+    restored = store.load("test", Game.from_dict, lambda *args: None)
+    store.close()
+
+    data = b"".join(iter_export(export_header(restored), restored.state["history"], restored.board.size))
+    assert replay_export(data).zobrist == game.zobrist
+
+
+def test_export_without_initial_layout_is_rejected():
+    game = make_game()
+    play_move(game, *sorted(generate_moves(game))[0], None)
+    header = {**export_header(game), "initial_pieces": None}
+    data = b"".join(iter_export(header, game.state["history"], game.board.size))
+    with pytest.raises(ValueError):
+        replay_export(data)
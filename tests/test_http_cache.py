@@ -0,0 +1,58 @@
+from helpers import planned_moves
+
+from backend import app as app_module
+
+
+def cache_counts():
+    stats = app_module.RESPONSES.stats()
+    return stats["hits"], stats["misses"]
+
+
+def test_matching_etag_is_304_without_rendering(client, game_id):
+    first = client.get(f"/api/games/{game_id}")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert etag == '"0"'
+    before = cache_counts()
+
+    response = client.get(f"/api/games/{game_id}", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.data == b""
+    assert response.headers["ETag"] == etag
+    assert cache_counts() == before
+
+
+def test_move_changes_the_etag(client, game_id):
+    etag = client.get(f"/api/games/{game_id}").headers["ETag"]
+    moves, _ = planned_moves(1)
+    assert client.post(f"/api/games/{game_id}/move", json=moves[0]).status_code == 200
+
+    response = client.get(f"/api/games/{game_id}", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] == '"1"'
+    body = response.get_json()
+    assert body["state"]["version"] == 1 and len(body["state"]["history"]) == 1
+    # the new ETag is the If-Match of the next move
+    assert client.post(
+        f"/api/games/{game_id}/move", json=planned_moves(2)[0][1], headers={"If-Match": response.headers["ETag"]}
+    ).status_code == 200
+
+
+def test_move_invalidates_the_cached_body(client, game_id):
+    url = f"/api/games/{game_id}"
+    hits, misses = cache_counts()
+    cached = client.get(url).data
+    assert client.get(url).data == cached
+    assert cache_counts() == (hits + 1, misses + 1)
+
+    moves, _ = planned_moves(1)
+    assert client.post(f"/api/games/{game_id}/move", json=moves[0]).status_code == 200
+    fresh = client.get(url)
+
+    assert cache_counts() == (hits + 1, misses + 2)
+    assert fresh.data != cached
+    assert fresh.get_json()["state"]["version"] == 1
+    # the body without history is cached separately and is fresh too
+    assert client.get(url + "?history=0").get_json()["state"]["version"] == 1
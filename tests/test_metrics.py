@@ -0,0 +1,39 @@
+import json
+
+from backend import app as app_module
+
+
+class Recorder:
+    def __init__(self):
+        self.calls = []
+
+    def observe(self, value, *labels):
+        self.calls.append((value, *labels))
+
+    def inc(self, amount=1, *labels):
+        self.calls.append((amount, *labels))
+
+
+def test_emit_sizes_are_sampled(app, socketio, game_id, monkeypatch):
+    sizes, totals = Recorder(), Recorder()
+    monkeypatch.setattr(app_module, "EMIT_BYTES", sizes)
+    monkeypatch.setattr(app_module, "EMIT_BYTES_TOTAL", totals)
+    monkeypatch.setattr(app_module, "EMIT_SIZE_SAMPLE", 4)
+    monkeypatch.setattr(app_module, "_emit_sizes", {})
+    members = [socketio.test_client(app) for _ in range(2)]
+    for ws in members:
+        ws.emit("join", {"game_id": game_id})
+        ws.get_received()
+
+    payloads = [{"seq": i, "moves": [{"from": [0, 1], "to": [0, i]}] * (i + 1)} for i in range(10)]
+    for payload in payloads:
+        app_module.emit_to_room(socketio, game_id, "delta", payload)
+
+    assert [packet["args"][0] for packet in members[0].get_received()] == payloads
+    # measured on the 1st, 5th and 9th emit only
+    measured = [len(json.dumps(payloads[i], separators=(",", ":"))) for i in (0, 4, 8)]
+    assert sizes.calls == [(size, "delta") for size in measured]
+    # every emit is counted for both members, at the last measured size
+    assert totals.calls == [(measured[i // 4] * 2, "delta") for i in range(10)]
+    for ws in members:
+        ws.disconnect()
@@ -0,0 +1,53 @@
+import pytest
+
+from backend.movegen import IllegalMoveError, check_move
+from helpers import make_game
+
+BAD_SQUARES = [[8, 0], [0, 8], [-1, 0], [100, 100], ["a", 0], [0, None], [True, 1], [1], "e2"]
+
+
+def _version(client, game_id):
+    return client.get(f"/api/games/{game_id}").get_json()["state"]["version"]
+
+
+@pytest.mark.parametrize("square", BAD_SQUARES)
+def test_move_rejects_bad_from(client, game_id, square):
+    response = client.post(f"/api/games/{game_id}/move", json={"from": square, "to": [0, 2]})
+    assert response.status_code == 400
+    assert response.get_json()["errors"]
+    assert _version(client, game_id) == 0
+
+
+@pytest.mark.parametrize("square", BAD_SQUARES)
+def test_move_rejects_bad_to(client, game_id, square):
+    response = client.post(f"/api/games/{game_id}/move", json={"from": [0, 1], "to": square})
+    assert response.status_code == 400
+    assert _version(client, game_id) == 0
+
+
+@pytest.mark.parametrize("square", BAD_SQUARES)
+def test_batch_rejects_bad_from(client, game_id, square):
+    moves = [{"from": [0, 1], "to": [0, 2]}, {"from": square, "to": [0, 5]}]
+    response = client.post(f"/api/games/{game_id}/moves", json={"moves": moves})
+    assert response.status_code == 400
+    assert response.get_json()["index"] == 1
+    assert _version(client, game_id) == 0
+
+
+def test_aliased_square_does_not_move_another_piece(client, game_id):
+    # [8, 0] on an 8-wide board used to index the pawn at (0, 1)
+    client.post(f"/api/games/{game_id}/move", json={"from": [8, 0], "to": [0, 2]})
+    pieces = client.get(f"/api/games/{game_id}").get_json()["pieces"]
+    assert any(p["position"] == [0, 1] for p in pieces)
+
+
+def test_valid_move_still_accepted(client, game_id):
+    response = client.post(f"/api/games/{game_id}/move", json={"from": [0, 1], "to": [0, 2]})
+    assert response.status_code == 200
+    assert response.get_json()["errors"] is None
+
+
+def test_check_move_rejects_off_board_squares():
+    game = make_game()
+    with pytest.raises(IllegalMoveError):
+        check_move(game, (8, 0), (0, 2), None)
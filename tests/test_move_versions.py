@@ -0,0 +1,39 @@
+import pytest
+from helpers import planned_moves
+
+from backend import app as app_module
+
+
+@pytest.mark.parametrize(
+    "stale",
+    [{"headers": {"If-Match": '"0"'}}, {"headers": {"If-Match": 'W/"0"'}}, {"expected_version": 0}],
+    ids=["if_match", "weak_if_match", "expected_version"],
+)
+def test_stale_single_move_is_409(app, socketio, client, game_id, stale):
+    moves, _ = planned_moves(2)
+    assert client.post(f"/api/games/{game_id}/move", json=moves[0]).status_code == 200
+    game = app_module.GAMES.get(game_id)
+    before = game.zobrist, game.version, len(game.state["history"])
+    ws = socketio.test_client(app)
+    ws.emit("join", {"game_id": game_id})
+    ws.get_received()
+
+    response = client.post(
+        f"/api/games/{game_id}/move",
+        json={**moves[1], **{k: v for k, v in stale.items() if k != "headers"}},
+        headers=stale.get("headers"),
+    )
+
+    assert response.status_code == 409
+    body = response.get_json()
+    assert body["version"] == 1 and body["state"]["version"] == 1
+    assert (game.zobrist, game.version, len(game.state["history"])) == before
+    assert not [packet for packet in ws.get_received() if packet["name"] == "delta"]
+    ws.disconnect()
+
+
+def test_current_version_and_wildcard_are_accepted(client, game_id):
+    moves, _ = planned_moves(2)
+    assert client.post(f"/api/games/{game_id}/move", json=moves[0], headers={"If-Match": '"0"'}).status_code == 200
+    assert client.post(f"/api/games/{game_id}/move", json=moves[1], headers={"If-Match": "*"}).status_code == 200
+    assert app_module.GAMES.get(game_id).version == 2
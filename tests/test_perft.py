@@ -0,0 +1,44 @@
+import json
+import sys
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+from backend.movegen import generate_moves, play_move, restore_state, save_state
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / "scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from perft import build_position, engine_perft, naive_moves, reference_perft  # noqa: E402
+
+CORPUS = json.loads((SCRIPTS_DIR / "perft_corpus.json").read_text(encoding="utf-8"))["positions"]
+# the naive walk is slow; deeper counts are covered by scripts/perft.py --corpus
+MAX_DEPTH = 3
+
+
+@pytest.fixture(autouse=True)
+def sample_config_dir(monkeypatch):
+    # build_position reads sample configs relative to the repository root
+    monkeypatch.chdir(SCRIPTS_DIR.parent)
+
+
+@pytest.mark.parametrize("entry", CORPUS, ids=[entry["name"] for entry in CORPUS])
+def test_corpus_matches_naive_generator(entry):
+    game = build_position(entry)
+    for depth, expected in enumerate(entry["counts"][:MAX_DEPTH], start=1):
+        assert reference_perft(game, depth) == expected, f"depth {depth}"
+        assert engine_perft(game, depth)[0] == expected, f"depth {depth}"
+
+
+@pytest.mark.parametrize("entry", CORPUS, ids=[entry["name"] for entry in CORPUS])
+def test_table_moves_match_naive_moves_one_ply_deep(entry):
+    # same moves (with multiplicity), not just the same count, at the root and after every reply
+    game = build_position(entry)
+    assert Counter(generate_moves(game)) == Counter(naive_moves(game))
+    for from_pos, to_pos in naive_moves(game):
+        saved = save_state(game)
+        play_move(game, from_pos, to_pos, None)
+        if game.state["status"] == "active":
+            assert Counter(generate_moves(game)) == Counter(naive_moves(game)), (from_pos, to_pos)
+        restore_state(game, saved)
@@ -0,0 +1,76 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from helpers import CONFIG_DIR
+
+from backend import app as app_module
+from backend.models import ValidationError
+from backend.presets import PresetRegistry
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_presets_are_validated_then_compiled_on_first_use():
+    presets = PresetRegistry(CONFIG_DIR)
+    presets.validate()
+    assert presets.validated and presets.directory == CONFIG_DIR
+    assert presets.names() == ["chess_vs_shogi", "chess_vs_shogi_quadsphere"]
+    assert not presets.loaded
+    assert presets.get("chess_vs_shogi") is not None
+    assert presets.loaded
+
+
+def broken_preset_dir(tmp_path, rules_yaml):
+    for name in ("board_rectangular.yaml", "pieces_basic.yaml"):
+        (tmp_path / name).write_text((CONFIG_DIR / name).read_text(encoding="utf-8"), encoding="utf-8")
+    (tmp_path / "rules.yaml").write_text(rules_yaml, encoding="utf-8")
+    (tmp_path / "presets.yaml").write_text(
+        'broken: {board: "board_rectangular.yaml", pieces: "pieces_basic.yaml", rules: "rules.yaml"}\n',
+        encoding="utf-8",
+    )
+    return tmp_path
+
+
+@pytest.mark.parametrize(
+    "rules_yaml",
+    [
+        "turn_system: simultaneous\n",
+        "turn_system: alternate\ndraw_conditions: {repetition: 0}\n",
+        "turn_system: [alternate\n",
+    ],
+    ids=["rules", "draw_conditions", "yaml_syntax"],
+)
+def test_broken_preset_fails_validation(tmp_path, rules_yaml):
+    presets = PresetRegistry(broken_preset_dir(tmp_path, rules_yaml))
+    with pytest.raises(ValidationError, match="preset broken"):
+        presets.validate()
+    assert not presets.validated
+
+
+def test_missing_preset_file_fails_validation(tmp_path):
+    (tmp_path / "presets.yaml").write_text('broken: {board: "a.yaml", pieces: "b.yaml", rules: "c.yaml"}\n', encoding="utf-8")
+    with pytest.raises(ValidationError, match="preset broken"):
+        PresetRegistry(tmp_path).validate()
+
+
+def test_broken_preset_stops_create_app(tmp_path, monkeypatch):
+    monkeypatch.setattr(app_module, "PRESETS", PresetRegistry(broken_preset_dir(tmp_path, "turn_system: none\n")))
+    with pytest.raises(ValidationError, match="preset broken"):
+        app_module.create_app()
+
+
+def test_unknown_preset_is_400(client):
+    response = client.post("/api/games", json={"preset": "nope"})
+    assert response.status_code == 400
+    assert "chess_vs_shogi" in response.get_json()["errors"]
+
+
+def test_create_app_validates_presets_without_compiling_or_the_search_stack():
+    code = (
+        "import sys; import backend.app as a; a.create_app(); "
+        "print(a.PRESETS.validated, a.PRESETS.loaded, sorted(m for m in ('backend.search', 'numpy') if m in sys.modules))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True, capture_output=True, text=True).stdout
+    assert out.strip().splitlines()[-1] == "True False []"
@@ -0,0 +1,78 @@
+import os
+import threading
+
+from helpers import make_game
+
+from backend.models import Game
+from backend.movegen import replay_move
+from backend.registry import GameRegistry
+
+
+def registry(**limits):
+    return GameRegistry(Game.from_dict, replay_move, **{"max_games": 1, "ttl": 0, **limits})
+
+
+def test_spill_and_rehydrate_removes_scratch_files(tmp_path):
+    games = registry(spill_dir=str(tmp_path))
+    first = make_game(game_id="first")
+    expected = first.zobrist
+    games["first"] = first
+    games["second"] = make_game(game_id="second")
+    assert os.listdir(tmp_path) == ["first.snap"]
+
+    back = games.get("first")
+    assert back is not first and back.zobrist == expected
+    # "second" was spilled in turn; the snapshot of "first" is gone
+    assert os.listdir(tmp_path) == ["second.snap"]
+    assert games.stats()["rehydrations"] == 1
+
+
+def test_spill_runs_outside_the_registry_lock(tmp_path):
+    games = registry(spill_dir=str(tmp_path))
+    store = games._spill_store()
+    writing, release = threading.Event(), threading.Event()
+    write_snapshot_now = store.write_snapshot_now
+
+    def slow_write(game):
+        writing.set()
+        release.wait(5)
+        write_snapshot_now(game)
+
+    store.write_snapshot_now = slow_write
+    first = make_game(game_id="first")
+    games["first"] = first
+    adder = threading.Thread(target=games.__setitem__, args=("second", make_game(game_id="second")))
+    adder.start()
+    assert writing.wait(5)
+
+    # the registry stays usable while "first" is on its way to disk
+    reader = threading.Thread(target=lambda: (games.stats(), games.get("second")))
+    reader.start()
+    reader.join(2)
+    assert not reader.is_alive()
+    assert games.get("first") is first
+    assert games.stats()["spilling"] == 1
+
+    release.set()
+    adder.join(5)
+    assert games.stats()["spilled"] == 1 and first.lock.retired
+    with games.locked("first") as game:
+        assert game is not first and game.zobrist == first.zobrist
+
+
+def test_close_removes_temporary_spill_dir():
+    games = registry()
+    games["first"] = make_game(game_id="first")
+    games["second"] = make_game(game_id="second")
+    root = games._temp_dir
+    assert os.listdir(root) == ["first.snap"]
+    games.close()
+    assert not os.path.exists(root)
+
+
+def test_close_keeps_configured_spill_dir(tmp_path):
+    games = registry(spill_dir=str(tmp_path))
+    games["first"] = make_game(game_id="first")
+    games["second"] = make_game(game_id="second")
+    games.close()
+    assert os.path.isdir(tmp_path) and os.listdir(tmp_path) == []
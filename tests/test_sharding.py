@@ -0,0 +1,47 @@
+import pytest
+
+from backend import app as app_module
+from backend.sharding import FORWARDED_HEADER, ShardConfig
+
+SECRET = "0123456789abcdef"
+
+
+@pytest.fixture
+def forwarded(monkeypatch):
+    """Two-worker shard config for worker 0; records requests forwarded to worker 1."""
+    calls = []
+
+    def fake_forward(shards, game_id, method, path, body=b"", headers=None):
+        calls.append(game_id)
+        return 200, b'{"forwarded":true}', {"Content-Type": "application/json"}
+
+    shards = ShardConfig(worker_index=0, num_workers=2, run_dir="/nonexistent", forward_secret=SECRET)
+    monkeypatch.setattr(app_module, "SHARDS", shards)
+    monkeypatch.setattr(app_module, "forward_request", fake_forward)
+    return calls
+
+
+def foreign_id():
+    other = ShardConfig(worker_index=1, num_workers=2)
+    return other.new_game_id()
+
+
+@pytest.mark.parametrize("header", [None, "1", "true", SECRET[:-1], SECRET + "0"])
+def test_client_forwarded_header_is_not_trusted(client, forwarded, header):
+    game_id = foreign_id()
+    headers = {FORWARDED_HEADER: header} if header is not None else {}
+    response = client.get(f"/api/games/{game_id}", headers=headers)
+    assert response.get_json() == {"forwarded": True}
+    assert forwarded == [game_id]
+
+
+def test_sibling_with_secret_is_served_locally(client, forwarded):
+    response = client.get(f"/api/games/{foreign_id()}", headers={FORWARDED_HEADER: SECRET})
+    assert response.status_code == 404
+    assert forwarded == []
+
+
+def test_no_secret_never_trusts_the_header():
+    assert not ShardConfig(num_workers=2).is_forwarded("")
+    assert not ShardConfig(num_workers=2).is_forwarded("1")
+    assert ShardConfig(num_workers=2, forward_secret=SECRET).is_forwarded(SECRET)
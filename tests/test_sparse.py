@@ -0,0 +1,89 @@
+import random
+
+import pytest
+from helpers import sample_yamls
+
+from backend import sparse
+from backend.models import Game, compile_ruleset, new_game
+from backend.movegen import BatchMoveError, generate_moves, play_move, play_moves
+from backend.search import DIFFICULTY_BUDGETS, Searcher, build_request, search
+
+BOARDS = {
+    "rectangular": sample_yamls()[0],
+    "quadsphere": sample_yamls("board_quadsphere.yaml")[0],
+    "quadsphere-features": """\
+board_type: quadsphere
+board_size: [8, 12]
+special_squares:
+  - {position: [2, 3], effect: teleport, value: [5, 4]}
+  - {position: [1, 1], effect: block}
+  - {position: [6, 6], effect: bonus, value: 2}
+obstacles:
+  - {position: [4, 4], type: wall}
+""",
+}
+
+
+def rulesets(board_yaml, monkeypatch):
+    _board, pieces, rules = sample_yamls()
+    dense = compile_ruleset(board_yaml, pieces, rules)
+    with monkeypatch.context() as patch:
+        patch.setattr(sparse, "SPARSE_MAX_DENSE_SQUARES", 0)
+        hashed = compile_ruleset(board_yaml, pieces, rules)
+    assert hashed.board.sparse and not dense.board.sparse
+    return dense, hashed
+
+
+@pytest.mark.parametrize("board", BOARDS)
+@pytest.mark.parametrize("seed", range(8))
+def test_sparse_and_dense_positions_play_in_lockstep(board, seed, monkeypatch):
+    dense_rs, sparse_rs = rulesets(BOARDS[board], monkeypatch)
+    rng = random.Random(seed)
+    dense, hashed = new_game(dense_rs, "dense"), new_game(sparse_rs, "sparse")
+    while dense.state["status"] == "active" and len(dense.state["history"]) < 300:
+        moves = generate_moves(dense)
+        assert sorted(moves) == sorted(generate_moves(hashed))
+        if not moves:
+            break
+        move = rng.choice(moves)
+        if rng.random() < 0.1:
+            # a batch failing on its second move rolls both back the same way
+            for game in (dense, hashed):
+                with pytest.raises(BatchMoveError):
+                    play_moves(game, [(*move, None), (*move, None)])
+        assert play_move(dense, *move, None) == play_move(hashed, *move, None)
+        assert dense.zobrist == hashed.zobrist
+        assert dense.state == hashed.state
+    # a sparse game survives a spill/reload round trip
+    assert Game.from_dict(hashed.to_dict(), hashed.piece_types).zobrist == hashed.zobrist
+
+
+@pytest.mark.parametrize("board", BOARDS)
+def test_search_runs_on_sparse_positions(board, monkeypatch):
+    dense_rs, sparse_rs = rulesets(BOARDS[board], monkeypatch)
+    dense, hashed = new_game(dense_rs, "dense"), new_game(sparse_rs, "sparse")
+    easy = DIFFICULTY_BUDGETS["easy"]
+    assert Searcher(build_request(hashed), easy).perft(3) == Searcher(build_request(dense), easy).perft(3)
+    result = search(build_request(hashed), DIFFICULTY_BUDGETS["medium"])
+    assert result.move in generate_moves(hashed)
+    play_move(hashed, *result.move, None)
+
+
+@pytest.mark.parametrize(
+    "board_type, size, expected",
+    [
+        ("rectangular", (8, 8), False),
+        ("quadsphere", (8, 8), False),
+        # analysis and search target 64 x 64 dense boards
+        ("rectangular", (64, 64), False),
+        ("quadsphere", (64, 64), False),
+        ("rectangular", (65, 64), True),
+        ("rectangular", (2000, 2000), True),
+        # long strips and wrapped diagonals of coprime sides have huge slider tables
+        ("rectangular", (2000, 2), True),
+        ("quadsphere", (40, 41), True),
+        ("quadsphere", (40, 40), False),
+    ],
+)
+def test_sparse_threshold(board_type, size, expected):
+    assert sparse.is_sparse(*size, board_type) is expected
@@ -0,0 +1,104 @@
+import pytest
+from helpers import make_game
+
+from backend.movegen import play_move
+from backend.victory import VictoryTracker
+
+BOARD = """\
+board_type: rectangular
+board_size: [8, 8]
+special_squares:
+  - {position: [2, 3], effect: bonus, value: 2}
+obstacles: []
+"""
+
+PIECES = """\
+piece_types:
+  - {name: chess_king, movement: adjacent, special_moves: [], promotion: null}
+  - {name: chess_rook, movement: horizontal_vertical_unlimited, special_moves: [], promotion: null}
+  - {name: chess_pawn, movement: forward_1, special_moves: [], promotion: null}
+initial_positions:
+  player_1:
+    - {type: chess_rook, position: [0, 0]}
+    - {type: chess_rook, position: [2, 0]}
+    - {type: chess_king, position: [4, 1]}
+  player_2:
+    - {type: chess_king, position: [7, 7]}
+    - {type: chess_pawn, position: [5, 5]}
+"""
+
+
+def rules(conditions, repetition=None):
+    draw = f"draw_conditions: {{repetition: {repetition}}}\n" if repetition else ""
+    return f'turn_system: alternate\nvictory_conditions:\n{conditions}{draw}piece_reuse: "off"\nplayers: {{number: 2}}\n'
+
+
+def play(game, moves):
+    """Play ``moves``; the status after each one."""
+    statuses = []
+    for from_pos, to_pos in moves:
+        play_move(game, from_pos, to_pos, None)
+        statuses.append(game.state["status"])
+    return statuses
+
+
+def assert_tracker_fresh(game):
+    # the incremental counters agree with a tracker rebuilt from the pieces
+    fresh = VictoryTracker(game.victory.conditions, game.pieces, game.board)
+    nonzero = lambda counts: {k: v for k, v in counts.items() if v}  # noqa: E731
+    tracker = game.victory
+    assert nonzero(tracker.royal_left) == nonzero(fresh.royal_left)
+    assert nonzero(tracker.pieces_left) == nonzero(fresh.pieces_left)
+    assert tracker.alive == fresh.alive
+
+
+def test_capture_king_wins_on_the_capturing_move():
+    game = make_game(BOARD, PIECES, rules("  - {type: capture_king, value: chess_king}\n"))
+    statuses = play(game, [((0, 0), (0, 6)), ((7, 7), (7, 6)), ((0, 6), (7, 6))])
+    assert statuses == ["active", "active", "finished"]
+    assert game.state["winner"] == "player_1"
+    assert game.state["reason"] == "capture_king"
+    assert_tracker_fresh(game)
+
+
+def test_capturing_a_non_royal_piece_does_not_win():
+    game = make_game(BOARD, PIECES, rules("  - {type: capture_king, value: chess_king}\n"))
+    assert play(game, [((0, 0), (0, 5)), ((7, 7), (7, 6)), ((0, 5), (5, 5))]) == ["active"] * 3
+    assert_tracker_fresh(game)
+
+
+def test_score_counts_bonus_squares_and_captures():
+    game = make_game(BOARD, PIECES, rules("  - {type: score, value: 3}\n"))
+    # the bonus square scores 2, then capturing the pawn (1 point) reaches 3
+    statuses = play(game, [((2, 0), (2, 3)), ((7, 7), (7, 6)), ((0, 0), (0, 5)), ((7, 6), (7, 7)), ((0, 5), (5, 5))])
+    assert statuses == ["active"] * 4 + ["finished"]
+    assert game.state["scores"]["player_1"] == 3
+    assert game.state["winner"] == "player_1"
+    assert game.state["reason"] == "score"
+
+
+def test_first_listed_condition_wins():
+    conditions = "  - {type: reach_square, value: [5, 5]}\n  - {type: capture_king, value: chess_king}\n"
+    game = make_game(BOARD, PIECES, rules(conditions))
+    play(game, [((0, 0), (0, 5)), ((7, 7), (7, 6)), ((0, 5), (5, 5))])
+    assert game.state["reason"] == "reach_square"
+
+
+@pytest.mark.parametrize("limit", [2, 3])
+def test_repetition_draw_on_the_repeating_move(limit):
+    game = make_game(BOARD, PIECES, rules("  - {type: capture_king, value: chess_king}\n", repetition=limit))
+    shuffle = [((4, 1), (4, 2)), ((7, 7), (7, 6)), ((4, 2), (4, 1)), ((7, 6), (7, 7))]
+    # the start position occurs again after every 4 plies
+    statuses = play(game, shuffle * (limit - 1))
+    assert statuses == ["active"] * (4 * (limit - 1) - 1) + ["finished"]
+    assert game.state["winner"] is None
+    assert game.state["reason"] == "repetition"
+
+
+def test_capture_resets_repetition_count():
+    game = make_game(BOARD, PIECES, rules("  - {type: capture_king, value: chess_king}\n", repetition=2))
+    play(game, [((0, 0), (0, 5)), ((7, 7), (7, 6)), ((0, 5), (5, 5))])
+    assert game.repetitions == {game.zobrist: 1}
+    shuffle = [((7, 6), (7, 7)), ((4, 1), (4, 2)), ((7, 7), (7, 6)), ((4, 2), (4, 1))]
+    assert play(game, shuffle) == ["active"] * 3 + ["finished"]
+    assert game.state["reason"] == "repetition"
@@ -0,0 +1,88 @@
+import pytest
+from helpers import planned_moves
+
+from backend import delta
+
+
+@pytest.fixture
+def member(app, socketio, game_id):
+    ws = socketio.test_client(app)
+    ws.emit("join", {"game_id": game_id})
+    yield ws
+    ws.disconnect()
+
+
+def events(ws):
+    return [(packet["name"], packet["args"][0]) for packet in ws.get_received()]
+
+
+def test_join_sends_a_snapshot_then_chained_deltas(client, game_id, member):
+    moves, _ = planned_moves(3)
+    for move in moves:
+        assert client.post(f"/api/games/{game_id}/move", json=move).status_code == 200
+
+    received = events(member)
+
+    assert [name for name, _ in received] == ["snapshot", "delta", "delta", "delta"]
+    snapshot = received[0][1]
+    assert snapshot["seq"] == 0 and snapshot["game_id"] == game_id
+    seq = snapshot["seq"]
+    for (_, payload), move in zip(received[1:], moves):
+        assert payload["base"] == seq and payload["seq"] == seq + 1
+        assert [record["from"] for record in payload["moves"]] == [move["from"]]
+        seq = payload["seq"]
+    assert received[-1][1]["state"]["version"] == 3
+
+
+def test_gap_is_filled_by_resync(client, game_id, member):
+    local_seq = events(member)[0][1]["seq"]
+    moves, _ = planned_moves(3)
+    for move in moves:
+        client.post(f"/api/games/{game_id}/move", json=move)
+    # the first delta is lost: the next one does not start at the local seq
+    deltas = [payload for _, payload in events(member)][1:]
+    assert deltas[0]["base"] != local_seq
+
+    member.emit("resync", {"game_id": game_id, "since": local_seq})
+
+    [(name, payload)] = events(member)
+    assert name == "delta"
+    assert payload["base"] == local_seq and payload["seq"] == 3
+    assert [record["to"] for record in payload["moves"]] == [move["to"] for move in moves]
+    # every square the missed moves touched carries its current contents
+    touched = {tuple(square["position"]) for square in payload["squares"]}
+    assert {tuple(move["from"]) for move in moves} <= touched
+
+
+@pytest.mark.parametrize("since", [-1, 4, "1", None])
+def test_resync_from_an_unknown_seq_sends_a_snapshot(client, game_id, member, since):
+    events(member)
+    moves, _ = planned_moves(3)
+    for move in moves:
+        client.post(f"/api/games/{game_id}/move", json=move)
+    events(member)
+
+    member.emit("resync", {"game_id": game_id, "since": since})
+
+    [(name, payload)] = events(member)
+    assert name == "snapshot" and payload["seq"] == 3
+
+
+def test_resync_far_behind_sends_a_snapshot(client, game_id, member, monkeypatch):
+    monkeypatch.setattr(delta, "RESYNC_SNAPSHOT_THRESHOLD", 2)
+    events(member)
+    moves, _ = planned_moves(3)
+    for move in moves:
+        client.post(f"/api/games/{game_id}/move", json=move)
+    events(member)
+
+    member.emit("resync", {"game_id": game_id, "since": 1})
+    assert [name for name, _ in events(member)] == ["delta"]
+    member.emit("resync", {"game_id": game_id, "since": 0})
+    [(name, payload)] = events(member)
+    assert name == "snapshot" and len(payload["game"]["state"]["history"]) == 3
+
+
+def test_resync_of_an_unknown_game_is_an_error(member):
+    member.emit("resync", {"game_id": "missing", "since": 0})
+    assert ("error", {"message": "game_not_found"}) in events(member)